@@ -9,6 +9,14 @@ EMAIL_PASS = os.environ.get('EMAIL_PASS', '')
 
 # GCS Configuration
 GCS_BUCKET = os.environ.get('GCS_BUCKET', 'sigma-docs-repository')
+GZIP_MIN_BYTES = 1024  # as in the backend - smaller JSON isn't worth gzip-encoding
+
+# Document classification (utils/document.py, copied from the backend) - LRU of classified paths
+METADATA_CACHE_SIZE = int(os.environ.get('METADATA_CACHE_SIZE', '50000'))
+
+# Set like the backend's: when object events are routed to its /events/gcs it counts
+# every write in /stats, otherwise this service counts the emails it saves
+STATS_EVENTS_ENABLED = os.environ.get('STATS_EVENTS_ENABLED', 'false').lower() == 'true'
 
 # GCP Configuration
 GCP_PROJECT = os.environ.get('GCP_PROJECT', 'sigma-hq-technical-office')
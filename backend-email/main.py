@@ -11,6 +11,7 @@
 import functions_framework
 from flask import Flask
 from routes import register_routes
+from utils.compression import init_compression
 
 # Create Flask app
 app = Flask(__name__)
@@ -18,6 +19,9 @@ app = Flask(__name__)
 # Register all routes
 register_routes(app)
 
+# gzip/brotli for JSON responses
+init_compression(app)
+
 # Cloud Functions entry point
 @functions_framework.http
 def main(request):
@@ -10,7 +10,7 @@ from utils.gcs import save_email_to_gcs
 from services.classifier import classify_email_to_project, get_projects_from_firestore
 
 # Version - UPDATE THIS ON EVERY CHANGE
-SERVICE_VERSION = '4.1-status-api'
+SERVICE_VERSION = '4.12-gzip-threshold'
 
 
 def register_routes(app):
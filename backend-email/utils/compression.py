@@ -0,0 +1,93 @@
+# Response Compression
+# Shared by the backend and email services - each builds from its own directory,
+# so the file is copied into both (keep the copies identical).
+#
+# An after_request hook negotiates br/gzip from Accept-Encoding for JSON and text
+# responses, compressing the body once above MIN_BYTES. Streamed responses are
+# left as they are.
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+    BROTLI_ENABLED = True
+except ImportError:
+    brotli = None
+    BROTLI_ENABLED = False
+
+MIN_BYTES = 1024  # smaller bodies aren't worth the CPU or the headers
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # dynamic content - higher qualities cost far more CPU for little gain
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/javascript'}
+
+
+def _is_compressible(mimetype):
+    return bool(mimetype) and (mimetype in COMPRESSIBLE_MIMETYPES or mimetype.startswith('text/'))
+
+
+def choose_encoding(accept_encoding):
+    """
+    Best supported coding for an Accept-Encoding header: 'br', 'gzip' or None.
+    Codings with q=0 are refused; between acceptable ones brotli wins.
+    """
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+
+    def q_for(coding):
+        return accepted.get(coding, accepted.get('*', 0.0))
+
+    if BROTLI_ENABLED and q_for('br') > 0:
+        return 'br'
+    if q_for('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding):
+    """Compress a whole body"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_response(response, accept_encoding):
+    """Compress a Flask response in place if the client accepts it and it's worth it"""
+    response.vary.add('Accept-Encoding')
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.direct_passthrough
+            or response.is_streamed
+            or not _is_compressible(response.mimetype)):
+        return response
+
+    encoding = choose_encoding(accept_encoding)
+    if not encoding:
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_BYTES:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    """Compress every eligible response of a Flask app"""
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, request.headers.get('Accept-Encoding', ''))
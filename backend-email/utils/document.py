@@ -0,0 +1,496 @@
+# Document Type Detection & Hierarchy
+# The email service stores the same records on the emails it saves, so this file
+# is copied into backend-email/utils/document.py (keep the copies identical -
+# tests/test_document_classifier.py checks it).
+import re
+import os
+import threading
+from collections import OrderedDict
+
+from config import METADATA_CACHE_SIZE
+from utils.revision import document_revision, priority_revision
+
+# Document type hierarchy with priorities
+DOCUMENT_HIERARCHY = {
+    'shop_drawing': {'priority': 100, 'label': 'Shop Drawing', 'description': 'Shop Drawing'},
+    'approval': {'priority': 90, 'label': 'Approval', 'description': 'Material/Shop Drawing Approval'},
+    'rfi': {'priority': 85, 'label': 'RFI', 'description': 'Request for Information Response'},
+    'mom': {'priority': 80, 'label': 'MOM', 'description': 'Minutes of Meeting'},
+    'submittal': {'priority': 75, 'label': 'Submittal', 'description': 'Material Submittal'},
+    'specification': {'priority': 70, 'label': 'Spec', 'description': 'Technical Specification'},
+    'boq': {'priority': 65, 'label': 'BOQ', 'description': 'Bill of Quantities'},
+    'vo': {'priority': 60, 'label': 'VO', 'description': 'Variation Order (Financial)'},
+    'contract': {'priority': 55, 'label': 'Contract', 'description': 'Contract Document'},
+    'correspondence': {'priority': 50, 'label': 'Letter', 'description': 'Correspondence'},
+    'report': {'priority': 45, 'label': 'Report', 'description': 'Site/Progress Report'},
+    'drawing': {'priority': 40, 'label': 'Drawing', 'description': 'Design Drawing'},
+    'invoice': {'priority': 35, 'label': 'Invoice', 'description': 'Invoice/Payment'},
+    'procurement': {'priority': 33, 'label': 'Procurement', 'description': 'Purchase Order / Quotation'},
+    'other': {'priority': 10, 'label': 'Document', 'description': 'General Document'},
+}
+
+
+def detect_email_type(subject, body=''):
+    """Detect email document type from subject and body"""
+    text = f"{subject} {body}".lower()
+    
+    if re.search(r'\brfi\b|request.?for.?information', text): return 'rfi'
+    if re.search(r'approv|موافقة', text): return 'approval'
+    if re.search(r'shop.?draw|شوب', text): return 'shop_drawing'
+    if re.search(r'submittal|تقديم', text): return 'submittal'
+    if re.search(r'\bvo\b|variation|فارييشن', text): return 'vo'
+    if re.search(r'invoice|فاتورة|inv[-_]\d', text): return 'invoice'
+    if re.search(r'أمر.?شراء|عرض.?سعر|purchase|quotation|po[-_]|procurement', text): return 'procurement'
+    if re.search(r'mom|minute|محضر|اجتماع', text): return 'mom'
+    if re.search(r'report|تقرير', text): return 'report'
+    
+    return 'correspondence'
+
+
+def extract_revision(filename):
+    """Extract revision number and display string from filename"""
+    return document_revision(filename)
+
+
+def is_valid_document(filename):
+    """Check if file is a valid document (not font, template, etc.)"""
+    lower = filename.lower()
+    ext = os.path.splitext(lower)[1]
+    valid_ext = {'.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt'}
+    if ext not in valid_ext:
+        return False
+    
+    skip_patterns = [
+        'font', 'arial', 'calibri', 'times', 'helvetica', 
+        'template', 'blank', 'empty', 'backup', 'copy of', 
+        'old_', '~$', 'desktop.ini', 'thumbs.db', '.ds_store'
+    ]
+    for pattern in skip_patterns:
+        if pattern in lower:
+            return False
+    return True
+
+
+def is_email_folder(path):
+    """Check if path is in an email/correspondence folder"""
+    lower_path = path.lower()
+    if '09-correspondence/' in lower_path or '09.correspondence/' in lower_path:
+        return True
+    if '01.correspondence/' in lower_path:
+        return True
+    return False
+
+
+# === PATH CLASSIFIER ===
+# Document type, subject, priority and approval are defined by the rule tables
+# below. Every substring they test is collected in a single trie-regex pass per
+# path, and the first satisfied rule (in table order) wins.
+
+# (all_of, none_of, doc_type) in priority order
+TYPE_RULES = [
+    # NEW folder structure
+    (('01.correspondence',), (), 'correspondence'),
+    (('03.design-drawings',), (), 'drawing'),
+    (('04.shop-drawings',), (), 'shop_drawing'),
+    (('05.contract-boq', '/contract'), (), 'contract'),
+    (('05.contract-boq', '/boq'), (), 'boq'),
+    (('05.contract-boq',), (), 'contract'),
+    (('06.qs-procurement', '/purchase'), (), 'procurement'),
+    (('06.qs-procurement',), (), 'boq'),
+    (('07.submittals',), (), 'submittal'),
+    (('08.reports-mom', '/mom'), (), 'mom'),
+    (('08.reports-mom',), (), 'report'),
+    (('09.invoices-variations', '/variation'), (), 'vo'),
+    (('09.invoices-variations',), (), 'invoice'),
+    (('10.handover', '/as-built'), (), 'drawing'),
+    (('10.handover',), (), 'other'),
+    (('02.project-info', '/tender'), (), 'contract'),
+    (('02.project-info',), (), 'other'),
+    # OLD folder structure
+    (('08.variation',), (), 'vo'),
+    (('extra work',), (), 'vo'),
+    (('01.drawings', '02.drawings'), (), 'shop_drawing'),
+    (('04-shop',), (), 'shop_drawing'),
+    (('04_shop',), (), 'shop_drawing'),
+    (('/drawings/',), ('design',), 'shop_drawing'),
+    (('02.design',), (), 'drawing'),
+    (('02-design',), (), 'drawing'),
+    (('01.mom',), (), 'mom'),
+    (('/mom/',), (), 'mom'),
+    (('06.mom',), (), 'mom'),
+    (('02.report',), (), 'report'),
+    (('07-site',), (), 'report'),
+    (('/reports/',), (), 'report'),
+    (('07.invoice',), (), 'invoice'),
+    (('/invoices/',), (), 'invoice'),
+    (('10.submittal',), (), 'submittal'),
+    (('/submittal',), (), 'submittal'),
+    (('04.qs',), (), 'boq'),
+    (('06-quantity',), (), 'boq'),
+    (('/qs/',), (), 'boq'),
+    (('03.loi',), (), 'contract'),
+    (('01-contract',), (), 'contract'),
+    (('03-spec',), (), 'specification'),
+    (('/spec/',), (), 'specification'),
+    (('/rfi/',), (), 'rfi'),
+    (('09-corr',), (), 'correspondence'),
+    (('/correspondence/',), (), 'correspondence'),
+]
+
+# Filename fallback when no folder rule matched (tested against the filename only)
+FILENAME_TYPE_RULES = [(re.compile(pattern), doc_type) for pattern, doc_type in [
+    (r'\bvo\b|variation', 'vo'),
+    (r'\bmom\b|minute.?of.?meeting', 'mom'),
+    (r'\brfi\b', 'rfi'),
+    (r'invoice|inv[-_]\d', 'invoice'),
+    (r'submittal', 'submittal'),
+    (r'report', 'report'),
+    (r'أمر.?شراء|عرض.?سعر|purchase|quotation|po[-_]', 'procurement'),
+]]
+
+# (keywords, subject) in priority order. Folder rules look at the path only,
+# keyword rules at the filename or the path.
+SUBJECT_FOLDER_RULES = [
+    (('10.architecture', '/architecture/'), 'architectural'),
+    (('20.electrical', '/electrical/'), 'electrical'),
+    (('30.air conditioning', '/ac/', 'hvac'), 'mechanical'),
+    (('40.fire fighting', '/fire'), 'fire'),
+    (('50.plumbing', '/plumbing/'), 'plumbing'),
+    (('01.interior',), 'interior'),
+    (('04.lighting',), 'lighting'),
+    (('08.floor',), 'flooring'),
+    (('09.door',), 'door'),
+    (('mep', 'x0.mep'), 'mep'),
+]
+SUBJECT_KEYWORD_RULES = [
+    (('floor', 'tile', 'carpet', 'vinyl', 'marble', 'granite', 'porcelain'), 'flooring'),
+    (('kitchen', 'ktc', 'pantry'), 'kitchen'),
+    (('bathroom', 'bath', 'toilet', 'wc', 'lavatory', 'washroom'), 'bathroom'),
+    (('ceiling', 'clg', 'gypsum', 'soffit', 'bulkhead', 'rcp'), 'ceiling'),
+    (('wall', 'partition', 'drywall', 'cladding'), 'wall'),
+    (('door', 'entrance', 'gate', 'shutter'), 'door'),
+    (('window', 'glazing', 'curtain wall', 'facade', 'shop front'), 'window'),
+    (('electrical', 'elec', 'lighting', 'power', 'small power', 'db', 'panel'), 'electrical'),
+    (('mechanical', 'mech', 'hvac', 'ac', 'ahu', 'fcu', 'duct', 'diffuser', 'grill'), 'mechanical'),
+    (('plumbing', 'plumb', 'drainage', 'sanitary', 'water', 'pipe'), 'plumbing'),
+    (('fire', 'sprinkler', 'smoke', 'alarm', 'firefighting'), 'fire'),
+    (('furniture', 'furn', 'joinery', 'millwork', 'casework', 'carpentry'), 'furniture'),
+    (('signage', 'sign', 'wayfinding', 'graphics'), 'signage'),
+    (('layout', 'plan', 'elevation', 'section', 'setting out', 'construction'), 'architectural'),
+]
+SUBJECT_CODE_PATTERN = re.compile(r'-([aempf])-')
+SUBJECT_CODES = {'a': 'architectural', 'e': 'electrical', 'm': 'mechanical', 'p': 'plumbing', 'f': 'fire'}
+
+APPROVED_TOKENS = ('/approved', '05-approved', '07.submittals/approved')
+
+
+def _trie_pattern(words):
+    """Regex alternation shaped as a prefix trie - one branch per next character"""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+    
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if '' in node else body
+    
+    return build(trie)
+
+
+def _build_matcher():
+    tokens = set(APPROVED_TOKENS)
+    for all_of, none_of, _ in TYPE_RULES:
+        tokens.update(all_of, none_of)
+    for keywords, _ in SUBJECT_FOLDER_RULES + SUBJECT_KEYWORD_RULES:
+        tokens.update(keywords)
+    
+    # Searched repeatedly from one past the previous match start, so overlapping
+    # tokens are all found. Where several tokens start at the same position the
+    # trie yields the longest; the shorter ones are its prefixes (TOKEN_PREFIXES).
+    pattern = re.compile(_trie_pattern(tokens))
+    prefixes = {t: tuple(u for u in tokens if u != t and t.startswith(u)) for t in tokens}
+    return pattern, prefixes, max(len(t) for t in tokens)
+
+
+TOKEN_PATTERN, TOKEN_PREFIXES, MAX_TOKEN_LEN = _build_matcher()
+
+TYPE_RULES_BY_TOKEN = {}
+for _index, (_all_of, _none_of, _doc_type) in enumerate(TYPE_RULES):
+    for _token in _all_of:
+        TYPE_RULES_BY_TOKEN.setdefault(_token, []).append(_index)
+
+# Rank of the best subject rule a token satisfies when found in the path / filename
+SUBJECT_RULES = SUBJECT_FOLDER_RULES + SUBJECT_KEYWORD_RULES
+SUBJECT_PATH_RANK, SUBJECT_NAME_RANK = {}, {}
+for _rank, (_keywords, _subject) in enumerate(SUBJECT_RULES):
+    for _token in _keywords:
+        SUBJECT_PATH_RANK.setdefault(_token, _rank)
+        if _rank >= len(SUBJECT_FOLDER_RULES):
+            SUBJECT_NAME_RANK.setdefault(_token, _rank)
+
+
+def _scan_tokens(text):
+    found = set()
+    search = TOKEN_PATTERN.search
+    match = search(text)
+    while match:
+        token = match.group()
+        found.add(token)
+        found.update(TOKEN_PREFIXES[token])
+        match = search(text, match.start() + 1)
+    return found
+
+
+def _path_tokens(lower_path, dir_cache):
+    """
+    Tokens in a path. The directory part is scanned once per directory; only the
+    tail that can hold tokens ending in the filename is scanned per file.
+    """
+    cut = lower_path.rfind('/') + 1
+    if cut == 0:
+        return _scan_tokens(lower_path)
+    directory = lower_path[:cut]
+    dir_tokens = dir_cache.get(directory)
+    if dir_tokens is None:
+        dir_tokens = dir_cache[directory] = _scan_tokens(directory)
+    return dir_tokens | _scan_tokens(lower_path[max(0, cut - MAX_TOKEN_LEN + 1):])
+
+
+def _match_tokens(tokens):
+    """
+    Everything decided by the rule tokens alone:
+    (folder type or None, best subject rank or None, approved)
+    """
+    doc_type = None
+    for index in sorted({i for t in tokens for i in TYPE_RULES_BY_TOKEN.get(t, ())}):
+        all_of, none_of, rule_type = TYPE_RULES[index]
+        if all(t in tokens for t in all_of) and not any(t in tokens for t in none_of):
+            doc_type = rule_type
+            break
+    ranks = [SUBJECT_PATH_RANK[t] for t in tokens if t in SUBJECT_PATH_RANK]
+    subject_rank = min(ranks) if ranks else None
+    return doc_type, subject_rank, any(t in tokens for t in APPROVED_TOKENS)
+
+
+def _fallback_type(lower_name):
+    for pattern, doc_type in FILENAME_TYPE_RULES:
+        if pattern.search(lower_name):
+            return doc_type
+    return 'other'
+
+
+def _fallback_subject(lower_name):
+    code_match = SUBJECT_CODE_PATTERN.search(lower_name)
+    if code_match:
+        return SUBJECT_CODES[code_match.group(1)]
+    return 'general'
+
+
+def classify_paths(paths, filenames=None):
+    """
+    Classify many GCS paths in one pass.
+    filenames defaults to each path's basename. Returns one record per path:
+        {'type', 'subject', 'revision', 'revisionStr', 'priority', 'approved'}
+    """
+    dir_cache, token_cache = {}, {}
+    records = []
+    for i, path in enumerate(paths):
+        lower_path = path.lower()
+        lower_name = filenames[i].lower() if filenames is not None else lower_path.rsplit('/', 1)[-1]
+        
+        tokens = frozenset(_path_tokens(lower_path, dir_cache))
+        matched = token_cache.get(tokens)
+        if matched is None:
+            matched = token_cache[tokens] = _match_tokens(tokens)
+        doc_type, subject_rank, approved = matched
+        
+        # The filename is normally the tail of the path - scan it separately otherwise
+        if not lower_path.endswith(lower_name):
+            name_ranks = [SUBJECT_NAME_RANK[t] for t in _scan_tokens(lower_name) if t in SUBJECT_NAME_RANK]
+            if name_ranks and (subject_rank is None or min(name_ranks) < subject_rank):
+                subject_rank = min(name_ranks)
+        
+        doc_type = doc_type or _fallback_type(lower_name)
+        subject = SUBJECT_RULES[subject_rank][1] if subject_rank is not None else _fallback_subject(lower_name)
+        
+        rev_num, rev_str = document_revision(lower_name)
+        priority = DOCUMENT_HIERARCHY.get(doc_type, DOCUMENT_HIERARCHY['other'])['priority']
+        priority += min(priority_revision(lower_name) * 2, 10)
+        if 'final' in lower_name or 'approved' in lower_name:
+            priority += 15
+        
+        records.append({
+            'type': doc_type,
+            'subject': subject,
+            'revision': rev_num,
+            'revisionStr': rev_str,
+            'priority': priority,
+            'approved': approved
+        })
+    return records
+
+
+def detect_document_type(filename, path):
+    """Document type of one file (see TYPE_RULES / FILENAME_TYPE_RULES)"""
+    return classify_paths([path], [filename])[0]['type']
+
+
+def get_document_priority(filename, path):
+    """Get priority score for document ranking"""
+    record = classify_paths([path], [filename])[0]
+    return record['priority'], record['type']
+
+
+def extract_subject(filename, path):
+    """Subject/category of one file (see SUBJECT_FOLDER_RULES / SUBJECT_KEYWORD_RULES)"""
+    return classify_paths([path], [filename])[0]['subject']
+
+
+def is_approved_folder(path):
+    """Check if file is in an approved folder (see APPROVED_TOKENS)"""
+    return classify_paths([path])[0]['approved']
+
+
+# === METADATA CACHE ===
+# Classification depends only on the path and filename, so records are kept
+# per (path, filename) across requests - a dashboard refresh only classifies
+# files it hasn't seen. Bounded LRU, shared by all request threads.
+
+class MetadataCache:
+    """LRU of classify_paths records keyed by (path, filename)"""
+    
+    def __init__(self, maxsize=METADATA_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def classify(self, paths, filenames=None):
+        """
+        Same result as classify_paths(paths, filenames), classifying only the misses.
+        Records are shared between callers - treat them as read-only.
+        """
+        keys = [(path, filenames[i] if filenames is not None else None) for i, path in enumerate(paths)]
+        records = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                record = self._records.get(key)
+                if record is None:
+                    missing.append(i)
+                else:
+                    self._records.move_to_end(key)
+                    records[i] = record
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        
+        if not missing:
+            return records
+        
+        computed = classify_paths(
+            [paths[i] for i in missing],
+            [filenames[i] for i in missing] if filenames is not None else None
+        )
+        with self._lock:
+            for i, record in zip(missing, computed):
+                records[i] = record
+                self._records[keys[i]] = record
+                self._records.move_to_end(keys[i])
+            while len(self._records) > self.maxsize:
+                self._records.popitem(last=False)
+        return records
+    
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._records),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+metadata_cache = MetadataCache()
+
+
+def document_metadata(path, filename=None):
+    """Cached record for one path: type, subject, revision, revisionStr, priority, approved"""
+    return metadata_cache.classify([path], [filename] if filename is not None else None)[0]
+
+
+def classify_paths_cached(paths, filenames=None):
+    """classify_paths through the shared metadata cache"""
+    return metadata_cache.classify(paths, filenames)
+
+
+# === STORED METADATA ===
+# sync_folder stores each object's record as GCS custom metadata at upload, so
+# listings (fetched with a fields projection that includes metadata) read it back
+# instead of classifying. Objects without it - or written under older rules - fall
+# back to the classifier.
+
+# Bump when the classification rules change - objects tagged with an older
+# version are reclassified on read until they are uploaded again
+CLASSIFIER_VERSION = '2'
+
+
+def metadata_fields(record):
+    """GCS custom metadata (string values) for a classify_paths record"""
+    return {
+        'docMeta': CLASSIFIER_VERSION,
+        'docType': record['type'],
+        'docSubject': record['subject'],
+        'docRevision': str(record['revision']),
+        'docRevisionStr': record['revisionStr'] or '',
+        'docPriority': str(record['priority']),
+        'docApproved': 'true' if record['approved'] else 'false'
+    }
+
+
+def record_from_metadata(metadata):
+    """classify_paths record from stored custom metadata, or None if absent/stale"""
+    if not metadata:
+        return None
+    try:
+        if metadata.get('docMeta') == CLASSIFIER_VERSION:
+            return {
+                'type': metadata['docType'],
+                'subject': metadata['docSubject'],
+                'revision': int(metadata['docRevision']),
+                'revisionStr': metadata['docRevisionStr'] or None,
+                'priority': int(metadata['docPriority']),
+                'approved': metadata['docApproved'] == 'true'
+            }
+    except (KeyError, ValueError):
+        pass
+    return None
+
+
+def classify_blobs(blobs):
+    """
+    Records for listed blobs: stored metadata where present, otherwise
+    classified by path and basename (through the metadata cache).
+    """
+    records = [record_from_metadata(b.metadata) for b in blobs]
+    missing = [i for i, record in enumerate(records) if record is None]
+    if missing:
+        computed = classify_paths_cached([blobs[i].name for i in missing])
+        for i, record in zip(missing, computed):
+            records[i] = record
+    return records
@@ -1,11 +1,39 @@
 # GCS Utilities for Email Backend
+import gzip
+import hashlib
 import json
 import re
 from datetime import datetime
 from google.cloud import storage
+from google.cloud import firestore
+from google.api_core.exceptions import PreconditionFailed
+
+from clients import db
+from config import APP_ID, STATS_EVENTS_ENABLED, GZIP_MIN_BYTES
+from utils.document import document_metadata, metadata_fields
 
 storage_client = storage.Client()
 
+# Per-project monthly email index: <prefix>/<project>/<YYYY-MM>.ndjson, one summary
+# record per line (read by /emails in the backend - EMAIL_INDEX_PREFIX there)
+EMAIL_INDEX_PREFIX = '_email_index'
+EMAIL_INDEX_WRITE_ATTEMPTS = 5
+EMAIL_SNIPPET_CHARS = 200  # EMAIL_SNIPPET_CHARS in the backend - records match its summaries
+# Shard for emails without an ISO date (UNDATED_SHARD in the backend - rebuild_email_index uses the same rule)
+EMAIL_UNDATED_SHARD = 'undated'
+
+def gzip_encoded(blob, data):
+    """
+    Bytes to upload for data: gzip-encoded (Content-Encoding set on blob) from
+    GZIP_MIN_BYTES, as the backend's upload_bytes stores text. GCS transcodes on
+    read, so readers still get the plain bytes.
+    """
+    if len(data) < GZIP_MIN_BYTES:
+        return data
+    blob.content_encoding = 'gzip'
+    return gzip.compress(data, mtime=0)
+
+
 def detect_folder_structure(bucket_name, folder_name):
     """Detect if project uses OLD or NEW folder structure"""
     bucket = storage_client.bucket(bucket_name)
@@ -44,7 +72,104 @@ def save_email_to_gcs(bucket_name, folder_name, email_data, doc_type='correspond
     else:
         path = f"{folder_name}/09-Correspondence/{doc_type.upper()}/{date_str}_{safe_subject}.json"
     
+    data = json.dumps(email_data, ensure_ascii=False).encode('utf-8')
     blob = bucket.blob(path)
-    blob.upload_from_string(json.dumps(email_data, ensure_ascii=False), content_type='application/json')
+    # Same classification record as sync stores, so listings read it instead of classifying
+    record = document_metadata(path)
+    blob.metadata = metadata_fields(record)
+    if len(data) >= GZIP_MIN_BYTES:
+        # The md5 of the JSON itself - GCS's covers the gzip stream
+        blob.metadata = {'sourceMd5': hashlib.md5(data).hexdigest(), **blob.metadata}
+    blob.upload_from_string(gzip_encoded(blob, data), content_type='application/json; charset=utf-8')
+    append_email_index(bucket, folder_name, email_index_record(path, email_data, doc_type))
+    count_in_project_stats(folder_name, path, blob.size, record)
+    bump_project_generation(folder_name)
     
     return path
+
+
+def email_index_record(path, email_data, doc_type):
+    """Compact summary of a saved email for the project's index shard"""
+    date = email_data.get('date') or None
+    try:
+        datetime.fromisoformat(date)
+    except (TypeError, ValueError):
+        # Filed in the undated shard and listed after every dated email
+        date = None
+    return {
+        'id': email_data.get('id'),
+        'subject': email_data.get('subject'),
+        'sender': email_data.get('sender'),
+        'date': date,
+        'type': doc_type,
+        'path': path,
+        'snippet': ' '.join((email_data.get('body') or '').split())[:EMAIL_SNIPPET_CHARS]
+    }
+
+
+def append_email_index(bucket, folder_name, record):
+    """
+    Append a record to the project's shard for the email's month (or the undated one). The write is
+    conditional on the generation that was read, so concurrent savers can't drop
+    each other's records - the loser re-reads and retries.
+    """
+    month = record['date'][:7] if record['date'] else EMAIL_UNDATED_SHARD
+    name = f"{EMAIL_INDEX_PREFIX}/{folder_name}/{month}.ndjson"
+    line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+    for _ in range(EMAIL_INDEX_WRITE_ATTEMPTS):
+        try:
+            current = bucket.get_blob(name)
+            generation = current.generation if current else 0
+            existing = current.download_as_bytes(if_generation_match=generation) if current else b''
+            blob = bucket.blob(name)
+            blob.upload_from_string(gzip_encoded(blob, existing + line), content_type='application/x-ndjson',
+                                    if_generation_match=generation)
+            return True
+        except PreconditionFailed:
+            continue
+        except Exception as e:
+            print(f"Email index error ({name}): {e}")
+            return False
+    print(f"Email index error ({name}): gave up after {EMAIL_INDEX_WRITE_ATTEMPTS} conflicting writes")
+    return False
+
+
+def bump_project_generation(folder_name):
+    """
+    Tell the backend a project's objects changed - its listing views and ETags
+    follow this counter (services/generation.py in the backend)
+    """
+    try:
+        db.collection('artifacts').document(APP_ID).collection('public').document('data')\
+            .collection('project_generations').document(folder_name)\
+            .set({'generation': firestore.Increment(1), 'updated': datetime.utcnow().isoformat()}, merge=True)
+    except Exception as e:
+        print(f"Generation bump error ({folder_name}): {e}")
+
+
+def count_in_project_stats(folder_name, path, size, record):
+    """
+    Add a saved email to the project's /stats aggregates - the same atomic increments
+    as StatsDelta (services/stats.py in the backend). Skipped when object events are
+    routed to the backend, which then counts every write itself.
+    """
+    if STATS_EVENTS_ENABLED:
+        return
+    size = int(size or 0)
+    rel = path[len(folder_name) + 1:]
+    folder = rel.split('/', 1)[0] if '/' in rel else '(root)'
+    try:
+        db.collection('artifacts').document(APP_ID).collection('public').document('data')\
+            .collection('project_stats').document(folder_name)\
+            .set({
+                'fileCount': firestore.Increment(1),
+                'totalSize': firestore.Increment(size),
+                'byType': {record['type']: firestore.Increment(1)},
+                'bytesByType': {record['type']: firestore.Increment(size)},
+                'bySubject': {record['subject']: firestore.Increment(1)},
+                'byFolder': {folder: firestore.Increment(1)},
+                'bytesByFolder': {folder: firestore.Increment(size)},
+                'updated': datetime.utcnow().isoformat()
+            }, merge=True)
+    except Exception as e:
+        print(f"Stats update error ({folder_name}): {e}")
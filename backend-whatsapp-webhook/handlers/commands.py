@@ -12,7 +12,7 @@ from services.firestore_ops import (
 )
 from services.vertex_search import search_documents
 from services.file_delivery import send_whatsapp_file
-from utils.revision_parser import extract_revision_score
+from utils.revision import revision_score, revision_indicator
 
 
 def match_project(hint, projects):
@@ -202,12 +202,8 @@ def handle_command(message_text, sender, projects, chat_id):
                 folder = doc['path'] if doc['path'] else ''
                 
                 # Show revision indicator if detected
-                rev_score = extract_revision_score(doc['name'])
-                rev_indicator = ""
-                if rev_score > 0:
-                    rev_match = re.search(r'(REV[_\s\-\.]*\d+|REV[_\s\-\.]*[A-Z]|V\d+|R\d+)', doc['name'].upper())
-                    if rev_match:
-                        rev_indicator = f" 🔄{rev_match.group(1)}"
+                rev_label = revision_indicator(doc['name']) if revision_score(doc['name']) > 0 else None
+                rev_indicator = f" 🔄{rev_label}" if rev_label else ""
                 
                 lines.append(f"{i}. *{name}*{rev_indicator}")
                 if folder:
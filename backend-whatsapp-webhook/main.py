@@ -1,4 +1,4 @@
-# WhatsApp Webhook - v4.20-status-api
+# WhatsApp Webhook - v4.22-baseline-revision-scores
 # 
 # This is the main entry point. All logic is in separate modules:
 # - config.py: Environment variables and constants
@@ -8,6 +8,7 @@
 # - services/waha_api.py: WhatsApp API calls
 # - services/vertex_search.py: Document search
 # - services/file_delivery.py: File sending with signed URLs
+# - utils/revision.py: Revision/date parsing (shared with backend)
 # - utils/revision_parser.py: Revision sorting
 
 import functions_framework
@@ -34,7 +35,7 @@ from services.file_delivery import get_short_url_redirect
 from handlers.classifier import classify_message, VERTEX_AI_ENABLED
 
 # Version - UPDATE THIS ON EVERY CHANGE
-SERVICE_VERSION = '4.20-status-api'
+SERVICE_VERSION = '4.22-baseline-revision-scores'
 
 
 @functions_framework.http
@@ -1,15 +1,20 @@
 # Utils package - Helper functions and utilities
 
+from utils.revision import (
+    revision_score,
+    date_score,
+    revision_indicator
+)
+
 from utils.revision_parser import (
-    extract_revision_score,
-    extract_date_score,
     get_file_modified_time,
     sort_results_by_revision
 )
 
 __all__ = [
-    'extract_revision_score',
-    'extract_date_score',
+    'revision_score',
+    'date_score',
+    'revision_indicator',
     'get_file_modified_time',
     'sort_results_by_revision'
 ]
@@ -0,0 +1,115 @@
+# Revision & Date Parsing - shared by backend, backend-email and backend-whatsapp-webhook
+# Each service builds from its own Docker context, so this file exists three times:
+#   backend/utils/revision.py
+#   backend-email/utils/revision.py (for its copy of utils/document.py)
+#   backend-whatsapp-webhook/utils/revision.py
+# Keep the copies identical (tests/test_revision.py checks it).
+#
+# Every caller keeps the results it had before the parsers were shared - only the
+# patterns are compiled once here instead of on each call:
+#   document_revision     - document records (revision, revisionStr): 'Rev 02'
+#   priority_revision     - revision bonus in document priority
+#   short_revision_label  - /latest labels: 'R2'
+#   revision_score, date_score, revision_indicator - WhatsApp search ordering and display
+import re
+from datetime import datetime
+
+# Tried in order on the lowercased filename - the first match wins
+DOCUMENT_REVISION_PATTERNS = [re.compile(p) for p in (
+    r'rev[._\-\s]?(\d+)',
+    r'revision[._\-\s]?(\d+)',
+    r'\br(\d+)\b',
+    r'_r(\d+)_',
+    r'-r(\d+)-',
+    r'v(\d+)(?:\.\d+)?(?:[_\-\s]|$)',
+)]
+PRIORITY_REVISION_PATTERN = re.compile(r'rev[._-]?(\d+)|r(\d+)')
+SHORT_REVISION_PATTERN = re.compile(r'[_\-\s]?[Rr](?:ev)?\.?\s*(\d+)')
+
+# WhatsApp scores, tried in this order on the uppercased filename (the suffix on the original)
+SCORE_REV_NUMBER = re.compile(r'REV[_\s\-\.]*(\d+)')
+SCORE_R_NUMBER = re.compile(r'[_\-\s]R(\d+)[_\-\s\.]')
+SCORE_REV_LETTER = re.compile(r'REV[_\s\-\.]*([A-Z])')
+SCORE_VERSION = re.compile(r'V(?:ERSION)?[_\s\-\.]*(\d+)')
+SCORE_SUFFIX = re.compile(r'[_\-](\d{2,3})(?:\.[a-zA-Z]+)?$')
+INDICATOR_PATTERN = re.compile(r'(REV[_\s\-\.]*\d+|REV[_\s\-\.]*[A-Z]|V\d+|R\d+)')
+
+# (pattern, year/month/day group order) - the first match of the first pattern that
+# gives a valid date wins
+DATE_PATTERNS = [
+    (re.compile(r'(20\d{2})[_\-](\d{2})[_\-](\d{2})'), (1, 2, 3)),
+    (re.compile(r'(\d{2})[_\-](\d{2})[_\-](20\d{2})'), (3, 2, 1)),
+    (re.compile(r'(20\d{2})(\d{2})(\d{2})'), (1, 2, 3)),
+]
+
+
+def document_revision(filename):
+    """Revision number and display string of a document: (2, 'Rev 02'), or (0, None)"""
+    lower = filename.lower()
+    for pattern in DOCUMENT_REVISION_PATTERNS:
+        match = pattern.search(lower)
+        if match:
+            rev_num = int(match.group(1))
+            return rev_num, f"Rev {str(rev_num).zfill(2)}"
+    return 0, None
+
+
+def priority_revision(filename):
+    """Revision number that earns a document its priority bonus (0 if none)"""
+    match = PRIORITY_REVISION_PATTERN.search(filename.lower())
+    if match:
+        return int(match.group(1) or match.group(2))
+    return 0
+
+
+def short_revision_label(filename):
+    """Short display label: 'R2', or '' if none"""
+    match = SHORT_REVISION_PATTERN.search(filename)
+    return f"R{match.group(1)}" if match else ''
+
+
+def revision_score(filename):
+    """
+    Sortable revision score - higher is newer.
+    Rev N / R N / V N score N*100, Rev A..Z 10..260, a trailing _NN suffix NN.
+    """
+    if not filename:
+        return 0
+
+    name_upper = filename.upper()
+    match = SCORE_REV_NUMBER.search(name_upper) or SCORE_R_NUMBER.search(name_upper)
+    if match:
+        return int(match.group(1)) * 100
+    match = SCORE_REV_LETTER.search(name_upper)
+    if match:
+        return (ord(match.group(1)) - ord('A') + 1) * 10
+    match = SCORE_VERSION.search(name_upper)
+    if match:
+        return int(match.group(1)) * 100
+    match = SCORE_SUFFIX.search(filename)
+    if match:
+        return int(match.group(1))
+    return 0
+
+
+def date_score(filename):
+    """Timestamp of the date in a filename (2024-01-15, 15-01-2024, 20240115) - 0 if none"""
+    if not filename:
+        return 0
+
+    for pattern, (y, m, d) in DATE_PATTERNS:
+        match = pattern.search(filename)
+        if match:
+            try:
+                return int(datetime(int(match.group(y)), int(match.group(m)), int(match.group(d))).timestamp())
+            except ValueError:
+                pass
+    return 0
+
+
+def revision_indicator(filename):
+    """Display string for the revision as written (e.g. 'REV05', 'V2'), or None"""
+    if not filename:
+        return None
+    match = INDICATOR_PATTERN.search(filename.upper())
+    return match.group(1) if match else None
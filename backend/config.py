@@ -4,16 +4,85 @@ import os
 # GCS Configuration
 GCS_BUCKET = os.environ.get('GCS_BUCKET', 'sigma-docs-repository')
 MAX_FILE_SIZE_MB = int(os.environ.get('MAX_FILE_SIZE_MB', '100'))
+GZIP_MIN_BYTES = 1024  # smaller text files aren't worth gzip-encoding
+
+# Document classification - LRU of classified paths kept in memory per instance
+METADATA_CACHE_SIZE = int(os.environ.get('METADATA_CACHE_SIZE', '50000'))
+
+# Listing cache (utils.gcs.listing_cache) - entries also expire when the project generation moves on
+LISTING_CACHE_TTL = int(os.environ.get('LISTING_CACHE_TTL', '60'))
+LISTING_CACHE_MAX_RECORDS = int(os.environ.get('LISTING_CACHE_MAX_RECORDS', '200000'))
+# Identical backend calls in flight at once share one execution (utils.singleflight) -
+# a caller waits at most this many seconds for the running one before doing the work itself
+SINGLEFLIGHT_TIMEOUT = float(os.environ.get('SINGLEFLIGHT_TIMEOUT', '30'))
+# Project generation counters (Firestore) - reads cached per instance for this many seconds
+GENERATION_CACHE_SECONDS = float(os.environ.get('GENERATION_CACHE_SECONDS', '2'))
+# In-memory project views (folder tree, latest index) - rebuilt on generation change or after this many seconds
+PROJECT_VIEW_TTL = int(os.environ.get('PROJECT_VIEW_TTL', '300'))
+# Newest approved/recent documents kept per project and document type for /latest
+LATEST_INDEX_SIZE = int(os.environ.get('LATEST_INDEX_SIZE', '50'))
+# /latest entries per group and page (capped at FILES_MAX_PAGE_SIZE, like /files)
+LATEST_PAGE_SIZE = int(os.environ.get('LATEST_PAGE_SIZE', '10'))
+# Largest files listed by /overview
+OVERVIEW_LARGEST_FILES = int(os.environ.get('OVERVIEW_LARGEST_FILES', '10'))
+# /files pages (single-level listing) - GCS returns at most 1000 entries per page
+FILES_PAGE_SIZE = int(os.environ.get('FILES_PAGE_SIZE', '200'))
+FILES_MAX_PAGE_SIZE = 1000
+# Bucket object events are routed to /events/gcs, which then maintains /stats aggregates
+STATS_EVENTS_ENABLED = os.environ.get('STATS_EVENTS_ENABLED', 'false').lower() == 'true'
+
+# /emails - pages of parsed summaries, cached per instance by blob name and object generation
+EMAIL_PAGE_SIZE = int(os.environ.get('EMAIL_PAGE_SIZE', '50'))
+EMAIL_DOWNLOAD_WORKERS = int(os.environ.get('EMAIL_DOWNLOAD_WORKERS', '16'))
+EMAIL_CACHE_SIZE = int(os.environ.get('EMAIL_CACHE_SIZE', '20000'))
+EMAIL_SNIPPET_CHARS = 200
+# /unclassified - pages of emails, headers read from the first bytes of each .eml
+UNCLASSIFIED_PAGE_SIZE = int(os.environ.get('UNCLASSIFIED_PAGE_SIZE', '50'))
+EMAIL_HEADER_BYTES = 8192
+# Bulk /classify - parallel server-side rewrites
+CLASSIFY_WORKERS = int(os.environ.get('CLASSIFY_WORKERS', '8'))
+CLASSIFY_MAX_ITEMS = 500
+# POST /batch - sub-requests per call, and how many run at once
+BATCH_MAX_REQUESTS = 20
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '8'))
+# Per-project monthly email index shards (<prefix>/<project>/<YYYY-MM>.ndjson), appended by the email service
+EMAIL_INDEX_PREFIX = '_email_index'
+EMAIL_INDEX_WRITE_ATTEMPTS = 5
+EMAIL_SHARD_CACHE_SIZE = int(os.environ.get('EMAIL_SHARD_CACHE_SIZE', '2000'))
 
 # File Extensions
-SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt', '.txt', '.html', '.htm', '.csv'}
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp'}
+SUPPORTED_EXTENSIONS = {'.pdf', '.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt', '.txt', '.html', '.htm', '.csv'} | IMAGE_EXTENSIONS
 ARCHIVE_EXTENSIONS = {'.zip'}
 SKIP_EXTENSIONS = {'.dwg', '.dxf', '.dwl', '.dwl2', '.bak', '.tmp', '.rtf'}
 
+# Sync Pipeline (CPU-bound stages run in a process pool)
+PIPELINE_WORKERS = int(os.environ.get('PIPELINE_WORKERS', str(os.cpu_count() or 2)))
+
+# Thumbnails - stored under a parallel prefix, keyed by source md5
+THUMBNAIL_PREFIX = '_thumbs'
+THUMBNAIL_SIZE = int(os.environ.get('THUMBNAIL_SIZE', '320'))
+THUMBNAIL_EXTENSIONS = {'.pdf'} | IMAGE_EXTENSIONS
+
+# Content-addressed dedup - identical content is copied server-side instead of re-uploaded
+CAS_ENABLED = os.environ.get('CAS_ENABLED', 'false').lower() == 'true'
+CAS_PREFIX = '_cas'
+
+# Extracted text - gzip sidecars under a parallel prefix, keyed by source md5
+TEXT_PREFIX = '_text'
+TEXT_EXTENSIONS = {'.pdf', '.docx', '.xlsx'}
+MAX_TEXT_CHARS = int(os.environ.get('MAX_TEXT_CHARS', '2000000'))
+TEXT_CONTEXT_CHARS = int(os.environ.get('TEXT_CONTEXT_CHARS', '3000'))
+
 # Vertex AI Configuration
 PROJECT_ID = "sigma-hq-technical-office"
 LOCATION = "global"
 ENGINE_ID = "sigma-search_1767650825639"
+# Datastore behind ENGINE_ID - incremental indexing after sync is off when unset
+DATA_STORE_ID = os.environ.get('DATA_STORE_ID', '')
+INDEX_BATCH_SIZE = 100  # ImportDocuments accepts at most 100 inline documents
+INDEXABLE_EXTENSIONS = {'.pdf', '.docx', '.pptx', '.xlsx', '.txt', '.html', '.htm'}
+INDEX_JOBS_MAX_LIMIT = 100  # /index-jobs
 
 # Gemini Configuration
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
@@ -8,10 +8,12 @@
 #   routes.py       - HTTP route handlers
 #   services/       - Business logic (sync, search, email)
 #   utils/          - Helpers (document detection, GCS ops)
+#   workers/        - CPU-bound process-pool functions (thumbnails, text)
 
 import functions_framework
 from flask import Flask
 from routes import register_routes
+from utils.compression import init_compression
 
 # Create Flask app
 app = Flask(__name__)
@@ -19,6 +21,9 @@ app = Flask(__name__)
 # Register all routes
 register_routes(app)
 
+# gzip/brotli for JSON responses
+init_compression(app)
+
 # Cloud Functions entry point
 @functions_framework.http
 def main(request):
@@ -1,17 +1,39 @@
 # HTTP Routes
+import re
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
 from flask import jsonify, request, Response
+from werkzeug.test import EnvironBuilder
+from google.api_core.exceptions import NotFound, BadRequest
 
 # Absolute imports from root
-from config import GCS_BUCKET, APP_ID
+from config import (GCS_BUCKET, APP_ID, PROJECT_VIEW_TTL, EMAIL_PAGE_SIZE, UNCLASSIFIED_PAGE_SIZE, CLASSIFY_MAX_ITEMS,
+                    BATCH_MAX_REQUESTS, BATCH_WORKERS, THUMBNAIL_PREFIX, LATEST_PAGE_SIZE, INDEX_JOBS_MAX_LIMIT,
+                    LATEST_INDEX_SIZE)
 from clients import get_bucket, firestore_client, FIRESTORE_ENABLED
-from services.sync import sync_folder, get_project_stats, get_drive_folder_id
+from services.sync import sync_folder, get_drive_folder_id
+from services.stats import get_project_stats, reconcile_stats, list_stats_projects, apply_object_event
 from services.search import search_documents, search_with_ai, generate_summary
-from services.email import get_project_emails
-from utils.document import detect_document_type, get_document_priority, is_approved_folder
-from utils.gcs import list_blobs, list_folders, get_gcs_folder_name
+from services.email import (get_project_emails, get_unclassified, rebuild_email_index,
+                            email_cache, shard_cache, header_cache)
+from services.indexing import get_index_jobs
+from services.folder_tree import get_folder_tree
+from services.files import list_files_page, list_files_sorted, list_files_filtered, page_size_arg
+from services.filters import parse_filter, parse_order, order_entries
+from services.latest import get_latest_page
+from services.overview import get_overview
+from services.generation import get_generation, bump_generation
+from services.classify import classify_one, classify_many
+from utils.document import metadata_cache
+from utils.gcs import get_gcs_folder_name, listing_cache
+from utils.singleflight import single_flight
+from workers.thumbnails import THUMBNAIL_CONTENT_TYPE
 
 # Version - UPDATE THIS ON EVERY CHANGE
-SERVICE_VERSION = '7.7-ecolab-fix'
+SERVICE_VERSION = '7.52-plain-indexable-text'
 
 
 def register_routes(app):
@@ -61,8 +83,27 @@ def register_routes(app):
             return _json_response({'error': 'Project required'}, 400)
         
         gcs_project = get_gcs_folder_name(project)
+        tag = _listing_tag(gcs_project, 'stats')
+        if _not_modified(tag):
+            return _not_modified_response(tag)
         result = get_project_stats(gcs_project)
-        return _json_response(result)
+        return _tagged(_json_response(result), tag)
+    
+    @app.route('/index-jobs', methods=['GET', 'OPTIONS'])
+    def index_jobs():
+        """Recent incremental Vertex AI Search import jobs started by sync"""
+        if request.method == 'OPTIONS':
+            return _cors_response()
+        
+        try:
+            limit = max(1, min(int(request.args.get('limit') or 10), INDEX_JOBS_MAX_LIMIT))
+        except (TypeError, ValueError):
+            return _json_response({'error': 'limit must be a number'}, 400)
+        try:
+            return _json_response({'jobs': get_index_jobs(limit)})
+        except Exception as e:
+            print(f"Error listing index jobs: {e}")
+            return _json_response({'error': str(e)}, 500)
     
     @app.route('/folders', methods=['GET', 'POST', 'OPTIONS'])
     def folders():
@@ -81,9 +122,11 @@ def register_routes(app):
             return _json_response({'error': 'Project required'}, 400)
         
         gcs_project = get_gcs_folder_name(project)
-        prefix = f"{gcs_project}/{path}" if path else f"{gcs_project}/"
-        result = list_folders(prefix)
-        return _json_response({'folders': result})
+        tag = _listing_tag(gcs_project, 'folders', path)
+        if _not_modified(tag):
+            return _not_modified_response(tag)
+        node = get_folder_tree(gcs_project).find(path)
+        return _tagged(_json_response({'folders': node.folder_entries() if node else []}), tag)
     
     @app.route('/files', methods=['GET', 'POST', 'OPTIONS'])
     def files():
@@ -92,53 +135,50 @@ def register_routes(app):
         
         if request.method == 'POST':
             data = request.get_json() or {}
-            project = data.get('project') or data.get('projectName')
-            path = data.get('path') or data.get('folderPath', '')
         else:
-            project = request.args.get('project')
-            path = request.args.get('path', '')
+            data = request.args
+        project = data.get('project') or data.get('projectName')
+        path = data.get('path') or data.get('folderPath', '')
+        page_token = data.get('pageToken')
+        # sort=full: whole folder sorted across pages (folder tree) instead of per page
+        full_sort = data.get('sort') == 'full'
         
         if not project:
             return _json_response({'error': 'Project required'}, 400)
         
-        gcs_project = get_gcs_folder_name(project)
-        prefix = f"{gcs_project}/{path}" if path else f"{gcs_project}/"
-        blobs = list_blobs(prefix)
-        
-        folders = []
-        files = []
-        seen_folders = set()
-        
-        for blob in blobs:
-            rel_path = blob.name[len(prefix):] if blob.name.startswith(prefix) else blob.name
-            
-            if '/' in rel_path:
-                folder_name = rel_path.split('/')[0]
-                if folder_name and folder_name not in seen_folders:
-                    seen_folders.add(folder_name)
-                    folders.append({
-                        'name': folder_name,
-                        'path': f"{prefix}{folder_name}/",
-                        'type': 'folder'
-                    })
-            elif rel_path and not blob.name.endswith('/'):
-                name = rel_path
-                doc_type = detect_document_type(name, blob.name)
-                priority, _ = get_document_priority(name, blob.name)
-                files.append({
-                    'name': name,
-                    'path': blob.name,
-                    'size': blob.size,
-                    'type': doc_type,
-                    'priority': priority,
-                    'approved': is_approved_folder(blob.name),
-                    'updated': blob.updated.isoformat() if blob.updated else None
-                })
-        
-        folders.sort(key=lambda x: x['name'].lower())
-        files.sort(key=lambda x: (-x.get('priority', 0), x['name'].lower()))
+        try:
+            page_size = page_size_arg(data.get('pageSize'))
+        except (TypeError, ValueError):
+            return _json_response({'error': 'pageSize must be a number'}, 400)
+        try:
+            match = parse_filter(data)
+            order = parse_order(data.get('orderBy'))
+        except ValueError as e:
+            return _json_response({'error': str(e)}, 400)
+        recursive = str(data.get('recursive', '')).lower() == 'true'
         
-        return _json_response({'files': folders + files})
+        gcs_project = get_gcs_folder_name(project)
+        tag = _listing_tag(gcs_project, 'files', path, page_size, page_token, full_sort,
+                           match.key(), order, recursive)
+        if _not_modified(tag):
+            return _not_modified_response(tag)
+        if match or order or recursive:
+            try:
+                result = list_files_filtered(gcs_project, path, match, order, page_size, page_token, recursive)
+            except ValueError:
+                return _json_response({'error': 'Invalid pageToken'}, 400)
+        elif full_sort:
+            try:
+                result = list_files_sorted(gcs_project, path, page_size, page_token)
+            except ValueError:
+                return _json_response({'error': 'Invalid pageToken'}, 400)
+        else:
+            try:
+                result = list_files_page(gcs_project, path, page_size, page_token)
+            except (BadRequest, ValueError):
+                # GCS rejects page tokens it didn't issue
+                return _json_response({'error': 'Invalid pageToken'}, 400)
+        return _tagged(_json_response(result), tag)
     
     @app.route('/search', methods=['GET', 'POST', 'OPTIONS'])
     def search():
@@ -190,94 +230,98 @@ def register_routes(app):
         
         if request.method == 'POST':
             data = request.get_json() or {}
-            project = data.get('project') or data.get('projectName')
         else:
-            project = request.args.get('project')
+            data = request.args
+        project = data.get('project') or data.get('projectName')
+        cursor = data.get('cursor')
         
         if not project:
             return _json_response({'error': 'Project required'}, 400)
         
+        try:
+            limit = max(1, int(data.get('limit') or EMAIL_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return _json_response({'error': 'limit must be a number'}, 400)
+        
         gcs_project = get_gcs_folder_name(project)
-        result = get_project_emails(gcs_project)
-        return _json_response({'emails': result})
+        tag = _listing_tag(gcs_project, 'emails', limit, cursor)
+        if _not_modified(tag):
+            return _not_modified_response(tag)
+        result = get_project_emails(gcs_project, limit, cursor)
+        return _tagged(_json_response(result), tag)
     
     @app.route('/latest', methods=['GET', 'POST', 'OPTIONS'])
     def latest():
         if request.method == 'OPTIONS':
             return _cors_response()
         
-        if request.method == 'POST':
-            data = request.get_json() or {}
-            project = data.get('project') or data.get('projectName')
-            doc_type = data.get('type')
-            limit = int(data.get('limit', 10))
-        else:
-            project = request.args.get('project')
-            doc_type = request.args.get('type')
-            limit = int(request.args.get('limit', 10))
+        data = (request.get_json() or {}) if request.method == 'POST' else request.args
+        project = data.get('project') or data.get('projectName')
+        doc_type = data.get('type')
+        page_token = data.get('pageToken')
         
         if not project:
             return _json_response({'error': 'Project required'}, 400)
+        try:
+            # limit: page size for clients that predate paging
+            page_size = page_size_arg(data.get('pageSize') or data.get('limit') or LATEST_PAGE_SIZE)
+            if page_token is not None and int(page_token) < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            return _json_response({'error': 'pageSize and pageToken must be numbers'}, 400)
+        try:
+            match = parse_filter(data)
+            order = parse_order(data.get('orderBy'))
+        except ValueError as e:
+            return _json_response({'error': str(e)}, 400)
         
         gcs_project = get_gcs_folder_name(project)
-        blobs = list_blobs(f"{gcs_project}/")
-        
-        approved = []
-        recent = []
-        
-        for blob in blobs:
-            if blob.name.endswith('/'):
-                continue
-            name = blob.name.split('/')[-1]
-            detected_type = detect_document_type(name, blob.name)
-            
-            if doc_type and detected_type != doc_type:
-                continue
-            
-            priority, _ = get_document_priority(name, blob.name)
-            
-            subject = 'general'
-            revision_str = ''
-            name_lower = name.lower()
-            
-            subjects = ['flooring', 'kitchen', 'bathroom', 'ceiling', 'wall', 'door', 
-                       'window', 'electrical', 'mechanical', 'plumbing', 'fire', 
-                       'furniture', 'signage', 'landscape', 'structure', 'architectural',
-                       'mep', 'interior', 'lighting']
-            for s in subjects:
-                if s in name_lower:
-                    subject = s
-                    break
-            
-            import re
-            rev_match = re.search(r'[_\-\s]?[Rr](?:ev)?\.?\s*(\d+)', name)
-            if rev_match:
-                revision_str = f"R{rev_match.group(1)}"
-            
-            file_data = {
-                'name': name,
-                'path': blob.name.replace(f"{gcs_project}/", ''),
-                'size': blob.size,
-                'type': detected_type,
-                'subject': subject,
-                'revisionStr': revision_str,
-                'priority': priority,
-                'approved': is_approved_folder(blob.name),
-                'updated': blob.updated.isoformat() if blob.updated else None
-            }
-            
-            if is_approved_folder(blob.name):
-                approved.append(file_data)
-            else:
-                recent.append(file_data)
+        tag = _listing_tag(gcs_project, 'latest', doc_type, page_size, page_token, match.key(), order)
+        if _not_modified(tag):
+            return _not_modified_response(tag)
+        result = get_latest_page(gcs_project, doc_type, page_size, page_token, match or None)
+        # orderBy re-sorts each group's page
+        for group in ('approved', 'recent'):
+            result[group] = order_entries(result[group], order)
+        return _tagged(_json_response(result), tag)
+    
+    @app.route('/overview', methods=['GET', 'POST', 'OPTIONS'])
+    def overview():
+        """Dashboard data from one listing pass: stats, latest approved/recent, top-level folders, largest files"""
+        if request.method == 'OPTIONS':
+            return _cors_response()
         
-        approved.sort(key=lambda x: x.get('updated') or '', reverse=True)
-        recent.sort(key=lambda x: x.get('updated') or '', reverse=True)
+        data = (request.get_json() or {}) if request.method == 'POST' else request.args
+        project = data.get('project') or data.get('projectName')
+        if not project:
+            return _json_response({'error': 'Project required'}, 400)
+        try:
+            # Latest lists hold at most LATEST_INDEX_SIZE entries
+            limit = max(1, min(int(data.get('limit') or 10), LATEST_INDEX_SIZE))
+        except (TypeError, ValueError):
+            return _json_response({'error': 'limit must be a number'}, 400)
         
-        return _json_response({
-            'approved': approved[:limit],
-            'recent': recent[:limit]
-        })
+        gcs_project = get_gcs_folder_name(project)
+        tag = _listing_tag(gcs_project, 'overview', limit)
+        if _not_modified(tag):
+            return _not_modified_response(tag)
+        return _tagged(_json_response(get_overview(gcs_project, limit)), tag)
+    
+    @app.route(f'/{THUMBNAIL_PREFIX}/<name>', methods=['GET', 'OPTIONS'])
+    def thumbnail(name):
+        """Stored thumbnail - the 'thumbnail' path listings return. Keyed by content md5, so never stale."""
+        if request.method == 'OPTIONS':
+            return _cors_response()
+        if not THUMBNAIL_NAME.match(name):
+            return _json_response({'error': 'Not found'}, 404)
+        try:
+            data = get_bucket().blob(f"{THUMBNAIL_PREFIX}/{name}").download_as_bytes()
+        except NotFound:
+            return _json_response({'error': 'Not found'}, 404)
+        response = Response(data, mimetype=THUMBNAIL_CONTENT_TYPE)
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
     
     @app.route('/unclassified', methods=['GET', 'OPTIONS'])
     def unclassified():
@@ -286,28 +330,13 @@ def register_routes(app):
             return _cors_response()
         
         try:
-            blobs = list_blobs("_Unclassified_Emails/")
-            emails = []
-            
-            for blob in blobs:
-                if blob.name.endswith('/'):
-                    continue
-                name = blob.name.split('/')[-1]
-                
-                emails.append({
-                    'id': blob.name.replace('/', '_'),
-                    'name': name,
-                    'path': blob.name,
-                    'subject': name.replace('.eml', '').replace('_', ' ')[:50],
-                    'from': 'Unknown',
-                    'date': blob.updated.isoformat() if blob.updated else None,
-                    'type': 'correspondence',
-                    'typeLabel': 'General',
-                    'hasAttachments': False
-                })
-            
-            emails.sort(key=lambda x: x.get('date') or '', reverse=True)
-            return _json_response({'emails': emails})
+            limit = max(1, int(request.args.get('limit') or UNCLASSIFIED_PAGE_SIZE))
+        except ValueError:
+            return _json_response({'error': 'limit must be a number'}, 400)
+        
+        try:
+            result = get_unclassified(limit, request.args.get('cursor'))
+            return _json_response(result)
         except Exception as e:
             print(f"Error getting unclassified: {e}")
             return _json_response({'emails': [], 'error': str(e)})
@@ -321,31 +350,69 @@ def register_routes(app):
         data = request.get_json() or {}
         path = data.get('path')
         project = data.get('project')
-        doc_type = data.get('type', 'correspondence')
         
         if not path or not project:
             return _json_response({'error': 'Path and project required'}, 400)
         
         try:
-            bucket = get_bucket()
-            source_blob = bucket.blob(path)
-            
-            if not source_blob.exists():
-                return _json_response({'error': 'File not found'}, 404)
-            
-            gcs_project = get_gcs_folder_name(project)
-            filename = path.split('/')[-1]
-            dest_path = f"{gcs_project}/09-Correspondence/{filename}"
-            
-            dest_blob = bucket.blob(dest_path)
-            dest_blob.rewrite(source_blob)
-            source_blob.delete()
-            
+            dest_path = classify_one(path, project)
             return _json_response({'success': True, 'newPath': dest_path})
+        except NotFound:
+            return _json_response({'error': 'File not found'}, 404)
         except Exception as e:
             print(f"Error classifying: {e}")
             return _json_response({'error': str(e)}, 500)
     
+    @app.route('/classify/bulk', methods=['POST', 'OPTIONS'])
+    def classify_bulk():
+        """Classify/move many emails: {'items': [{'path', 'project'}]} -> per-item results"""
+        if request.method == 'OPTIONS':
+            return _cors_response()
+        
+        items = (request.get_json() or {}).get('items')
+        if not isinstance(items, list) or not items:
+            return _json_response({'error': 'items required'}, 400)
+        if len(items) > CLASSIFY_MAX_ITEMS:
+            return _json_response({'error': f'At most {CLASSIFY_MAX_ITEMS} items per request'}, 400)
+        if not all(isinstance(item, dict) for item in items):
+            return _json_response({'error': 'Each item must be an object'}, 400)
+        if any('type' in item for item in items):
+            # Emails always move to the project's 09-Correspondence folder
+            return _json_response({'error': 'type is not supported - items take path and project'}, 400)
+        
+        results = classify_many(items)
+        moved = sum(1 for r in results if r['success'])
+        return _json_response({'moved': moved, 'failed': len(results) - moved, 'results': results})
+    
+    @app.route('/batch', methods=['POST', 'OPTIONS'])
+    def batch():
+        """
+        Several read-only GET routes in one round trip, run concurrently:
+        {'requests': [{'id', 'path', 'params', 'etag'}]} -> {'responses': {id: {'status', 'etag', 'body'}}}
+        Sub-requests share this instance's caches and in-flight calls. A sub-request whose
+        etag still matches gets status 304 and no body, like a conditional GET.
+        """
+        if request.method == 'OPTIONS':
+            return _cors_response()
+        
+        subs = (request.get_json() or {}).get('requests')
+        if not isinstance(subs, list) or not subs:
+            return _json_response({'error': 'requests required'}, 400)
+        if len(subs) > BATCH_MAX_REQUESTS:
+            return _json_response({'error': f'At most {BATCH_MAX_REQUESTS} requests per batch'}, 400)
+        for sub in subs:
+            if not isinstance(sub, dict) or not sub.get('id') or sub.get('path') not in BATCH_PATHS:
+                return _json_response({'error': f'Each request needs an id and one of: {", ".join(sorted(BATCH_PATHS))}'}, 400)
+            if not isinstance(sub.get('params') or {}, dict):
+                return _json_response({'error': 'params must be an object'}, 400)
+        ids = [str(sub['id']) for sub in subs]
+        if len(set(ids)) != len(ids):
+            return _json_response({'error': 'Request ids must be unique'}, 400)
+        
+        with ThreadPoolExecutor(max_workers=min(BATCH_WORKERS, len(subs))) as pool:
+            responses = list(pool.map(lambda sub: _run_subrequest(app, sub), subs))
+        return _json_response({'responses': dict(zip(ids, responses))})
+    
     # ============ ADMIN ENDPOINTS ============
     
     @app.route('/admin/fix-gcs-mapping', methods=['POST', 'OPTIONS'])
@@ -398,6 +465,84 @@ def register_routes(app):
             print(f"Error fixing GCS mapping: {e}")
             return _json_response({'error': str(e)}, 500)
     
+    @app.route('/events/gcs', methods=['POST'])
+    def gcs_event():
+        """Eventarc Cloud Storage object events - keeps /stats aggregates current"""
+        event_type = request.headers.get('ce-type', '')
+        obj = request.get_json(silent=True) or {}
+        try:
+            project = apply_object_event(event_type, obj)
+            if project:
+                bump_generation(project)
+        except Exception as e:
+            print(f"GCS event error ({obj.get('name')}): {e}")
+            # Let Eventarc retry
+            return _json_response({'error': str(e)}, 500)
+        return _json_response({'ok': True})
+    
+    @app.route('/admin/reconcile-stats', methods=['POST', 'OPTIONS'])
+    def reconcile_stats_route():
+        """Recompute /stats aggregates from GCS (run periodically by Cloud Scheduler)"""
+        if request.method == 'OPTIONS':
+            return _cors_response()
+        
+        data = request.get_json(silent=True) or {}
+        project = data.get('project') or data.get('projectName')
+        projects = [get_gcs_folder_name(project)] if project else list_stats_projects()
+        
+        results = {}
+        for name in projects:
+            try:
+                stats = reconcile_stats(name)
+                results[name] = {'fileCount': stats['fileCount'], 'totalSize': stats['totalSize']}
+            except Exception as e:
+                print(f"Stats reconcile error ({name}): {e}")
+                results[name] = {'error': str(e)}
+        return _json_response({'reconciled': results})
+    
+    @app.route('/admin/rebuild-email-index', methods=['POST', 'OPTIONS'])
+    def rebuild_email_index_route():
+        """Backfill a project's email index shards from its stored emails"""
+        if request.method == 'OPTIONS':
+            return _cors_response()
+        
+        data = request.get_json(silent=True) or {}
+        project = data.get('project') or data.get('projectName')
+        if not project:
+            return _json_response({'error': 'Project required'}, 400)
+        
+        gcs_project = get_gcs_folder_name(project)
+        try:
+            months = rebuild_email_index(gcs_project)
+            bump_generation(gcs_project)
+            return _json_response({'project': gcs_project, 'shards': months})
+        except Exception as e:
+            print(f"Email index rebuild error ({gcs_project}): {e}")
+            return _json_response({'error': str(e)}, 500)
+    
+    @app.route('/admin/cache-stats', methods=['GET', 'OPTIONS'])
+    def cache_stats():
+        """Hit/miss counters of the in-memory caches and calls saved by request coalescing"""
+        if request.method == 'OPTIONS':
+            return _cors_response()
+        
+        if request.args.get('clear') == 'true':
+            metadata_cache.clear()
+            listing_cache.clear()
+            email_cache.clear()
+            shard_cache.clear()
+            header_cache.clear()
+            single_flight.clear()
+        
+        return _json_response({
+            'metadata': metadata_cache.stats(),
+            'listing': listing_cache.stats(),
+            'emails': email_cache.stats(),
+            'emailShards': shard_cache.stats(),
+            'emailHeaders': header_cache.stats(),
+            'singleFlight': single_flight.stats()
+        })
+    
     @app.route('/admin/list-gcs-folders', methods=['GET', 'OPTIONS'])
     def list_gcs_folders():
         """List all root folders in GCS bucket"""
@@ -471,7 +616,7 @@ def _cors_response():
     response = Response()
     response.headers['Access-Control-Allow-Origin'] = '*'
     response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, If-None-Match'
     return response
 
 
@@ -481,3 +626,61 @@ def _json_response(data, status=200):
     response.headers['Access-Control-Allow-Origin'] = '*'
     response.status_code = status
     return response
+
+
+def _listing_tag(project, *params):
+    """
+    ETag value for a project listing: the project's generation plus everything that
+    shapes the response. The PROJECT_VIEW_TTL window is part of it so a tag expires
+    with the in-memory views, for writes that don't bump the generation.
+    """
+    key = [SERVICE_VERSION, project, get_generation(project), int(time.time() // PROJECT_VIEW_TTL), *params]
+    return hashlib.sha1(json.dumps(key, default=str).encode('utf-8')).hexdigest()[:24]
+
+
+def _not_modified(tag):
+    """Client already holds this version (If-None-Match)"""
+    return request.if_none_match.contains_weak(tag)
+
+
+def _not_modified_response(tag):
+    """304 for a matching If-None-Match - no listing work done"""
+    response = Response(status=304)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return _tagged(response, tag)
+
+
+def _tagged(response, tag):
+    """Attach the listing ETag; clients revalidate instead of reusing it blindly"""
+    response.set_etag(tag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Access-Control-Expose-Headers'] = 'ETag'
+    return response
+
+
+# Thumbnail object names: hex md5 of the source content
+THUMBNAIL_NAME = re.compile(r'^[0-9a-f]{32}\.webp$')
+
+
+# Routes /batch may call - read-only ones the project screens load together
+BATCH_PATHS = {'/overview', '/stats', '/folders', '/files', '/latest', '/emails', '/unclassified', '/search', '/index-jobs'}
+
+
+def _run_subrequest(app, sub):
+    """
+    One /batch sub-request, dispatched through the app in its own request context
+    (a worker thread) as a plain GET - JSON, uncompressed. Returns {'status', 'etag', 'body'}.
+    """
+    headers = {'If-None-Match': f'W/"{sub["etag"]}"'} if sub.get('etag') else {}
+    builder = EnvironBuilder(path=sub['path'], method='GET', query_string=sub.get('params') or {}, headers=headers)
+    try:
+        with app.request_context(builder.get_environ()):
+            response = app.full_dispatch_request()
+            body = response.get_json(silent=True) if response.status_code != 304 else None
+            etag = response.get_etag()[0]
+    except Exception as e:
+        print(f"Batch sub-request {sub['path']} failed: {e}")
+        return {'status': 500, 'etag': None, 'body': {'error': str(e)}}
+    finally:
+        builder.close()
+    return {'status': response.status_code, 'etag': etag, 'body': body}
@@ -1,14 +1,19 @@
 # Services package
-from services.sync import sync_folder, get_project_stats, get_drive_folder_id
+from services.sync import sync_folder, get_drive_folder_id
+from services.stats import get_project_stats, reconcile_stats
 from services.search import search_documents, search_with_ai
 from services.email import classify_email, get_project_emails
+from services.indexing import index_changes, get_index_jobs
 
 __all__ = [
     'sync_folder',
     'get_project_stats',
+    'reconcile_stats',
     'get_drive_folder_id',
     'search_documents',
     'search_with_ai',
     'classify_email',
-    'get_project_emails'
+    'get_project_emails',
+    'index_changes',
+    'get_index_jobs'
 ]
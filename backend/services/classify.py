@@ -0,0 +1,146 @@
+# Email Classify/Move
+# Moves emails (usually from the unclassified folder) into a project's correspondence
+# folder with server-side rewrites. The source's encoding and metadata come from the
+# (cached) listing of its folder, not a per-object read, and a missing source surfaces
+# as NotFound from the rewrite itself. Bulk moves run the rewrites in parallel, delete
+# the sources in batched requests, and bump generations and stats once per project
+# at the end.
+from concurrent.futures import ThreadPoolExecutor
+
+from google.api_core.exceptions import NotFound
+
+from config import CLASSIFY_WORKERS, STATS_EVENTS_ENABLED
+from clients import get_bucket, storage_client
+from services.email import UNCLASSIFIED_PREFIX
+from services.generation import bump_generation
+from services.stats import StatsDelta
+from utils.document import document_metadata, metadata_fields
+from utils.gcs import content_type_for, get_gcs_folder_name, list_blobs
+
+DELETE_BATCH_SIZE = 100  # GCS batch requests take at most 100 calls
+
+
+def destination_path(gcs_project, path):
+    return f"{gcs_project}/09-Correspondence/{path.split('/')[-1]}"
+
+
+def _listed_sources(paths):
+    """Listing records of the objects at paths, by name - one cached listing per parent folder"""
+    folders = {path.rsplit('/', 1)[0] + '/' for path in paths if '/' in path}
+    return {blob.name: blob for folder in folders for blob in list_blobs(folder)}
+
+
+def copy_to_project(bucket, path, gcs_project, listed=None):
+    """
+    Rewrite an object to the project's correspondence folder. Raises NotFound if the source is gone.
+    listed: the source's listing record. The copy then gets the destination's classification in
+    its metadata; without one the rewrite copies the source's properties as they are.
+    Returns (destination blob, size in bytes).
+    """
+    dest_path = destination_path(gcs_project, path)
+    source = bucket.blob(path)
+    dest = bucket.blob(dest_path)
+    if listed is not None:
+        # Classification depends on the path - store the destination's with the copy.
+        # Properties sent with the rewrite replace the source's - carry the rest over
+        # (gzip-stored text keeps its Content-Encoding and sourceMd5).
+        dest.content_type = content_type_for(dest_path)
+        dest.content_encoding = listed.content_encoding
+        dest.metadata = {**(listed.metadata or {}), **metadata_fields(document_metadata(dest_path))}
+    token, _, size = dest.rewrite(source)
+    while token:
+        # Large or cross-location objects take several rewrite calls
+        token, _, size = dest.rewrite(source, token=token)
+    return dest, size
+
+
+def _delete_sources(bucket, paths):
+    """Delete in batched requests. Returns {path: error message} for the ones that failed."""
+    errors = {}
+    for i in range(0, len(paths), DELETE_BATCH_SIZE):
+        chunk = paths[i:i + DELETE_BATCH_SIZE]
+        try:
+            with storage_client.batch():
+                for path in chunk:
+                    bucket.blob(path).delete()
+        except Exception:
+            # A batch fails as a whole - redo it one by one to know which ones failed
+            for path in chunk:
+                try:
+                    bucket.blob(path).delete()
+                except NotFound:
+                    pass
+                except Exception as e:
+                    errors[path] = str(e)
+    return errors
+
+
+def _finish(moved):
+    """Generations and stats for completed moves: [(dest path, size)] by project"""
+    for gcs_project, entries in moved.items():
+        if not STATS_EVENTS_ENABLED:
+            stats = StatsDelta(gcs_project)
+            for dest_path, size in entries:
+                stats.add(dest_path, size, document_metadata(dest_path))
+            try:
+                stats.apply()
+            except Exception as e:
+                print(f"Stats update error ({gcs_project}): {e}")
+        bump_generation(gcs_project)
+    if moved:
+        # Cached listings of the unclassified folder go by its own generation
+        bump_generation(UNCLASSIFIED_PREFIX.rstrip('/'))
+
+
+def classify_one(path, project):
+    """Move one email. Returns the new path; raises NotFound if the source is gone."""
+    bucket = get_bucket()
+    gcs_project = get_gcs_folder_name(project)
+    dest, size = copy_to_project(bucket, path, gcs_project, _listed_sources([path]).get(path))
+    bucket.blob(path).delete()
+    _finish({gcs_project: [(dest.name, size)]})
+    return dest.name
+
+
+def classify_many(items):
+    """
+    Move many emails. items: [{'path', 'project'}] - all go to 09-Correspondence.
+    Returns one result per item, in order: {'path', 'success', 'newPath'} or {'path', 'success': False, 'error'}.
+    """
+    bucket = get_bucket()
+    results = [{'path': item.get('path'), 'success': False} for item in items]
+    listed = _listed_sources([item['path'] for item in items if isinstance(item.get('path'), str)])
+
+    def move(i):
+        item = items[i]
+        if not item.get('path') or not item.get('project'):
+            results[i]['error'] = 'Path and project required'
+            return None
+        gcs_project = get_gcs_folder_name(item['project'])
+        try:
+            dest, size = copy_to_project(bucket, item['path'], gcs_project, listed.get(item['path']))
+        except NotFound:
+            results[i]['error'] = 'File not found'
+            return None
+        except Exception as e:
+            results[i]['error'] = str(e)
+            return None
+        results[i].update(success=True, newPath=dest.name)
+        return gcs_project, dest.name, size
+
+    with ThreadPoolExecutor(max_workers=CLASSIFY_WORKERS) as pool:
+        copies = list(pool.map(move, range(len(items))))
+
+    copied = [i for i, copy in enumerate(copies) if copy]
+    delete_errors = _delete_sources(bucket, [items[i]['path'] for i in copied])
+
+    moved = {}
+    for i in copied:
+        gcs_project, dest_path, size = copies[i]
+        error = delete_errors.get(items[i]['path'])
+        if error:
+            # Copied but the original is still there - report it, it may be retried
+            results[i]['deleteError'] = error
+        moved.setdefault(gcs_project, []).append((dest_path, size))
+    _finish(moved)
+    return results
@@ -0,0 +1,72 @@
+# Content-Addressed Dedup
+# The same spec PDFs, standard details and attachments appear in many project
+# folders. Each unique content hash is recorded once under _cas/<md5>, pointing at
+# an object that already holds those bytes; further copies are made with a
+# server-side rewrite instead of downloading from Drive and uploading again.
+from config import CAS_PREFIX
+from utils.gcs import blob_md5_hex
+
+
+class DedupIndex:
+    """Hash -> stored object lookup for one sync run (backed by _cas/ markers)"""
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self._sources = {}
+        self.stats = {'copied': 0, 'recorded': 0}
+
+    def _marker(self, md5_hex):
+        return self.bucket.blob(f"{CAS_PREFIX}/{md5_hex}")
+
+    def lookup(self, md5_hex):
+        """Return a blob whose content has this md5, or None"""
+        source = self._sources.get(md5_hex)
+        if not source:
+            marker = self.bucket.get_blob(f"{CAS_PREFIX}/{md5_hex}")
+            source = (marker.metadata or {}).get('path') if marker else None
+        if not source:
+            return None
+
+        blob = self.bucket.get_blob(source)
+        # The source may have been deleted or overwritten since it was recorded
+        if not blob or blob_md5_hex(blob) != md5_hex:
+            self._sources.pop(md5_hex, None)
+            return None
+        self._sources[md5_hex] = source
+        return blob
+
+    def copy_to(self, md5_hex, gcs_path, metadata=None):
+        """
+        Create gcs_path from already-stored content. Returns the blob, or None on a miss.
+        metadata replaces the source's path-specific custom metadata on the copy.
+        """
+        if not md5_hex:
+            return None
+        source = self.lookup(md5_hex)
+        if source is None:
+            return None
+        if source.name == gcs_path:
+            return source
+
+        dest = self.bucket.blob(gcs_path)
+        if metadata:
+            # Properties sent with the rewrite replace the source's - carry the rest over
+            dest.content_type = source.content_type
+            dest.content_encoding = source.content_encoding
+            dest.metadata = {**(source.metadata or {}), **metadata}
+        token, _, _ = dest.rewrite(source)
+        while token:
+            token, _, _ = dest.rewrite(source, token=token)
+        self.stats['copied'] += 1
+        return dest
+
+    def record(self, md5_hex, gcs_path):
+        """Remember that gcs_path holds this content (first copy wins)"""
+        if md5_hex in self._sources:
+            return
+        self._sources[md5_hex] = gcs_path
+        # Overwrite unconditionally - an existing marker may point at a stale source
+        marker = self._marker(md5_hex)
+        marker.metadata = {'path': gcs_path}
+        marker.upload_from_string(b'')
+        self.stats['recorded'] += 1
@@ -1,11 +1,25 @@
 # Email Classification Service
 import re
+import gzip
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from email import policy
+from email.parser import BytesHeaderParser
+from email.utils import parsedate_to_datetime
 
 # Absolute imports
+from google.api_core.exceptions import PreconditionFailed
+
+from config import (EMAIL_PAGE_SIZE, EMAIL_DOWNLOAD_WORKERS, EMAIL_CACHE_SIZE, EMAIL_SHARD_CACHE_SIZE,
+                    EMAIL_SNIPPET_CHARS, EMAIL_INDEX_PREFIX, EMAIL_INDEX_WRITE_ATTEMPTS,
+                    UNCLASSIFIED_PAGE_SIZE, EMAIL_HEADER_BYTES, GZIP_MIN_BYTES)
 from clients import get_bucket
-from utils.gcs import detect_folder_structure
+from utils.gcs import detect_folder_structure, list_blobs
+
+UNCLASSIFIED_PREFIX = '_Unclassified_Emails/'
 
 
 def classify_email(subject, body, sender, projects, gemini_model=None):
@@ -66,30 +80,339 @@ Return JSON: {{"project": "name or unclassified", "confidence": 0.0-1.0}}"""
     return {'project': None, 'confidence': 0, 'method': 'none', 'gcsFolderName': None}
 
 
-def get_project_emails(project_name):
-    """Get emails for a project from GCS"""
-    bucket = get_bucket()
+class ParsedObjectCache:
+    """LRU of values parsed from GCS objects, keyed by (blob name, object generation)"""
+    
+    def __init__(self, load, maxsize):
+        self.load = load  # (bucket, blob name) -> value, or None if unreadable
+        self.maxsize = maxsize
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_many(self, blobs):
+        """Values for listed blobs, downloading the misses in parallel (unreadable ones are left out)"""
+        values = self._values_for(blobs)
+        return [values[(blob.name, blob.generation)] for blob in blobs if (blob.name, blob.generation) in values]
+    
+    def get_by_name(self, blobs):
+        """{blob name: value} for listed blobs (unreadable ones are left out)"""
+        return {name: value for (name, _), value in self._values_for(blobs).items()}
+    
+    def _values_for(self, blobs):
+        keys = [(blob.name, blob.generation) for blob in blobs]
+        values = {}
+        with self._lock:
+            for key in keys:
+                value = self._values.get(key)
+                if value is not None:
+                    self._values.move_to_end(key)
+                    values[key] = value
+            self.hits += len(values)
+            self.misses += len(keys) - len(values)
+        
+        missing = [key for key in keys if key not in values]
+        if missing:
+            bucket = get_bucket()
+            with ThreadPoolExecutor(max_workers=EMAIL_DOWNLOAD_WORKERS) as pool:
+                loaded = list(zip(missing, pool.map(lambda key: self.load(bucket, key[0]), missing)))
+            with self._lock:
+                for key, value in loaded:
+                    if value is None:
+                        continue
+                    values[key] = self._values[key] = value
+                    self._values.move_to_end(key)
+                while len(self._values) > self.maxsize:
+                    self._values.popitem(last=False)
+        return values
     
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._values),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+def email_type(path):
+    """Document type an email is filed under: 09-Correspondence/<TYPE>/... or 01.Correspondence/Client/<TYPE>/..."""
+    parts = path.split('/')
+    return parts[-2].lower() if len(parts) > 2 else 'correspondence'
+
+
+def email_summary(path, data):
+    """
+    /emails entry - the same shape whether it comes from the email object or an
+    index shard record: id, subject, sender, date, type, path, snippet.
+    """
+    if 'body' in data:
+        snippet = ' '.join((data.get('body') or '').split())[:EMAIL_SNIPPET_CHARS]
+    else:
+        snippet = data.get('snippet') or ''
+    return {
+        'id': data.get('id'),
+        'subject': data.get('subject'),
+        'sender': data.get('sender'),
+        'date': data.get('date') or None,
+        'type': email_type(path),
+        'path': path,
+        'snippet': snippet
+    }
+
+
+def _load_summary(bucket, name):
+    try:
+        return email_summary(name, json.loads(bucket.blob(name).download_as_text()))
+    except Exception as e:
+        print(f"Error reading email {name}: {e}")
+        return None
+
+
+def _load_shard(bucket, name):
+    try:
+        text = bucket.blob(name).download_as_text()
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    except Exception as e:
+        print(f"Error reading email index {name}: {e}")
+        return None
+
+
+email_cache = ParsedObjectCache(_load_summary, EMAIL_CACHE_SIZE)
+shard_cache = ParsedObjectCache(_load_shard, EMAIL_SHARD_CACHE_SIZE)
+
+
+def _email_sort_key(summary):
+    return summary.get('date') or '', summary['path']
+
+
+def _parse_cursor(cursor):
+    """nextCursor ('<date>|<path>' of a page's last email) -> sort key, or None"""
+    if not cursor:
+        return None
+    date, _, path = cursor.partition('|')
+    return date, path
+
+
+def _email_page(emails, limit, cursor_key):
+    """Newest-first page of summaries after the cursor"""
+    emails = sorted((e for e in emails if not cursor_key or _email_sort_key(e) < cursor_key),
+                    key=_email_sort_key, reverse=True)
+    page = emails[:limit]
+    next_cursor = '|'.join(_email_sort_key(page[-1])) if len(emails) > limit else None
+    return {'emails': page, 'nextCursor': next_cursor}
+
+
+UNDATED_SHARD = 'undated'
+BACKFILL_MARKER = '_backfilled'
+
+
+def _index_shards(project_name):
+    """
+    The project's index shards - monthly ones newest first, then the undated one -
+    and whether the backfill of emails saved before the index has completed.
+    """
+    prefix = f"{EMAIL_INDEX_PREFIX}/{project_name}/"
+    blobs = list(get_bucket().list_blobs(prefix=prefix, fields='items(name,generation),nextPageToken'))
+    shards = [b for b in blobs if b.name.endswith('.ndjson')]
+    dated = sorted((b for b in shards if _shard_month(b) != UNDATED_SHARD), key=lambda b: b.name, reverse=True)
+    undated = [b for b in shards if _shard_month(b) == UNDATED_SHARD]
+    complete = any(b.name == prefix + BACKFILL_MARKER for b in blobs)
+    return dated + undated, complete
+
+
+def _shard_month(shard):
+    return shard.name.rsplit('/', 1)[-1][:-len('.ndjson')]
+
+
+def _date_shard(date):
+    """Shard for an email date: its month, or the undated shard unless it is an ISO date (as the email service files them)"""
+    try:
+        datetime.fromisoformat(date)
+    except (TypeError, ValueError):
+        return UNDATED_SHARD
+    return date[:7]
+
+
+def _legacy_summaries(project_name):
+    """Summaries from the email objects themselves (projects without an index)"""
     # Check both OLD and NEW correspondence folders
     prefixes = [
         f"{project_name}/01.Correspondence/",  # NEW
         f"{project_name}/09-Correspondence/",  # OLD
     ]
+    blobs = [b for prefix in prefixes for b in list_blobs(prefix) if b.name.endswith('.json')]
+    return email_cache.get_many(blobs)
+
+
+def get_project_emails(project_name, limit=EMAIL_PAGE_SIZE, cursor=None):
+    """
+    A page of a project's emails, newest first, as summaries.
+    cursor: nextCursor of the previous page ('<date>|<path>' of its last email).
+    Returns {'emails': [...], 'nextCursor': str or None}.
+    
+    Read from the project's monthly index shards (written by the email service at
+    save time) - newest month first, stopping once the page is full, since every
+    older shard only holds older emails; undated emails come last. Until
+    rebuild_email_index has backfilled the emails saved before the index, the
+    shards are incomplete and every email object is read instead.
+    """
+    cursor_key = _parse_cursor(cursor)
+    shards, complete = _index_shards(project_name)
+    if not complete:
+        return _email_page(_legacy_summaries(project_name), limit, cursor_key)
+    
+    emails = {}
+    for shard in shards:
+        month = _shard_month(shard)
+        if cursor_key and month != UNDATED_SHARD and month > cursor_key[0][:7]:
+            continue
+        for record in (shard_cache.get_many([shard]) or [[]])[0]:
+            summary = email_summary(record['path'], record)
+            if not cursor_key or _email_sort_key(summary) < cursor_key:
+                emails[summary['path']] = summary
+        if len(emails) > limit:
+            break
+    return _email_page(emails.values(), limit, cursor_key)
+
+
+def rebuild_email_index(project_name):
+    """
+    Add every stored email of a project to its index shards (backfill for emails
+    saved before the index existed) - emails without an ISO date go to the undated shard.
+    Merges with records already in the shards; each write is conditional on the
+    shard's generation and retried on conflict. Once every shard is written the
+    project is marked as backfilled and /emails reads only the shards.
+    Returns {month or 'undated': record count}.
+    """
+    bucket = get_bucket()
+    by_month = {}
+    for summary in _legacy_summaries(project_name):
+        month = _date_shard(summary['date'])
+        if month == UNDATED_SHARD:
+            # Listed after every dated email, like the records the email service writes
+            summary = dict(summary, date=None)
+        by_month.setdefault(month, {})[summary['path']] = summary
+    
+    counts = {}
+    for month, records in by_month.items():
+        name = f"{EMAIL_INDEX_PREFIX}/{project_name}/{month}.ndjson"
+        for _ in range(EMAIL_INDEX_WRITE_ATTEMPTS):
+            blob = bucket.get_blob(name)
+            merged = dict(records)
+            generation = 0
+            if blob is not None:
+                generation = blob.generation
+                for record in _load_shard(bucket, name) or []:
+                    merged.setdefault(record['path'], record)
+            data = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in merged.values()).encode('utf-8')
+            target = bucket.blob(name)
+            if len(data) >= GZIP_MIN_BYTES:
+                target.content_encoding = 'gzip'
+                data = gzip.compress(data, mtime=0)
+            try:
+                target.upload_from_string(data, content_type='application/x-ndjson', if_generation_match=generation)
+                counts[month] = len(merged)
+                break
+            except PreconditionFailed:
+                continue
+        else:
+            raise RuntimeError(f'{name}: gave up after {EMAIL_INDEX_WRITE_ATTEMPTS} conflicting writes')
     
-    emails = []
-    for prefix in prefixes:
-        blobs = list(bucket.list_blobs(prefix=prefix))
-        for blob in blobs:
-            if blob.name.endswith('.json'):
-                try:
-                    data = json.loads(blob.download_as_text())
-                    emails.append(data)
-                except:
-                    pass
-    
-    # Sort by date descending
-    emails.sort(key=lambda x: x.get('date', ''), reverse=True)
-    return emails
+    bucket.blob(f"{EMAIL_INDEX_PREFIX}/{project_name}/{BACKFILL_MARKER}").upload_from_string(
+        datetime.utcnow().isoformat(), content_type='text/plain')
+    return counts
+
+
+def parse_email_headers(data):
+    """
+    Subject/From/Date of a raw email from its first bytes - the header block ends at
+    the first blank line; a block cut off by the ranged read is parsed as far as it goes.
+    """
+    end = data.find(b'\r\n\r\n')
+    if end == -1:
+        end = data.find(b'\n\n')
+    message = BytesHeaderParser(policy=policy.default).parsebytes(data[:end] if end != -1 else data)
+    
+    headers = {}
+    for field in ('subject', 'from'):
+        try:
+            value = message[field]
+            if value:
+                headers[field] = ' '.join(str(value).split())
+        except Exception:
+            pass
+    try:
+        headers['date'] = parsedate_to_datetime(str(message['date'])).isoformat()
+    except Exception:
+        pass
+    headers['hasAttachments'] = message.get_content_type() == 'multipart/mixed'
+    return headers
+
+
+def _load_headers(bucket, name):
+    if not name.lower().endswith('.eml'):
+        return {}
+    try:
+        return parse_email_headers(bucket.blob(name).download_as_bytes(start=0, end=EMAIL_HEADER_BYTES - 1))
+    except Exception as e:
+        print(f"Error reading headers of {name}: {e}")
+        return None
+
+
+header_cache = ParsedObjectCache(_load_headers, EMAIL_CACHE_SIZE)
+
+
+def unclassified_entry(blob, headers=None):
+    """/unclassified entry for an email waiting in UNCLASSIFIED_PREFIX (headers: parse_email_headers)"""
+    headers = headers or {}
+    name = blob.name.split('/')[-1]
+    return {
+        'id': blob.name.replace('/', '_'),
+        'name': name,
+        'path': blob.name,
+        'subject': headers.get('subject') or name.replace('.eml', '').replace('_', ' ')[:50],
+        'from': headers.get('from') or 'Unknown',
+        'date': headers.get('date') or (blob.updated.isoformat() if blob.updated else None),
+        'type': 'correspondence',
+        'typeLabel': 'General',
+        'hasAttachments': headers.get('hasAttachments', False)
+    }
+
+
+def _stored_key(blob):
+    return blob.updated.isoformat() if blob.updated else '', blob.name
+
+
+def get_unclassified(limit=UNCLASSIFIED_PAGE_SIZE, cursor=None):
+    """
+    A page of unclassified emails, newest stored first.
+    Only the page's emails are read - a ranged read of their first EMAIL_HEADER_BYTES,
+    in parallel, cached by object generation.
+    cursor: nextCursor of the previous page. Returns {'emails', 'nextCursor', 'total'}.
+    """
+    blobs = sorted((b for b in list_blobs(UNCLASSIFIED_PREFIX) if not b.name.endswith('/')),
+                   key=_stored_key, reverse=True)
+    total = len(blobs)
+    cursor_key = _parse_cursor(cursor)
+    if cursor_key:
+        blobs = [b for b in blobs if _stored_key(b) < cursor_key]
+    page = blobs[:limit]
+    headers = header_cache.get_by_name(page)
+    return {
+        'emails': [unclassified_entry(blob, headers.get(blob.name)) for blob in page],
+        'nextCursor': '|'.join(_stored_key(page[-1])) if len(blobs) > limit else None,
+        'total': total
+    }
 
 
 def detect_email_type(subject, body=''):
@@ -0,0 +1,78 @@
+# Folder Listings (/files)
+# Default: one page of a single-level delimiter listing - GCS returns only the
+# folder's own files and sub-folder prefixes, with a name/size/updated projection,
+# so a folder of thousands of scans is served a page at a time. The cursor is the
+# GCS page token (lexicographic, stable across requests). Each page is sorted the
+# same way as the full listing: folders first, then files by priority and name.
+# Full-sort mode serves the whole folder, sorted across pages, from the folder tree.
+# Filtered/ordered listings (services.filters) are served from the tree the same way.
+from config import FILES_PAGE_SIZE, FILES_MAX_PAGE_SIZE
+from services.filters import order_entries
+from services.folder_tree import get_folder_tree, cached_folder_tree, file_entry, file_sort_key
+from utils.document import classify_blobs
+from utils.gcs import list_folder_page
+
+
+def page_size_arg(value):
+    """pageSize request value -> int within 1..FILES_MAX_PAGE_SIZE (None = default)"""
+    if value in (None, ''):
+        return FILES_PAGE_SIZE
+    return max(1, min(int(value), FILES_MAX_PAGE_SIZE))
+
+
+def _offset_page(entries, page_size, page_token):
+    """Offset paging over a computed listing - the token is the offset of the next entry"""
+    if not page_size:
+        return {'files': entries, 'nextPageToken': None}
+    offset = max(0, int(page_token or 0))
+    end = offset + page_size
+    return {'files': entries[offset:end], 'nextPageToken': str(end) if end < len(entries) else None}
+
+
+def _folder_prefix(project, path):
+    path = path.strip('/')
+    return f"{project}/{path}/" if path else f"{project}/"
+
+
+def list_files_page(project, path='', page_size=FILES_PAGE_SIZE, page_token=None):
+    """One page of a folder's sub-folders and files: {'files': [...], 'nextPageToken': str or None}"""
+    blobs, prefixes, next_token = list_folder_page(_folder_prefix(project, path), page_size, page_token)
+
+    # Recursive counts come from the folder tree when one is already in memory
+    tree = cached_folder_tree(project)
+    folders = []
+    for prefix in sorted(prefixes, key=lambda p: p.lower()):
+        entry = {'name': prefix.rstrip('/').split('/')[-1], 'path': prefix, 'type': 'folder'}
+        node = tree.find(prefix[len(project) + 1:]) if tree else None
+        if node:
+            entry.update(fileCount=node.file_count, size=node.size)
+        folders.append(entry)
+
+    files = sorted((file_entry(blob, meta) for blob, meta in zip(blobs, classify_blobs(blobs))),
+                   key=file_sort_key)
+    return {'files': folders + files, 'nextPageToken': next_token}
+
+
+def list_files_sorted(project, path='', page_size=FILES_PAGE_SIZE, page_token=None):
+    """
+    Whole-folder sort from the folder tree: sub-folders, then files by priority.
+    Paged by offset (the token is the offset of the next entry).
+    """
+    node = get_folder_tree(project).find(path)
+    return _offset_page(node.listing() if node else [], page_size, page_token)
+
+
+def list_files_filtered(project, path='', match=None, order=None, page_size=FILES_PAGE_SIZE,
+                        page_token=None, recursive=False):
+    """
+    A folder's files that pass an EntryFilter, in orderBy order (default: priority, name),
+    from the folder tree. Sub-folders aren't listed. recursive: search the folders below too.
+    """
+    node = get_folder_tree(project).find(path)
+    if not node:
+        return {'files': [], 'nextPageToken': None}
+    entries = node.iter_files() if recursive else node.files
+    matching = [entry for entry in entries if not match or match(entry)]
+    if recursive and not order:
+        matching.sort(key=file_sort_key)
+    return _offset_page(order_entries(matching, order), page_size, page_token)
@@ -0,0 +1,158 @@
+# Listing Filters
+# Server-side filtering and ordering for /files and /latest. Criteria are evaluated
+# on the entries the in-memory views already hold (folder tree, latest index) with
+# their stored classification, so only matching rows are sent - no extra listing.
+#
+# Request parameters (all optional, combined with AND) - named apart from the routes'
+# own parameters (/latest's 'type' still picks the index list):
+#   docTypes    document type, or several (comma-separated, or a list in JSON bodies)
+#   subjects    classifier subject, or several (same forms)
+#   approved    true / false
+#   revMin      lowest revision number (inclusive)
+#   revMax      highest revision number (inclusive)
+#   name        case-insensitive substring of the file name
+#   namePrefix  case-insensitive file name prefix
+#   since       updated at or after this ISO date/time (UTC unless it has an offset)
+#   orderBy     name, updated, size, priority, revision or type; '-' prefix = descending
+from datetime import datetime, timezone
+
+# Sort keys for orderBy - entries missing a value sort first
+SORT_KEYS = {
+    'name': lambda e: e['name'].lower(),
+    'updated': lambda e: e.get('updated') or '',
+    'size': lambda e: e.get('size') or 0,
+    'priority': lambda e: e.get('priority', 0),
+    'revision': lambda e: e.get('revision', 0),
+    'type': lambda e: e.get('type') or '',
+}
+
+
+def _as_utc(value):
+    moment = datetime.fromisoformat(value)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _values(value, param):
+    """Comma-separated string or list of strings -> set of lowercase values (None if absent)"""
+    if value in (None, ''):
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f'{param} must be a comma-separated string or a list of strings')
+    return {v.strip().lower() for v in value if v.strip()} or None
+
+
+def _text(value, param):
+    if value in (None, ''):
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f'{param} must be a string')
+    return value
+
+
+def _flag(value, param):
+    if value in (None, ''):
+        return None
+    if isinstance(value, bool):
+        return value
+    lowered = str(value).lower() if isinstance(value, str) else None
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ValueError(f'{param} must be true or false')
+
+
+def _number(value, param):
+    if value in (None, ''):
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f'{param} must be a number')
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'{param} must be a number')
+
+
+class EntryFilter:
+    """Predicate over listing entries (dicts with name, type, subject, revision, approved, updated)"""
+
+    def __init__(self, types=None, subjects=None, approved=None, rev_min=None, rev_max=None,
+                 name=None, prefix=None, since=None):
+        self.types = types
+        self.subjects = subjects
+        self.approved = approved
+        self.rev_min = rev_min
+        self.rev_max = rev_max
+        self.name = name.lower() if name else None
+        self.prefix = prefix.lower() if prefix else None
+        self.since = since
+
+    def __bool__(self):
+        return any(v is not None for v in self.key())
+
+    def key(self):
+        """Canonical form - part of the listing ETag"""
+        return (sorted(self.types) if self.types else None, sorted(self.subjects) if self.subjects else None,
+                self.approved, self.rev_min, self.rev_max, self.name, self.prefix,
+                self.since.isoformat() if self.since else None)
+
+    def __call__(self, entry):
+        if self.types is not None and (entry.get('type') or '').lower() not in self.types:
+            return False
+        if self.subjects is not None and (entry.get('subject') or '').lower() not in self.subjects:
+            return False
+        if self.approved is not None and bool(entry.get('approved')) != self.approved:
+            return False
+        if self.rev_min is not None and entry.get('revision', 0) < self.rev_min:
+            return False
+        if self.rev_max is not None and entry.get('revision', 0) > self.rev_max:
+            return False
+        if self.name is not None or self.prefix is not None:
+            name = entry['name'].lower()
+            if self.name is not None and self.name not in name:
+                return False
+            if self.prefix is not None and not name.startswith(self.prefix):
+                return False
+        if self.since is not None:
+            if not entry.get('updated') or _as_utc(entry['updated']) < self.since:
+                return False
+        return True
+
+
+def parse_filter(data):
+    """EntryFilter from request args or a JSON body. Raises ValueError for bad values."""
+    since = _text(data.get('since'), 'since')
+    if since:
+        try:
+            since = _as_utc(since.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError('since must be an ISO date or date/time')
+    return EntryFilter(
+        types=_values(data.get('docTypes'), 'docTypes'),
+        subjects=_values(data.get('subjects'), 'subjects'),
+        approved=_flag(data.get('approved'), 'approved'),
+        rev_min=_number(data.get('revMin'), 'revMin'),
+        rev_max=_number(data.get('revMax'), 'revMax'),
+        name=_text(data.get('name'), 'name'),
+        prefix=_text(data.get('namePrefix'), 'namePrefix'),
+        since=since,
+    )
+
+
+def parse_order(value):
+    """orderBy value -> (sort key name, descending) or None. Raises ValueError for bad values."""
+    if value in (None, ''):
+        return None
+    if not isinstance(value, str) or value.lstrip('-') not in SORT_KEYS:
+        raise ValueError(f'orderBy must be one of: {", ".join(sorted(SORT_KEYS))}')
+    return value.lstrip('-'), value.startswith('-')
+
+
+def order_entries(entries, order):
+    """Entries sorted by a parsed orderBy (stable - ties keep their order); unchanged for None"""
+    if not order:
+        return entries
+    key, descending = order
+    return sorted(entries, key=SORT_KEYS[key], reverse=descending)
@@ -0,0 +1,154 @@
+# Project Folder Tree
+# One recursive listing per project builds an in-memory tree of folders (children,
+# recursive file counts and sizes) and ready-to-serve file entries, so /files and
+# /folders answer any level from memory in O(children).
+# A tree is rebuilt when the project's generation moves on, or after PROJECT_VIEW_TTL
+# seconds (writes that don't bump it, e.g. manual uploads to the bucket).
+import time
+import threading
+
+from config import PROJECT_VIEW_TTL
+from services.generation import get_generation
+from utils.document import classify_blobs
+from utils.gcs import list_blobs, LISTING_FIELDS
+from services.thumbnails import thumbnail_for_blob
+
+
+def file_entry(blob, meta):
+    """/files entry for a listed blob and its classification record"""
+    return {
+        'name': blob.name.split('/')[-1],
+        'path': blob.name,
+        'size': blob.size,
+        'type': meta['type'],
+        'subject': meta['subject'],
+        'revision': meta['revision'],
+        'priority': meta['priority'],
+        'approved': meta['approved'],
+        'thumbnail': thumbnail_for_blob(blob),
+        'updated': blob.updated.isoformat() if blob.updated else None
+    }
+
+
+def file_sort_key(entry):
+    """Files by priority, then name"""
+    return -entry.get('priority', 0), entry['name'].lower()
+
+
+class FolderNode:
+    """One folder: child folders by name, direct file entries, recursive totals"""
+    __slots__ = ('name', 'path', 'folders', 'files', 'file_count', 'size')
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path  # full GCS prefix, ending in '/'
+        self.folders = {}
+        self.files = []
+        self.file_count = 0
+        self.size = 0
+
+    def folder_entries(self):
+        return [
+            {'name': child.name, 'path': child.path, 'fileCount': child.file_count, 'size': child.size}
+            for child in sorted(self.folders.values(), key=lambda c: c.name.lower())
+        ]
+
+    def iter_files(self):
+        """File entries of this folder and every folder below it"""
+        yield from self.files
+        for child in sorted(self.folders.values(), key=lambda c: c.name.lower()):
+            yield from child.iter_files()
+
+    def listing(self):
+        """/files response for this folder: sub-folders, then files by priority"""
+        folders = [dict(entry, type='folder') for entry in self.folder_entries()]
+        return folders + self.files
+
+
+class FolderTree:
+    def __init__(self, project, generation, blobs):
+        self.project = project
+        self.generation = generation
+        self.built = time.time()
+        self.root = FolderNode(project, f"{project}/")
+
+        blobs = [b for b in blobs if b.name.startswith(self.root.path)]
+        files = [b for b in blobs if not b.name.endswith('/')]
+        for blob in blobs:
+            if blob.name.endswith('/'):
+                # Folder placeholder object
+                self._node(blob.name[len(self.root.path):].split('/')[:-1])
+
+        for blob, meta in zip(files, classify_blobs(files)):
+            parts = blob.name[len(self.root.path):].split('/')
+            size = blob.size or 0
+            node = self.root
+            node.file_count += 1
+            node.size += size
+            for part in parts[:-1]:
+                node = self._child(node, part)
+                node.file_count += 1
+                node.size += size
+            node.files.append(file_entry(blob, meta))
+
+        self._sort(self.root)
+
+    @staticmethod
+    def _child(node, name):
+        child = node.folders.get(name)
+        if child is None:
+            child = node.folders[name] = FolderNode(name, f"{node.path}{name}/")
+        return child
+
+    def _node(self, parts):
+        node = self.root
+        for part in parts:
+            node = self._child(node, part)
+        return node
+
+    def _sort(self, node):
+        node.files.sort(key=file_sort_key)
+        for child in node.folders.values():
+            self._sort(child)
+
+    def find(self, path):
+        """Folder at a path relative to the project ('' = root), or None"""
+        node = self.root
+        for part in path.strip('/').split('/') if path.strip('/') else []:
+            node = node.folders.get(part)
+            if node is None:
+                return None
+        return node
+
+    def is_fresh(self):
+        return self.generation == get_generation(self.project) and time.time() - self.built < PROJECT_VIEW_TTL
+
+
+_trees = {}
+_build_locks = {}
+_locks_guard = threading.Lock()
+
+
+def cached_folder_tree(project):
+    """The project's tree if one is in memory and fresh - never builds"""
+    tree = _trees.get(project)
+    return tree if tree and tree.is_fresh() else None
+
+
+def get_folder_tree(project):
+    """Folder tree of a GCS project folder, built from one listing and kept in memory"""
+    tree = _trees.get(project)
+    if tree and tree.is_fresh():
+        return tree
+
+    with _locks_guard:
+        lock = _build_locks.setdefault(project, threading.Lock())
+    with lock:
+        # Another request may have rebuilt it while we waited
+        tree = _trees.get(project)
+        if tree and tree.is_fresh():
+            return tree
+        generation = get_generation(project)
+        tree = FolderTree(project, generation, list_blobs(f"{project}/", fields=LISTING_FIELDS))
+        _trees[project] = tree
+        return tree
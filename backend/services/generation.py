@@ -0,0 +1,69 @@
+# Project Generations
+# A counter per project that increases whenever the project's objects change
+# (sync, email saves, classify moves, bucket events). It lives in Firestore so every
+# instance and service sees the same value: in-memory views of a project are tagged
+# with the generation they were built at and rebuilt once it moves on, and listing
+# responses carry an ETag derived from it.
+# Reads are cached for GENERATION_CACHE_SECONDS; without Firestore the counter is
+# per instance.
+import time
+import threading
+from datetime import datetime
+
+from google.cloud import firestore
+
+from config import APP_ID, GENERATION_CACHE_SECONDS
+from clients import firestore_client, FIRESTORE_ENABLED
+
+_cache = {}  # project -> (generation, fetched at)
+_lock = threading.Lock()
+
+
+def _generations():
+    return firestore_client.collection('artifacts').document(APP_ID)\
+        .collection('public').document('data').collection('project_generations')
+
+
+def _remember(project, generation):
+    with _lock:
+        # Never step back (a stale read racing a local bump)
+        current = _cache.get(project, (0, 0))[0]
+        generation = max(current, generation)
+        _cache[project] = (generation, time.time())
+        return generation
+
+
+def get_generation(project):
+    """Current generation of a GCS project folder"""
+    cached = _cache.get(project)
+    if cached and (not FIRESTORE_ENABLED or time.time() - cached[1] < GENERATION_CACHE_SECONDS):
+        return cached[0]
+    if not FIRESTORE_ENABLED:
+        return 0
+    try:
+        doc = _generations().document(project).get()
+        generation = (doc.to_dict() or {}).get('generation', 0) if doc.exists else 0
+    except Exception as e:
+        print(f"Generation read error ({project}): {e}")
+        return cached[0] if cached else 0
+    return _remember(project, generation)
+
+
+def bump_generation(project):
+    """Mark a project's objects as changed. Returns the new generation."""
+    if FIRESTORE_ENABLED:
+        try:
+            ref = _generations().document(project)
+            ref.set({'generation': firestore.Increment(1), 'updated': datetime.utcnow().isoformat()}, merge=True)
+            return _remember(project, ref.get().to_dict().get('generation', 0))
+        except Exception as e:
+            print(f"Generation bump error ({project}): {e}")
+            # The increment may or may not have landed - a local +1 could run ahead of
+            # Firestore and hide the next real bump. Read it again instead.
+            with _lock:
+                _cache.pop(project, None)
+            return get_generation(project)
+    with _lock:
+        generation = _cache.get(project, (0, 0))[0] + 1
+        _cache[project] = (generation, time.time())
+        return generation
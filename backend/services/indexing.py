@@ -0,0 +1,187 @@
+# Incremental Vertex AI Search Indexing
+# After each sync only the GCS URIs that were uploaded or deleted are sent to the
+# datastore, instead of waiting for a full re-import of the bucket.
+# Documents are imported with IDs derived from their URI, so a deleted file's
+# document is removed by ID - no datastore listing.
+import os
+import hashlib
+import mimetypes
+from datetime import datetime
+
+from google.api_core.exceptions import NotFound
+from google.cloud import discoveryengine_v1 as discoveryengine
+
+from config import PROJECT_ID, LOCATION, DATA_STORE_ID, GCS_BUCKET, APP_ID, INDEX_BATCH_SIZE, INDEXABLE_EXTENSIONS
+
+
+def get_branch():
+    """Default branch of the datastore behind ENGINE_ID"""
+    return (f'projects/{PROJECT_ID}/locations/{LOCATION}/collections/default_collection'
+            f'/dataStores/{DATA_STORE_ID}/branches/default_branch')
+
+
+def to_gcs_uri(gcs_path):
+    return f'gs://{GCS_BUCKET}/{gcs_path}'
+
+
+# Documents given by URI need the content's MIME type
+CONTENT_TYPES = {
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    '.xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    '.txt': 'text/plain',
+    '.html': 'text/html',
+    '.htm': 'text/html',
+}
+
+
+def document_id(uri):
+    """Datastore document ID for a GCS URI (IDs allow [a-zA-Z0-9-_], at most 63 characters)"""
+    return hashlib.sha256(uri.encode('utf-8')).hexdigest()[:40]
+
+
+def document_name(uri):
+    return f'{get_branch()}/documents/{document_id(uri)}'
+
+
+def is_indexable(gcs_path):
+    """Only formats the unstructured datastore can parse are imported"""
+    return os.path.splitext(gcs_path.lower())[1] in INDEXABLE_EXTENSIONS
+
+
+def _batches(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _document(uri):
+    ext = os.path.splitext(uri.lower())[1]
+    return discoveryengine.Document(
+        id=document_id(uri),
+        content=discoveryengine.Document.Content(uri=uri, mime_type=CONTENT_TYPES.get(ext) or mimetypes.guess_type(uri)[0])
+    )
+
+
+def import_uris(client, uris, batch_size=None):
+    """Start one incremental ImportDocuments operation per batch. Returns operation names."""
+    operations = []
+    for batch in _batches(uris, batch_size or INDEX_BATCH_SIZE):
+        request = discoveryengine.ImportDocumentsRequest(
+            parent=get_branch(),
+            inline_source=discoveryengine.ImportDocumentsRequest.InlineSource(
+                documents=[_document(uri) for uri in batch]),
+            reconciliation_mode=discoveryengine.ImportDocumentsRequest.ReconciliationMode.INCREMENTAL
+        )
+        operation = client.import_documents(request=request)
+        operations.append(operation.operation.name)
+    return operations
+
+
+def purge_uris(client, uris):
+    """Delete the datastore documents of objects removed from GCS. Returns the URIs purged."""
+    purged = []
+    for uri in uris:
+        try:
+            client.delete_document(name=document_name(uri))
+        except NotFound:
+            # Never indexed, or already gone
+            continue
+        purged.append(uri)
+    return purged
+
+
+def _jobs_collection():
+    from clients import firestore_client, FIRESTORE_ENABLED
+    if not FIRESTORE_ENABLED:
+        return None
+    return firestore_client.collection('artifacts').document(APP_ID)\
+        .collection('public').document('data').collection('index_jobs')
+
+
+def index_changes(project_name, uploaded, deleted, client=None, jobs=None):
+    """
+    Send the files a sync run uploaded/deleted to Vertex AI Search.
+    Records a job document with the long-running operation names.
+    Returns a summary dict, or None if indexing is disabled or nothing changed.
+    """
+    if not DATA_STORE_ID:
+        return None
+
+    to_import = [to_gcs_uri(p) for p in uploaded if is_indexable(p)]
+    to_purge = [to_gcs_uri(p) for p in deleted if is_indexable(p)]
+    if not to_import and not to_purge:
+        return None
+
+    client = client or discoveryengine.DocumentServiceClient()
+    jobs = jobs if jobs is not None else _jobs_collection()
+
+    job = {
+        'project': project_name,
+        'created': datetime.utcnow().isoformat(),
+        'status': 'running',
+        'imported': len(to_import),
+        'operations': [],
+        'purged': 0,
+        'errors': []
+    }
+
+    try:
+        job['operations'] = import_uris(client, to_import)
+    except Exception as e:
+        job['errors'].append(f'import: {e}')
+
+    try:
+        job['purged'] = len(purge_uris(client, to_purge))
+    except Exception as e:
+        job['errors'].append(f'purge: {e}')
+
+    if not job['operations']:
+        job['status'] = 'error' if job['errors'] else 'done'
+
+    if jobs is not None:
+        job_ref = jobs.document()
+        job_ref.set(job)
+        job['id'] = job_ref.id
+    return job
+
+
+def refresh_index_job(job_ref, job, client=None):
+    """Poll the job's import operations and store the resulting status"""
+    if job.get('status') != 'running':
+        return job
+
+    client = client or discoveryengine.DocumentServiceClient()
+    pending, errors = 0, list(job.get('errors', []))
+    for name in job.get('operations', []):
+        op = client.get_operation(request={'name': name})
+        if not op.done:
+            pending += 1
+        elif op.error and op.error.code:
+            errors.append(f'{name}: {op.error.message}')
+
+    if pending == 0:
+        job['status'] = 'error' if errors else 'done'
+        job['errors'] = errors
+        job['finished'] = datetime.utcnow().isoformat()
+        job_ref.update({'status': job['status'], 'errors': errors, 'finished': job['finished']})
+    return job
+
+
+def get_index_jobs(limit=10, client=None):
+    """Most recent index jobs, refreshing the ones still running"""
+    jobs = _jobs_collection()
+    if jobs is None:
+        return []
+
+    from google.cloud import firestore
+    results = []
+    for doc in jobs.order_by('created', direction=firestore.Query.DESCENDING).limit(limit).stream():
+        job = doc.to_dict()
+        try:
+            job = refresh_index_job(doc.reference, job, client)
+        except Exception as e:
+            print(f'Index job refresh error ({doc.id}): {e}')
+        job['id'] = doc.id
+        results.append(job)
+    return results
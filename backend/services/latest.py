@@ -0,0 +1,231 @@
+# Latest Documents Index
+# /latest only ever shows the newest approved/recent documents, so each project
+# keeps the top LATEST_INDEX_SIZE entries per document type (and across all
+# types) instead of listing, classifying and sorting every blob per request.
+# Sync updates the index in place; a cold or invalidated index is rebuilt with
+# one streaming pass that keeps bounded heaps, never the full listing.
+import time
+import heapq
+import threading
+
+from config import LATEST_INDEX_SIZE, PROJECT_VIEW_TTL
+from services.generation import get_generation
+from utils.document import classify_blobs
+from utils.gcs import iter_blob_pages, LISTING_FIELDS
+from utils.revision import short_revision_label
+from services.thumbnails import thumbnail_for_blob
+
+ALL_TYPES = '*'
+
+def latest_entry(project, blob, meta):
+    """/latest entry for a blob and its classification record"""
+    name = blob.name.split('/')[-1]
+    return {
+        'name': name,
+        'path': blob.name.replace(f"{project}/", ''),
+        'size': blob.size,
+        'type': meta['type'],
+        'subject': meta['subject'],
+        'revision': meta['revision'],
+        # /latest has always labelled revisions 'R2' (records carry 'Rev 02')
+        'revisionStr': short_revision_label(name),
+        'priority': meta['priority'],
+        'approved': meta['approved'],
+        'thumbnail': thumbnail_for_blob(blob),
+        'updated': blob.updated.isoformat() if blob.updated else None
+    }
+
+
+def _sort_key(entry):
+    return entry.get('updated') or ''
+
+
+def _group(entry):
+    return 'approved' if entry['approved'] else 'recent'
+
+
+class LatestHeaps:
+    """
+    The k newest entries per (type, group) in min-heaps, fed one classified blob at a
+    time - O(N log k) time, O(k) memory per list.
+    doc_types: only keep lists for these types (ALL_TYPES = across types); None = all.
+    match: only keep entries it accepts (services.filters.EntryFilter); None = all.
+    """
+
+    def __init__(self, project, k, doc_types=None, match=None):
+        self.project = project
+        self.k = k
+        self.doc_types = doc_types
+        self.match = match
+        self.heaps = {}
+        self.seq = 0
+
+    def add(self, blob, meta):
+        keys = [(t, 'approved' if meta['approved'] else 'recent') for t in (meta['type'], ALL_TYPES)
+                if self.doc_types is None or t in self.doc_types]
+        if not keys:
+            return
+        entry = latest_entry(self.project, blob, meta)
+        if self.match and not self.match(entry):
+            return
+        # Earlier listing order wins ties, as with the previous stable sort
+        item = (_sort_key(entry), -self.seq, entry)
+        self.seq += 1
+        for key in keys:
+            heap = self.heaps.setdefault(key, [])
+            if len(heap) < self.k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+
+    def lists(self):
+        """{(type, group): [entries newest first]}"""
+        return {key: [item[2] for item in sorted(heap, key=lambda i: i[:2], reverse=True)]
+                for key, heap in self.heaps.items()}
+
+
+def stream_latest(project, k, doc_types=None, match=None):
+    """
+    One streaming pass over the project listing into LatestHeaps.
+    Returns {(type, group): [entries newest first]}.
+    """
+    heaps = LatestHeaps(project, k, doc_types, match)
+    for page in iter_blob_pages(f"{project}/", fields=LISTING_FIELDS):
+        blobs = [b for b in page if not b.name.endswith('/')]
+        for blob, meta in zip(blobs, classify_blobs(blobs)):
+            heaps.add(blob, meta)
+    return heaps.lists()
+
+
+class LatestIndex:
+    """Top-k approved/recent entries per document type for one project"""
+
+    def __init__(self, project, generation, k=LATEST_INDEX_SIZE, lists=None):
+        self.project = project
+        self.generation = generation
+        self.k = k
+        self.built = time.time()
+        # lists: already computed by another pass over the listing (see services.overview)
+        self.lists = stream_latest(project, k) if lists is None else lists
+        self._lock = threading.Lock()
+
+    def is_fresh(self):
+        return self.generation == get_generation(self.project) and time.time() - self.built < PROJECT_VIEW_TTL
+
+    def top(self, doc_type, limit):
+        key_type = doc_type or ALL_TYPES
+        return {group: list(self.lists.get((key_type, group), [])[:limit]) for group in ('approved', 'recent')}
+
+    def _remove(self, path):
+        """Drop an entry everywhere. Returns False if a full list shrank (it may now be missing one)."""
+        complete = True
+        for entries in self.lists.values():
+            for i, entry in enumerate(entries):
+                if entry['path'] == path:
+                    if len(entries) == self.k:
+                        complete = False
+                    del entries[i]
+                    break
+        return complete
+
+    def apply(self, upserts, deleted):
+        """
+        Apply a sync's changes: upserts are (blob, record) pairs, deleted are GCS paths.
+        Returns False if the index can no longer be kept exact and must be rebuilt.
+        """
+        prefix = f"{self.project}/"
+        with self._lock:
+            for path in deleted:
+                if not self._remove(path.replace(prefix, '')):
+                    return False
+            for blob, meta in upserts:
+                entry = latest_entry(self.project, blob, meta)
+                # A re-uploaded path goes back into the same lists, so they stay full
+                self._remove(entry['path'])
+                sort_key = _sort_key(entry)
+                for key in ((entry['type'], _group(entry)), (ALL_TYPES, _group(entry))):
+                    entries = self.lists.setdefault(key, [])
+                    pos = next((i for i, e in enumerate(entries) if _sort_key(e) < sort_key), len(entries))
+                    entries.insert(pos, entry)
+                    del entries[self.k:]
+        return True
+
+
+_indexes = {}
+_build_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _index(project):
+    """The project's index, built if missing or stale"""
+    index = _indexes.get(project)
+    if not (index and index.is_fresh()):
+        with _locks_guard:
+            lock = _build_locks.setdefault(project, threading.Lock())
+        with lock:
+            index = _indexes.get(project)
+            if not (index and index.is_fresh()):
+                index = _indexes[project] = LatestIndex(project, get_generation(project))
+    return index
+
+
+def get_latest(project, doc_type=None, limit=10, match=None):
+    """
+    Newest approved and recent documents of a GCS project folder.
+    match: only entries an EntryFilter accepts - taken from the index while it holds
+    enough of them, otherwise from one streaming pass with the filter.
+    """
+    key_type = doc_type or ALL_TYPES
+    if limit <= LATEST_INDEX_SIZE:
+        index = _index(project)
+        if not match:
+            return index.top(doc_type, limit)
+        result = {}
+        for group in ('approved', 'recent'):
+            entries = list(index.lists.get((key_type, group), []))
+            matching = [entry for entry in entries if match(entry)]
+            # A list shorter than k holds every document of its kind
+            if len(matching) >= limit or len(entries) < index.k:
+                result[group] = matching[:limit]
+        if len(result) == 2:
+            return result
+
+    # Beyond what the index keeps - one bounded streaming pass for this request
+    lists = stream_latest(project, limit, {key_type}, match)
+    return {group: lists.get((key_type, group), []) for group in ('approved', 'recent')}
+
+
+def get_latest_page(project, doc_type=None, page_size=10, page_token=None, match=None):
+    """
+    One page of get_latest: entries offset..offset+page_size of both groups, newest first.
+    The token is the offset of the next page, shared by the groups.
+    Returns {'approved', 'recent', 'nextPageToken'} (None once neither group has more).
+    """
+    offset = max(0, int(page_token or 0))
+    end = offset + page_size
+    # One entry past the page tells whether another one follows
+    lists = get_latest(project, doc_type, end + 1, match)
+    page = {group: entries[offset:end] for group, entries in lists.items()}
+    page['nextPageToken'] = str(end) if any(len(entries) > end for entries in lists.values()) else None
+    return page
+
+
+def seed_latest(project, generation, lists):
+    """Install an index built elsewhere unless a fresh one is already in memory"""
+    index = _indexes.get(project)
+    if not (index and index.is_fresh()) and generation == get_generation(project):
+        _indexes[project] = LatestIndex(project, generation, lists=lists)
+
+
+def update_latest(project, previous_generation, upserts, deleted):
+    """
+    Carry a project's index across a sync instead of rebuilding it.
+    Only an index that was current at previous_generation is updated.
+    """
+    index = _indexes.get(project)
+    if index is None or index.generation != previous_generation:
+        return
+    if index.apply(upserts, deleted):
+        index.generation = get_generation(project)
+    else:
+        _indexes.pop(project, None)
@@ -0,0 +1,101 @@
+# Project Overview
+# The dashboard's stats, newest approved/recent documents, top-level folders and
+# largest files from ONE streaming pass over the project listing, classified page by
+# page with the batch classifier, instead of a separate listing per view.
+# The pass also seeds the /latest index, so opening the project after the dashboard
+# doesn't list it again. Results are kept per project like the other views.
+import time
+import heapq
+
+from config import LATEST_INDEX_SIZE, PROJECT_VIEW_TTL, OVERVIEW_LARGEST_FILES
+from services.generation import get_generation
+from services.latest import LatestHeaps, ALL_TYPES, seed_latest
+from services.stats import StatsDelta
+from utils.document import classify_blobs
+from utils.gcs import iter_blob_pages, LISTING_FIELDS
+from utils.singleflight import coalesced
+
+
+def _largest_entry(project, blob, meta):
+    return {
+        'name': blob.name.split('/')[-1],
+        'path': blob.name.replace(f"{project}/", ''),
+        'size': blob.size or 0,
+        'type': meta['type'],
+        'updated': blob.updated.isoformat() if blob.updated else None
+    }
+
+
+class Overview:
+    """Everything the dashboard shows for one project, from one listing pass"""
+
+    def __init__(self, project, generation, largest=OVERVIEW_LARGEST_FILES):
+        self.project = project
+        self.generation = generation
+        self.built = time.time()
+
+        delta = StatsDelta(project)
+        latest = LatestHeaps(project, LATEST_INDEX_SIZE)
+        largest_heap = []
+        folders = set()
+        seq = 0
+        for page in iter_blob_pages(f"{project}/", fields=LISTING_FIELDS):
+            files = []
+            for blob in page:
+                rel = blob.name[len(project) + 1:]
+                if '/' in rel:
+                    folders.add(rel.split('/', 1)[0])
+                if not blob.name.endswith('/'):
+                    files.append(blob)
+            for blob, meta in zip(files, classify_blobs(files)):
+                delta.add(blob.name, blob.size, meta)
+                latest.add(blob, meta)
+                # Smallest of the kept files on top; earlier listing order wins ties
+                item = (blob.size or 0, -seq, blob, meta)
+                seq += 1
+                if len(largest_heap) < largest:
+                    heapq.heappush(largest_heap, item)
+                elif item[:2] > largest_heap[0][:2]:
+                    heapq.heapreplace(largest_heap, item)
+
+        self.stats = delta.totals()
+        self.latest_lists = latest.lists()
+        self.folders = [
+            {'name': name, 'path': f"{project}/{name}/",
+             'fileCount': self.stats['byFolder'].get(name, 0),
+             'size': self.stats['bytesByFolder'].get(name, 0)}
+            for name in sorted(folders, key=str.lower)
+        ]
+        self.largest = [_largest_entry(project, item[2], item[3])
+                        for item in sorted(largest_heap, key=lambda i: i[:2], reverse=True)]
+
+    def is_fresh(self):
+        return self.generation == get_generation(self.project) and time.time() - self.built < PROJECT_VIEW_TTL
+
+    def response(self, limit):
+        return {
+            'stats': self.stats,
+            'latest': {group: self.latest_lists.get((ALL_TYPES, group), [])[:limit]
+                       for group in ('approved', 'recent')},
+            'folders': self.folders,
+            'largest': self.largest
+        }
+
+
+_overviews = {}
+
+
+@coalesced()
+def _build(project):
+    overview = _overviews[project] = Overview(project, get_generation(project))
+    # Copies - sync updates the index lists in place
+    seed_latest(project, overview.generation, {key: list(entries) for key, entries in overview.latest_lists.items()})
+    return overview
+
+
+def get_overview(project, limit=10):
+    """Dashboard overview of a GCS project folder: stats, latest, folders, largest files"""
+    overview = _overviews.get(project)
+    if not (overview and overview.is_fresh()):
+        overview = _build(project)
+    return overview.response(min(limit, LATEST_INDEX_SIZE))
@@ -0,0 +1,152 @@
+# Sync Pipeline Stages
+# CPU-bound work on synced files runs in a process pool while the sync loop
+# keeps downloading. Each result is stored as a sidecar object keyed by content
+# hash, so content that was already processed is never processed again.
+# A stage can record its stored result on the source objects (mark_sources), so
+# listings find it in the source's own metadata.
+import os
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from config import PIPELINE_WORKERS, THUMBNAIL_EXTENSIONS, TEXT_EXTENSIONS
+from workers.thumbnails import (render_thumbnail, thumbnail_path, THUMBNAIL_CONTENT_TYPE, THUMBNAILS_ENABLED,
+                                THUMBNAIL_METADATA_KEY)
+from workers.text import extract_text, text_path, TEXT_CONTENT_TYPE
+
+
+class ProcessStage:
+    """
+    Base pipeline stage. Subclasses define:
+        name, extensions, content_type, enabled
+        worker        - module-level function(content, ext) -> bytes or None
+        sidecar_path  - source md5 (hex) -> GCS path of the stored result
+        mark_sources  - optional: record a stored result on its source blobs
+    """
+    name = 'stage'
+    extensions = set()
+    content_type = 'application/octet-stream'
+    enabled = True
+    worker = None
+
+    def __init__(self, bucket, max_workers=PIPELINE_WORKERS):
+        self.bucket = bucket
+        self.max_workers = max(1, max_workers)
+        self.stats = {'processed': 0, 'reused': 0, 'failed': 0}
+        self._pool = None
+        self._pending = {}
+        self._seen = set()
+        self._stored = set()
+        self._sources = {}  # target -> source blobs to mark once it is stored
+
+    def sidecar_path(self, md5_hex):
+        raise NotImplementedError
+
+    def mark_sources(self, target, blobs):
+        pass
+
+    def submit(self, gcs_path, content, md5_hex, blob=None):
+        """Queue a synced file for processing (no-op for other file types). blob: the uploaded source."""
+        ext = os.path.splitext(gcs_path.lower())[1]
+        if not self.enabled or ext not in self.extensions:
+            return
+
+        target = self.sidecar_path(md5_hex)
+        if blob is not None:
+            self._sources.setdefault(target, []).append(blob)
+        if target in self._seen:
+            self.stats['reused'] += 1
+            return
+        self._seen.add(target)
+        if self.bucket.blob(target).exists():
+            self._stored.add(target)
+            self.stats['reused'] += 1
+            return
+
+        if self._pool is None:
+            # spawn, not fork - the parent holds gRPC/HTTP client threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+        # Bound in-flight work so file contents don't pile up in memory
+        while len(self._pending) >= self.max_workers * 2:
+            done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+            self._collect(done)
+
+        future = self._pool.submit(self.worker, content, ext)
+        self._pending[future] = target
+
+    def finish(self):
+        """Wait for outstanding work, shut the pool down, mark sources and return stats"""
+        if self._pending:
+            done, _ = wait(self._pending)
+            self._collect(done)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for target, blobs in self._sources.items():
+            if target in self._stored:
+                self.mark_sources(target, blobs)
+        self._sources = {}
+        return dict(self.stats)
+
+    def _collect(self, futures):
+        for future in futures:
+            target = self._pending.pop(future)
+            try:
+                result = future.result()
+                if not result:
+                    self.stats['failed'] += 1
+                    continue
+                self.bucket.blob(target).upload_from_string(result, content_type=self.content_type)
+                self._stored.add(target)
+                self.stats['processed'] += 1
+            except Exception as e:
+                print(f"{self.name} stage error ({target}): {e}")
+                self.stats['failed'] += 1
+
+
+class ThumbnailStage(ProcessStage):
+    """First-page thumbnails for PDFs and images under _thumbs/<md5>.webp"""
+    name = 'thumbnails'
+    extensions = THUMBNAIL_EXTENSIONS
+    content_type = THUMBNAIL_CONTENT_TYPE
+    enabled = THUMBNAILS_ENABLED
+    worker = staticmethod(render_thumbnail)
+
+    def sidecar_path(self, md5_hex):
+        return thumbnail_path(md5_hex)
+
+    def mark_sources(self, target, blobs):
+        """Listings point at a thumbnail only if its source's metadata names it"""
+        for blob in blobs:
+            try:
+                blob.metadata = {**(blob.metadata or {}), THUMBNAIL_METADATA_KEY: target}
+                blob.patch()
+            except Exception as e:
+                print(f"{self.name} stage error (marking {blob.name}): {e}")
+
+
+class TextStage(ProcessStage):
+    """Plain text of PDF/DOCX/XLSX files under _text/<md5>.txt.gz"""
+    name = 'text'
+    extensions = TEXT_EXTENSIONS
+    content_type = TEXT_CONTENT_TYPE
+    worker = staticmethod(extract_text)
+
+    def sidecar_path(self, md5_hex):
+        return text_path(md5_hex)
+
+
+def create_pipeline(bucket):
+    """Stages every synced file passes through after upload"""
+    return [ThumbnailStage(bucket), TextStage(bucket)]
+
+
+def submit_to_pipeline(pipeline, gcs_path, content, md5_hex=None, blob=None):
+    """Hand an uploaded file to every stage (md5 computed once, matches GCS md5)"""
+    md5_hex = md5_hex or hashlib.md5(content).hexdigest()
+    for stage in pipeline:
+        stage.submit(gcs_path, content, md5_hex, blob)
@@ -1,12 +1,15 @@
 # Search Service - Vertex AI + Gemini RAG (v7.5)
 # Fixed: Removed broken filter, using path-based post-filtering for projects
 import os
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import discoveryengine_v1 as discoveryengine
 import google.generativeai as genai
 
 # Absolute imports
-from config import PROJECT_ID, LOCATION, ENGINE_ID, GEMINI_API_KEY, GCS_BUCKET
+from config import PROJECT_ID, LOCATION, ENGINE_ID, GEMINI_API_KEY, GCS_BUCKET, TEXT_CONTEXT_CHARS
 from clients import GEMINI_ENABLED
+from utils.gcs import read_document_text
+from utils.singleflight import coalesced
 
 # Document type labels for display
 DOC_TYPE_LABELS = {
@@ -28,6 +31,8 @@ DOC_TYPE_LABELS = {
 }
 
 
+@coalesced(key=lambda query, project_filter=None, doc_type_filter=None, page_size=20:
+           (query, project_filter, doc_type_filter, page_size))
 def search_documents(query, project_filter=None, doc_type_filter=None, page_size=20):
     """
     Search documents using Vertex AI Search.
@@ -238,6 +243,29 @@ def calculate_priority(path, doc_type):
     return priority
 
 
+def load_document_texts(docs, max_chars=TEXT_CONTEXT_CHARS):
+    """
+    Fetch the sync-time extracted text for search results in parallel.
+    Returns a list aligned with docs ('' where no text is available).
+    """
+    prefix = f'gs://{GCS_BUCKET}/'
+    
+    def fetch(doc):
+        link = doc.get('link', '')
+        if not link.startswith(prefix):
+            return ''
+        try:
+            return read_document_text(link[len(prefix):], max_chars)
+        except Exception as e:
+            print(f'Text load error ({link}): {e}')
+            return ''
+    
+    if not docs:
+        return []
+    with ThreadPoolExecutor(max_workers=len(docs)) as pool:
+        return list(pool.map(fetch, docs))
+
+
 def generate_summary(query, docs):
     """
     Generate intelligent, structured AI summary using Gemini.
@@ -253,12 +281,15 @@ def generate_summary(query, docs):
         genai.configure(api_key=GEMINI_API_KEY)
         model = genai.GenerativeModel('gemini-2.0-flash-exp')
         
-        # Build rich context from documents
+        # Build rich context from documents - full extracted text when available
+        context_docs = docs[:10]
+        texts = load_document_texts(context_docs)
         context_parts = []
-        for i, doc in enumerate(docs[:10], 1):
+        for i, doc in enumerate(context_docs, 1):
             title = doc.get('title', 'Unknown')
             snippets = doc.get('snippets', [])
             snippet = snippets[0] if snippets else ''
+            content = texts[i - 1] or (snippet[:500] if snippet else 'No preview available')
             doc_type = doc.get('docTypeLabel', 'Document')
             path = doc.get('link', '')
             
@@ -288,7 +319,7 @@ def generate_summary(query, docs):
 Document {i}: {title}
 Type: {doc_type}{location_str}
 Path: {path}
-Content: {snippet[:500] if snippet else 'No preview available'}
+Content: {content}
 """)
         
         context = "\n".join(context_parts)
@@ -0,0 +1,158 @@
+# Project Statistics Aggregates
+# /stats reads one Firestore document per project instead of listing every blob.
+# Writers apply deltas with atomic increments: sync_folder for its own uploads and
+# deletes and the email service for the emails it saves (same fields), or - when the
+# bucket's object events are routed to /events/gcs (STATS_EVENTS_ENABLED, set on both
+# services) - the event handler for every write from any service.
+# reconcile_stats recomputes a document from a full listing to correct drift.
+from collections import Counter
+from datetime import datetime
+
+from google.cloud import firestore
+
+from config import APP_ID, STATS_EVENTS_ENABLED
+from clients import get_bucket, firestore_client, FIRESTORE_ENABLED
+from utils.document import classify_blobs, record_from_metadata, document_metadata
+from utils.gcs import LISTING_FIELDS
+from utils.singleflight import coalesced
+
+ROOT_FOLDER = '(root)'
+
+# Breakdown maps: field -> (record key to group by, counts bytes instead of files)
+BREAKDOWNS = {
+    'byType': ('type', False),
+    'bytesByType': ('type', True),
+    'bySubject': ('subject', False),
+    'byFolder': ('folder', False),
+    'bytesByFolder': ('folder', True),
+}
+
+
+def _stats_collection():
+    return firestore_client.collection('artifacts').document(APP_ID)\
+        .collection('public').document('data').collection('project_stats')
+
+
+def _top_folder(project, blob_name):
+    rel = blob_name[len(project) + 1:]
+    return rel.split('/', 1)[0] if '/' in rel else ROOT_FOLDER
+
+
+class StatsDelta:
+    """Accumulated file/byte changes for one project, written in one update"""
+
+    def __init__(self, project):
+        self.project = project
+        self.counts = Counter()
+
+    def add(self, blob_name, size, record, sign=1):
+        size = int(size or 0)
+        values = dict(record, folder=_top_folder(self.project, blob_name))
+        self.counts[('fileCount',)] += sign
+        self.counts[('totalSize',)] += sign * size
+        for field, (key, by_bytes) in BREAKDOWNS.items():
+            self.counts[(field, values[key])] += sign * (size if by_bytes else 1)
+
+    def add_blob(self, blob, sign=1):
+        """Add (sign=1) or remove (sign=-1) a listed/stored blob"""
+        record = record_from_metadata(blob.metadata) or document_metadata(blob.name)
+        self.add(blob.name, blob.size, record, sign)
+
+    def totals(self):
+        """The accumulated counts as a stats dict (the /stats shape)"""
+        stats = {'fileCount': 0, 'totalSize': 0}
+        stats.update({field: {} for field in BREAKDOWNS})
+        for key, value in self.counts.items():
+            if len(key) == 1:
+                stats[key[0]] = value
+            elif value:
+                stats[key[0]][key[1]] = value
+        return stats
+
+    def apply(self):
+        """Write the changes as atomic increments (merge - the document may not exist yet)"""
+        changes = {key: value for key, value in self.counts.items() if value}
+        if not changes or not FIRESTORE_ENABLED:
+            return
+        update = {'updated': datetime.utcnow().isoformat()}
+        for key, value in changes.items():
+            if len(key) == 1:
+                update[key[0]] = firestore.Increment(value)
+            else:
+                update.setdefault(key[0], {})[key[1]] = firestore.Increment(value)
+        # set(merge=True) takes nested dicts literally, so folder names with dots are fine
+        _stats_collection().document(self.project).set(update, merge=True)
+        self.counts.clear()
+
+
+def compute_stats(project):
+    """Aggregates from a full listing of the project"""
+    delta = StatsDelta(project)
+    blobs = [b for b in get_bucket().list_blobs(prefix=f'{project}/', fields=LISTING_FIELDS)
+             if not b.name.endswith('/')]
+    for blob, record in zip(blobs, classify_blobs(blobs)):
+        delta.add(blob.name, blob.size, record)
+    return delta.totals()
+
+
+def reconcile_stats(project):
+    """Recompute a project's aggregates from GCS and overwrite the stored document"""
+    stats = compute_stats(project)
+    if FIRESTORE_ENABLED:
+        now = datetime.utcnow().isoformat()
+        _stats_collection().document(project).set(dict(stats, updated=now, reconciled=now))
+    return stats
+
+
+@coalesced()
+def get_project_stats(project_name):
+    """Get project statistics (fileCount, totalSize and breakdowns by type, subject, folder)"""
+    if not FIRESTORE_ENABLED:
+        return compute_stats(project_name)
+
+    doc = _stats_collection().document(project_name).get()
+    if not doc.exists:
+        return reconcile_stats(project_name)
+
+    data = doc.to_dict()
+    stats = {'fileCount': data.get('fileCount', 0), 'totalSize': data.get('totalSize', 0)}
+    for field in BREAKDOWNS:
+        # Drop entries that went to zero as files were removed
+        stats[field] = {k: v for k, v in (data.get(field) or {}).items() if v}
+    stats['updated'] = data.get('updated')
+    stats['reconciled'] = data.get('reconciled')
+    return stats
+
+
+def list_stats_projects():
+    """Projects that have an aggregates document"""
+    if not FIRESTORE_ENABLED:
+        return []
+    return [doc.id for doc in _stats_collection().stream()]
+
+
+def apply_object_event(event_type, obj):
+    """
+    Update aggregates for one GCS object event (Eventarc, Cloud Storage v1).
+    Overwrites arrive as 'finalized' for the new object plus 'deleted' for the old one.
+    Returns the project folder affected, or None for objects outside projects.
+    """
+    name = obj.get('name', '')
+    if '/' not in name or name.startswith('_') or name.endswith('/'):
+        return None
+    if event_type.endswith('.finalized'):
+        sign = 1
+    elif event_type.endswith('.deleted'):
+        sign = -1
+    else:
+        return None
+
+    project = name.split('/', 1)[0]
+    # Without the flag sync_folder and the email service count their own writes -
+    # counting events too would double them
+    if STATS_EVENTS_ENABLED:
+        delta = StatsDelta(project)
+        record = record_from_metadata(obj.get('metadata')) or document_metadata(name)
+        delta.add(name, obj.get('size'), record, sign)
+        delta.apply()
+    return project
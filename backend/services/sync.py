@@ -1,13 +1,25 @@
 # Drive Sync Service
 import os
 import io
+import hashlib
 import zipfile
 from datetime import datetime
 
 # Absolute imports from root
-from config import SUPPORTED_EXTENSIONS, ARCHIVE_EXTENSIONS, SKIP_EXTENSIONS, MAX_FILE_SIZE_MB, APP_ID
+from config import (
+    SUPPORTED_EXTENSIONS, ARCHIVE_EXTENSIONS, SKIP_EXTENSIONS, MAX_FILE_SIZE_MB, APP_ID, CAS_ENABLED, STATS_EVENTS_ENABLED
+)
 from clients import drive_service, get_bucket, firestore_client, FIRESTORE_ENABLED
-from utils.document import detect_document_type, extract_revision, extract_subject, is_valid_document, is_email_folder
+from utils.document import (
+    is_valid_document, is_email_folder, document_metadata, metadata_fields
+)
+from services.pipeline import create_pipeline, submit_to_pipeline
+from services.indexing import index_changes
+from services.dedup import DedupIndex
+from services.generation import bump_generation
+from services.latest import update_latest
+from services.stats import StatsDelta
+from utils.gcs import upload_bytes
 
 from googleapiclient.http import MediaIoBaseDownload
 
@@ -32,7 +44,7 @@ def list_drive_files(folder_id, recursive=True):
         while True:
             results = drive_service.files().list(
                 q=query,
-                fields='nextPageToken, files(id, name, mimeType, size, modifiedTime)',
+                fields='nextPageToken, files(id, name, mimeType, size, modifiedTime, md5Checksum)',
                 pageToken=page_token,
                 pageSize=1000
             ).execute()
@@ -48,7 +60,8 @@ def list_drive_files(folder_id, recursive=True):
                         'name': item['name'],
                         'path': item_path,
                         'size': int(item.get('size', 0)),
-                        'modified': item.get('modifiedTime')
+                        'modified': item.get('modifiedTime'),
+                        'md5': item.get('md5Checksum')
                     })
             
             page_token = results.get('nextPageToken')
@@ -78,7 +91,31 @@ def sync_folder(project_name, drive_folder_id):
     drive_files = list_drive_files(drive_folder_id)
     
     synced, skipped, errors, deleted = [], [], [], []
+    stored = []  # (blob, record) for the latest-documents index
+    # With object events wired up, /events/gcs counts these writes instead
+    stats = None if STATS_EVENTS_ENABLED else StatsDelta(project_name)
     drive_paths = set()
+    pipeline = create_pipeline(bucket)
+    dedup = DedupIndex(bucket) if CAS_ENABLED else None
+    
+    def store(path, content):
+        """Upload unless identical content is already stored (then copy server-side)"""
+        md5_hex = hashlib.md5(content).hexdigest()
+        meta = document_metadata(path)
+        blob = dedup.copy_to(md5_hex, path, metadata_fields(meta)) if dedup else None
+        if blob is None:
+            blob = upload_bytes(bucket, path, content, metadata=metadata_fields(meta))
+            submit_to_pipeline(pipeline, path, content, md5_hex, blob)
+            if dedup:
+                dedup.record(md5_hex, path)
+        track(path, blob, meta)
+    
+    def track(path, blob, meta):
+        stored.append((blob, meta))
+        if stats:
+            if path in existing_blobs:
+                stats.add_blob(existing_blobs[path], -1)
+            stats.add(path, blob.size, meta)
     
     for file in drive_files:
         ext = os.path.splitext(file['name'].lower())[1]
@@ -100,10 +137,23 @@ def sync_folder(project_name, drive_folder_id):
             if blob.updated and file['modified']:
                 drive_time = datetime.fromisoformat(file['modified'].replace('Z', '+00:00'))
                 if blob.updated >= drive_time:
+                    # Objects from before stored metadata keep being classified on read -
+                    # patching them would move 'updated' and make them look new
                     skipped.append({'name': file['name'], 'reason': 'Synced'})
                     continue
         
         try:
+            # Drive reports md5 for binary files - known content needs no download
+            meta = document_metadata(gcs_path)
+            blob = dedup.copy_to(file.get('md5'), gcs_path, metadata_fields(meta)) \
+                if dedup and ext not in ARCHIVE_EXTENSIONS else None
+            if blob is not None:
+                track(gcs_path, blob, meta)
+                synced.append({'name': file['name'], 'path': gcs_path})
+                if FIRESTORE_ENABLED and is_valid_document(file['name']):
+                    index_document(project_name, gcs_path, file)
+                continue
+            
             content = download_drive_file(file['id'])
             if ext in ARCHIVE_EXTENSIONS:
                 try:
@@ -114,12 +164,12 @@ def sync_folder(project_name, drive_folder_id):
                             ze = os.path.splitext(zi.filename.lower())[1]
                             if ze in SUPPORTED_EXTENSIONS:
                                 ep = f"{project_name}/{file['path'].rsplit('.', 1)[0]}/{zi.filename}"
-                                bucket.blob(ep).upload_from_string(zf.read(zi.filename))
+                                store(ep, zf.read(zi.filename))
                                 synced.append({'name': zi.filename, 'path': ep})
                 except zipfile.BadZipFile:
                     errors.append({'name': file['name'], 'error': 'Bad ZIP'})
             else:
-                bucket.blob(gcs_path).upload_from_string(content)
+                store(gcs_path, content)
                 synced.append({'name': file['name'], 'path': gcs_path})
                 if FIRESTORE_ENABLED and is_valid_document(file['name']):
                     index_document(project_name, gcs_path, file)
@@ -132,14 +182,39 @@ def sync_folder(project_name, drive_folder_id):
             try:
                 blob.delete()
                 deleted.append(gcs_path)
+                if stats:
+                    stats.add_blob(blob, -1)
             except:
                 pass
     
+    # Finish before the listing views are refreshed - sources are marked with their stored thumbnails
+    pipeline_stats = {stage.name: stage.finish() for stage in pipeline}
+    
+    if synced or deleted:
+        generation = bump_generation(project_name)
+        update_latest(project_name, generation - 1, stored, deleted)
+    
+    if stats:
+        try:
+            stats.apply()
+        except Exception as e:
+            print(f"Stats update error: {e}")
+    
+    # Tell Vertex AI Search about just the files that changed
+    try:
+        index_job = index_changes(project_name, [s['path'] for s in synced], deleted)
+    except Exception as e:
+        print(f"Incremental index error: {e}")
+        index_job = {'status': 'error', 'errors': [str(e)]}
+    
     return {
         'synced': len(synced),
         'skipped': len(skipped),
         'errors': len(errors),
-        'deleted': len(deleted)
+        'deleted': len(deleted),
+        'pipeline': pipeline_stats,
+        'dedup': dedup.stats if dedup else None,
+        'index': index_job
     }
 
 
@@ -148,9 +223,7 @@ def index_document(project_name, gcs_path, file_info):
     if not FIRESTORE_ENABLED:
         return
     
-    doc_type = detect_document_type(file_info['name'], gcs_path)
-    rev_num, rev_str = extract_revision(file_info['name'])
-    subject = extract_subject(file_info['name'], gcs_path)
+    meta = document_metadata(gcs_path, file_info['name'])
     
     doc_ref = firestore_client.collection('artifacts').document(APP_ID)\
         .collection('public').document('data')\
@@ -160,33 +233,11 @@ def index_document(project_name, gcs_path, file_info):
         'project': project_name,
         'filename': file_info['name'],
         'path': gcs_path,
-        'type': doc_type,
-        'subject': subject,
-        'revision': rev_num,
-        'revisionStr': rev_str,
+        'type': meta['type'],
+        'subject': meta['subject'],
+        'revision': meta['revision'],
+        'revisionStr': meta['revisionStr'],
         'size': file_info.get('size', 0),
         'modified': file_info.get('modified'),
         'indexed': datetime.utcnow().isoformat()
     })
-
-
-def get_project_stats(project_name):
-    """Get project statistics"""
-    bucket = get_bucket()
-    blobs = list(bucket.list_blobs(prefix=f'{project_name}/'))
-    
-    total_size, file_count, by_type = 0, 0, {}
-    
-    for blob in blobs:
-        if blob.name.endswith('/'):
-            continue
-        file_count += 1
-        total_size += blob.size or 0
-        doc_type = detect_document_type(blob.name, blob.name)
-        by_type[doc_type] = by_type.get(doc_type, 0) + 1
-    
-    return {
-        'fileCount': file_count,
-        'totalSize': total_size,
-        'byType': by_type
-    }
@@ -0,0 +1,24 @@
+# Thumbnail Lookup
+# Listings only point at thumbnails that were actually rendered: the sync pipeline
+# records the stored _thumbs/<md5>.webp path in the source object's custom metadata,
+# which arrives with the listing. Failed or skipped renders (password-protected PDFs,
+# Pillow missing) leave none.
+import os
+
+from config import THUMBNAIL_EXTENSIONS
+from utils.gcs import blob_md5_hex
+from workers.thumbnails import thumbnail_path, THUMBNAIL_METADATA_KEY
+
+
+def thumbnail_for_blob(blob):
+    """
+    Thumbnail path for a listed blob, or None if none was rendered for its content.
+    Thumbnails are keyed by the md5 of the original content (sourceMd5 for gzip-stored objects).
+    """
+    ext = os.path.splitext(blob.name.lower())[1]
+    if ext not in THUMBNAIL_EXTENSIONS:
+        return None
+    stored = (blob.metadata or {}).get(THUMBNAIL_METADATA_KEY)
+    md5_hex = blob_md5_hex(blob)
+    # A marker carried over from other content (e.g. a copy that kept metadata) doesn't count
+    return stored if stored and md5_hex and stored == thumbnail_path(md5_hex) else None
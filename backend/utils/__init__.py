@@ -8,17 +8,32 @@ from utils.document import (
     is_valid_document,
     is_approved_folder,
     is_email_folder,
+    classify_paths,
+    classify_paths_cached,
+    document_metadata,
+    metadata_cache,
     DOCUMENT_HIERARCHY
 )
 
+from utils.revision import (
+    document_revision,
+    priority_revision,
+    short_revision_label
+)
+
 from utils.gcs import (
+    listing_cache,
     list_blobs,
+    upload_bytes,
     upload_blob,
     download_blob,
     delete_blob,
     blob_exists,
     get_blob_metadata,
+    blob_md5_hex,
+    read_document_text,
     list_folders,
+    list_folder_page,
     get_folder_stats,
     detect_folder_structure
 )
@@ -32,14 +47,26 @@ __all__ = [
     'is_valid_document',
     'is_approved_folder',
     'is_email_folder',
+    'classify_paths',
+    'classify_paths_cached',
+    'document_metadata',
+    'metadata_cache',
     'DOCUMENT_HIERARCHY',
+    'document_revision',
+    'priority_revision',
+    'short_revision_label',
+    'listing_cache',
     'list_blobs',
+    'upload_bytes',
     'upload_blob',
     'download_blob',
     'delete_blob',
     'blob_exists',
     'get_blob_metadata',
+    'blob_md5_hex',
+    'read_document_text',
     'list_folders',
+    'list_folder_page',
     'get_folder_stats',
     'detect_folder_structure'
 ]
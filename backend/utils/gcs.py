@@ -1,6 +1,38 @@
 # GCS Operations
+import os
+import gzip
+import time
+import base64
+import hashlib
+import mimetypes
+import threading
+from collections import OrderedDict, namedtuple
+
+from google.api_core.exceptions import NotFound
+
 from clients import get_bucket, storage_client
-from config import GCS_BUCKET
+from config import GCS_BUCKET, GZIP_MIN_BYTES, LISTING_CACHE_TTL, LISTING_CACHE_MAX_RECORDS, INDEXABLE_EXTENSIONS
+from utils.singleflight import single_flight
+from workers.text import text_path
+
+# Text-like types are stored gzip-encoded (Content-Encoding: gzip). GCS serves them
+# decompressed to clients that don't accept gzip, and the client library decodes
+# them on download, so readers see the original bytes.
+# Types Vertex AI Search imports by GCS URI (INDEXABLE_EXTENSIONS - .txt, .html) are
+# stored as they are: its import isn't documented to decode Content-Encoding: gzip.
+COMPRESSIBLE_TYPES = {
+    '.txt': 'text/plain',
+    '.csv': 'text/csv',
+    '.html': 'text/html',
+    '.htm': 'text/html',
+    '.json': 'application/json; charset=utf-8',
+}
+
+# Object properties the listing routes use - custom metadata carries the stored
+# classification (see utils.document.metadata_fields)
+LISTING_FIELDS = 'items(name,generation,size,updated,md5Hash,metadata,contentEncoding),prefixes,nextPageToken'
+# Single-level /files pages - md5Hash keys thumbnails, metadata carries the stored classification
+FOLDER_PAGE_FIELDS = 'items(name,size,updated,md5Hash,metadata),prefixes,nextPageToken'
 
 
 # Project name to GCS folder mapping
@@ -36,24 +68,148 @@ def get_gcs_folder_name(project_name):
     return project_name
 
 
-def list_blobs(prefix, max_results=None):
-    """List blobs with prefix"""
-    bucket = get_bucket()
+# Compact listing record - the Blob attributes the listing routes read, without the
+# Blob object (bucket/client references, property dicts) behind them
+ListedBlob = namedtuple('ListedBlob', ['name', 'generation', 'size', 'updated', 'md5_hash', 'metadata', 'content_encoding'])
+
+
+def _listed(blob):
+    return ListedBlob(blob.name, blob.generation, blob.size, blob.updated, blob.md5_hash, blob.metadata,
+                      blob.content_encoding)
+
+
+class ListingCache:
+    """
+    Process-level LRU of listings keyed by (prefix, delimiter), holding ListedBlob
+    records and sub-folder prefixes. An entry is reused for LISTING_CACHE_TTL seconds
+    while its project's generation is unchanged; the memory cap counts records.
+    """
+    
+    def __init__(self, ttl=LISTING_CACHE_TTL, max_records=LISTING_CACHE_MAX_RECORDS):
+        self.ttl = ttl
+        self.max_records = max_records
+        self._entries = OrderedDict()  # key -> (generation, fetched at, records, prefixes)
+        self._records = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def _generation(prefix):
+        # Imported here - services imports utils
+        from services.generation import get_generation
+        return get_generation(prefix.split('/', 1)[0])
+    
+    def listing(self, prefix, delimiter=None):
+        """(records, prefixes) for a prefix, from cache or one GCS listing"""
+        key = (prefix, delimiter)
+        generation = self._generation(prefix)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == generation and time.time() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], entry[3]
+            self.misses += 1
+        
+        # Concurrent misses for the same listing share one GCS call
+        records, prefixes = single_flight.do(('listing', prefix, delimiter, generation), self._fetch, prefix, delimiter)
+        
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._records -= len(old[2])
+            if len(records) <= self.max_records:
+                self._entries[key] = (generation, time.time(), records, prefixes)
+                self._records += len(records)
+            while self._records > self.max_records:
+                _, evicted = self._entries.popitem(last=False)
+                self._records -= len(evicted[2])
+        return records, prefixes
+    
+    @staticmethod
+    def _fetch(prefix, delimiter):
+        iterator = get_bucket().list_blobs(prefix=prefix, delimiter=delimiter, fields=LISTING_FIELDS)
+        records = tuple(_listed(blob) for blob in iterator)
+        return records, tuple(iterator.prefixes) if delimiter else ()
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._records = 0
+            self.hits = self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'records': self._records,
+                'maxRecords': self.max_records,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else None
+            }
+
+
+listing_cache = ListingCache()
+
+
+def list_blobs(prefix, max_results=None, fields=None):
+    """
+    Blobs with prefix as ListedBlob records (name, generation, size, updated, md5_hash, metadata, content_encoding),
+    served from listing_cache. max_results lists directly, uncached.
+    fields: partial-response projection for uncached listings (cached ones use LISTING_FIELDS).
+    """
     if max_results:
-        return list(bucket.list_blobs(prefix=prefix, max_results=max_results))
-    return list(bucket.list_blobs(prefix=prefix))
+        return [_listed(blob) for blob in get_bucket().list_blobs(prefix=prefix, max_results=max_results, fields=fields)]
+    return list(listing_cache.listing(prefix)[0])
 
 
-def upload_blob(blob_name, data, content_type='application/octet-stream'):
-    """Upload data to GCS"""
-    bucket = get_bucket()
+def iter_blob_pages(prefix, fields=None):
+    """Blobs with prefix, one listing page (list) at a time"""
+    for page in get_bucket().list_blobs(prefix=prefix, fields=fields).pages:
+        yield list(page)
+
+
+def content_type_for(blob_name):
+    """Content-Type for an object name (octet-stream if unknown)"""
+    ext = os.path.splitext(blob_name.lower())[1]
+    if ext in COMPRESSIBLE_TYPES:
+        return COMPRESSIBLE_TYPES[ext]
+    return mimetypes.guess_type(blob_name)[0] or 'application/octet-stream'
+
+
+def upload_bytes(bucket, blob_name, data, content_type=None, metadata=None):
+    """
+    Upload data with a proper Content-Type, gzip-encoding text-like types that
+    aren't imported into the search datastore.
+    The md5 of the original bytes is kept in 'sourceMd5' metadata for compressed
+    objects, since GCS's md5 then covers the gzip stream.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
     blob = bucket.blob(blob_name)
-    blob.upload_from_string(data, content_type=content_type)
+    blob_metadata = dict(metadata or {})
+    ext = os.path.splitext(blob_name.lower())[1]
+    if ext in COMPRESSIBLE_TYPES and ext not in INDEXABLE_EXTENSIONS and len(data) >= GZIP_MIN_BYTES:
+        blob.content_encoding = 'gzip'
+        blob_metadata['sourceMd5'] = hashlib.md5(data).hexdigest()
+        data = gzip.compress(data, compresslevel=6, mtime=0)
+    if blob_metadata:
+        blob.metadata = blob_metadata
+    blob.upload_from_string(data, content_type=content_type or content_type_for(blob_name))
+    return blob
+
+
+def upload_blob(blob_name, data, content_type=None):
+    """Upload data to GCS"""
+    blob = upload_bytes(get_bucket(), blob_name, data, content_type)
     return blob.public_url
 
 
 def download_blob(blob_name):
-    """Download blob content"""
+    """Download blob content (gzip-encoded objects are decoded transparently)"""
     bucket = get_bucket()
     blob = bucket.blob(blob_name)
     return blob.download_as_bytes()
@@ -82,29 +238,68 @@ def get_blob_metadata(blob_name):
         'name': blob.name,
         'size': blob.size,
         'updated': blob.updated.isoformat() if blob.updated else None,
-        'content_type': blob.content_type
+        'content_type': blob.content_type,
+        'content_encoding': blob.content_encoding
     }
 
 
-def list_folders(prefix):
-    """List folders (prefixes) under a path"""
+def blob_md5_hex(blob):
+    """Hex md5 of a blob's original content (GCS reports it base64-encoded), or None"""
+    source_md5 = (blob.metadata or {}).get('sourceMd5')
+    if source_md5:
+        return source_md5
+    if not blob.md5_hash:
+        return None
+    return base64.b64decode(blob.md5_hash).hex()
+
+
+def read_document_text(blob_name, max_chars=None):
+    """
+    Read the plain text extracted at sync time for a document.
+    Returns '' if the blob is missing or no text was extracted.
+    """
     bucket = get_bucket()
-    iterator = bucket.list_blobs(prefix=prefix, delimiter='/')
+    blob = bucket.get_blob(blob_name)
+    if not blob or not blob.md5_hash:
+        return ''
     
-    # Consume iterator to get prefixes
-    list(iterator)
+    sidecar = bucket.blob(text_path(blob_md5_hex(blob)))
+    try:
+        text = gzip.decompress(sidecar.download_as_bytes()).decode('utf-8', errors='ignore')
+    except NotFound:
+        return ''
+    return text[:max_chars] if max_chars else text
+
+
+def list_folders(prefix):
+    """List folders (prefixes) under a path"""
+    _, prefixes = listing_cache.listing(prefix, delimiter='/')
     
     folders = []
-    if iterator.prefixes:
-        for p in iterator.prefixes:
-            folder_name = p.rstrip('/').split('/')[-1]
-            folders.append({
-                'name': folder_name,
-                'path': p
-            })
+    for p in sorted(prefixes):
+        folder_name = p.rstrip('/').split('/')[-1]
+        folders.append({
+            'name': folder_name,
+            'path': p
+        })
     return folders
 
 
+def list_folder_page(prefix, page_size, page_token=None, fields=FOLDER_PAGE_FIELDS):
+    """
+    One page of a single-level (delimiter) listing under prefix.
+    page_size counts files and sub-folders together, as GCS does.
+    Returns (blobs, sub-folder prefixes, next page token or None).
+    """
+    iterator = get_bucket().list_blobs(prefix=prefix, delimiter='/', max_results=page_size,
+                                       page_token=page_token or None, fields=fields)
+    page = next(iterator.pages, None)
+    if page is None:
+        return [], [], None
+    blobs = [b for b in page if b.name != prefix]  # folder placeholder object
+    return blobs, list(page.prefixes), iterator.next_page_token
+
+
 def get_folder_stats(prefix):
     """Get folder statistics"""
     blobs = list_blobs(prefix)
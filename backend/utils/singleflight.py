@@ -0,0 +1,113 @@
+# Single-Flight Request Coalescing
+# When several requests need the same expensive result at the same time (a project
+# listing, its stats, one search), only the first runs the work; the others wait for
+# it and get the same result - or the same exception. Nothing is kept once the call
+# finishes: this shares in-flight work, caching stays with the caches.
+#
+# Shared results are returned to every caller as-is, so callers must not mutate them.
+import functools
+import threading
+
+from config import SINGLEFLIGHT_TIMEOUT
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls by key. A caller that waits longer than timeout
+    seconds for the running call gives up on it and runs the work itself.
+    """
+
+    def __init__(self, timeout=SINGLEFLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key, fn, *args, timeout=None, **kwargs):
+        """fn(*args, **kwargs), shared with any call already in flight under key"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                call.waiters += 1
+
+        if not leader:
+            if call.done.wait(self.timeout if timeout is None else timeout):
+                with self._lock:
+                    self.shared += 1
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            with self._lock:
+                self.timeouts += 1
+                self.executions += 1
+            return fn(*args, **kwargs)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def clear(self):
+        """Reset the counters (calls in flight are left alone)"""
+        with self._lock:
+            self.executions = self.shared = self.timeouts = 0
+
+    def stats(self):
+        with self._lock:
+            calls = self.executions + self.shared
+            return {
+                'inFlight': len(self._calls),
+                'executions': self.executions,
+                'saved': self.shared,
+                'timeouts': self.timeouts,
+                'savedRate': round(self.shared / calls, 4) if calls else None
+            }
+
+
+single_flight = SingleFlight()
+
+
+def _default_key(*args, **kwargs):
+    return args + tuple(sorted(kwargs.items()))
+
+
+def coalesced(key=None, timeout=None, flight=None):
+    """
+    Decorator: concurrent calls of the function with the same key share one execution.
+    key(*args, **kwargs) builds the key from the arguments (default: the arguments
+    themselves, which must be hashable); it is combined with the function's name.
+    """
+    def decorator(fn):
+        name = f'{fn.__module__}.{fn.__qualname__}'
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call_key = (name, (key or _default_key)(*args, **kwargs))
+            return (flight or single_flight).do(call_key, fn, *args, timeout=timeout, **kwargs)
+
+        return wrapper
+    return decorator
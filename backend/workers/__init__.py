@@ -0,0 +1,3 @@
+# Workers package
+# CPU-bound functions executed inside the sync process pool.
+# Keep imports here light - never import clients (spawned workers load this package).
@@ -0,0 +1,110 @@
+# Text Extraction
+# Runs inside process-pool workers - keep this module free of client imports
+import io
+import gzip
+import zipfile
+import xml.etree.ElementTree as ET
+
+from config import TEXT_PREFIX, MAX_TEXT_CHARS
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+TEXT_CONTENT_TYPE = 'application/gzip'
+
+
+def text_path(md5_hex):
+    """GCS path of the extracted text for a given source md5 (hex)"""
+    return f"{TEXT_PREFIX}/{md5_hex}.txt.gz"
+
+
+def extract_pdf_text(data):
+    """Plain text of every PDF page, pages separated by form feeds"""
+    if pdfium is None:
+        return ''
+    pdf = pdfium.PdfDocument(data)
+    pages = []
+    try:
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            pages.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    return '\f'.join(pages)
+
+
+def extract_docx_text(data):
+    """Paragraph text from word/document.xml"""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        root = ET.fromstring(zf.read('word/document.xml'))
+    paragraphs = []
+    for p in root.iter(f'{WORD_NS}p'):
+        text = ''.join(t.text or '' for t in p.iter(f'{WORD_NS}t'))
+        if text:
+            paragraphs.append(text)
+    return '\n'.join(paragraphs)
+
+
+def extract_xlsx_text(data):
+    """Cell values of every sheet, one tab-separated line per row"""
+    lines = []
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        shared = []
+        if 'xl/sharedStrings.xml' in zf.namelist():
+            root = ET.fromstring(zf.read('xl/sharedStrings.xml'))
+            for si in root.iter(f'{SHEET_NS}si'):
+                shared.append(''.join(t.text or '' for t in si.iter(f'{SHEET_NS}t')))
+
+        sheets = sorted(n for n in zf.namelist() if n.startswith('xl/worksheets/') and n.endswith('.xml'))
+        for sheet in sheets:
+            root = ET.fromstring(zf.read(sheet))
+            for row in root.iter(f'{SHEET_NS}row'):
+                values = []
+                for cell in row.iter(f'{SHEET_NS}c'):
+                    cell_type = cell.get('t')
+                    if cell_type == 'inlineStr':
+                        value = ''.join(t.text or '' for t in cell.iter(f'{SHEET_NS}t'))
+                    else:
+                        v = cell.find(f'{SHEET_NS}v')
+                        value = v.text if v is not None and v.text else ''
+                        if cell_type == 's' and value:
+                            idx = int(value)
+                            value = shared[idx] if idx < len(shared) else ''
+                    if value:
+                        values.append(value)
+                if values:
+                    lines.append('\t'.join(values))
+    return '\n'.join(lines)
+
+
+EXTRACTORS = {
+    '.pdf': extract_pdf_text,
+    '.docx': extract_docx_text,
+    '.xlsx': extract_xlsx_text,
+}
+
+
+def extract_text(data, ext):
+    """
+    Extract plain text and return it gzip-compressed (UTF-8).
+    Returns None if the format is unsupported or the document has no text.
+    """
+    extractor = EXTRACTORS.get(ext)
+    if not extractor:
+        return None
+    try:
+        text = extractor(data).strip()
+    except Exception as e:
+        print(f"Text extraction error ({ext}): {e}")
+        return None
+    if not text:
+        return None
+    return gzip.compress(text[:MAX_TEXT_CHARS].encode('utf-8'), compresslevel=6)
@@ -0,0 +1,62 @@
+# Thumbnail Rendering
+# Runs inside process-pool workers - keep this module free of client imports
+import io
+
+from config import THUMBNAIL_PREFIX, THUMBNAIL_SIZE
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+THUMBNAILS_ENABLED = Image is not None
+THUMBNAIL_CONTENT_TYPE = 'image/webp'
+# Source object custom metadata naming its stored thumbnail (set by the sync pipeline)
+THUMBNAIL_METADATA_KEY = 'thumbnail'
+
+
+def thumbnail_path(md5_hex):
+    """GCS path of the thumbnail for a given source md5 (hex)"""
+    return f"{THUMBNAIL_PREFIX}/{md5_hex}.webp"
+
+
+def render_thumbnail(data, ext, size=THUMBNAIL_SIZE):
+    """
+    Render a small WebP preview of the first page (PDF) or the image itself.
+    Returns bytes, or None if the file can't be rendered.
+    """
+    if not THUMBNAILS_ENABLED:
+        return None
+
+    try:
+        if ext == '.pdf':
+            if pdfium is None:
+                return None
+            pdf = pdfium.PdfDocument(data)
+            try:
+                if len(pdf) == 0:
+                    return None
+                page = pdf[0]
+                width, height = page.get_size()
+                image = page.render(scale=size / max(width, height, 1)).to_pil()
+                page.close()
+            finally:
+                pdf.close()
+        else:
+            image = Image.open(io.BytesIO(data))
+            # Let JPEG decode at reduced scale instead of full resolution
+            image.draft('RGB', (size, size))
+
+        image = image.convert('RGB')
+        image.thumbnail((size, size))
+        out = io.BytesIO()
+        image.save(out, 'WEBP', quality=70)
+        return out.getvalue()
+    except Exception as e:
+        print(f"Thumbnail render error ({ext}): {e}")
+        return None
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Revision Parser Benchmark for Sigma HQ
+Per-filename cost of the shared parser (backend/utils/revision.py) against the
+three parsers it replaced, which are reproduced here unchanged. Results are the
+same; the shared module only compiles the patterns once:
+- backend utils/document.extract_revision
+- backend routes.py /latest inline rev_match
+- backend-whatsapp-webhook revision_parser.extract_revision_score + extract_date_score
+
+Usage:
+  python scripts/benchmark-revision-parser.py [count]
+"""
+
+import os
+import re
+import sys
+import timeit
+import importlib.util
+from datetime import datetime
+
+_spec = importlib.util.spec_from_file_location(
+    'revision', os.path.join(os.path.dirname(__file__), '..', 'backend', 'utils', 'revision.py')
+)
+revision = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(revision)
+
+
+# --- Before -------------------------------------------------------------------
+
+def legacy_extract_revision(filename):
+    lower = filename.lower()
+    patterns = [
+        r'rev[._\-\s]?(\d+)',
+        r'revision[._\-\s]?(\d+)',
+        r'\br(\d+)\b',
+        r'_r(\d+)_',
+        r'-r(\d+)-',
+        r'v(\d+)(?:\.\d+)?(?:[_\-\s]|$)',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, lower)
+        if match:
+            rev_num = int(match.group(1))
+            return rev_num, f"Rev {str(rev_num).zfill(2)}"
+    return 0, None
+
+
+def legacy_latest_revision(name):
+    rev_match = re.search(r'[_\-\s]?[Rr](?:ev)?\.?\s*(\d+)', name)
+    return f"R{rev_match.group(1)}" if rev_match else ''
+
+
+def legacy_revision_score(filename):
+    name_upper = filename.upper()
+    rev_num = re.search(r'REV[_\s\-\.]*(\d+)', name_upper)
+    if rev_num:
+        return int(rev_num.group(1)) * 100
+    r_num = re.search(r'[_\-\s]R(\d+)[_\-\s\.]', name_upper)
+    if r_num:
+        return int(r_num.group(1)) * 100
+    rev_letter = re.search(r'REV[_\s\-\.]*([A-Z])', name_upper)
+    if rev_letter:
+        return (ord(rev_letter.group(1)) - ord('A') + 1) * 10
+    version = re.search(r'V(?:ERSION)?[_\s\-\.]*(\d+)', name_upper)
+    if version:
+        return int(version.group(1)) * 100
+    suffix_num = re.search(r'[_\-](\d{2,3})(?:\.[a-zA-Z]+)?$', filename)
+    if suffix_num:
+        return int(suffix_num.group(1))
+    return 0
+
+
+def legacy_date_score(filename):
+    for pattern, order in [
+        (r'(20\d{2})[_\-](\d{2})[_\-](\d{2})', (1, 2, 3)),
+        (r'(\d{2})[_\-](\d{2})[_\-](20\d{2})', (3, 2, 1)),
+        (r'(20\d{2})(\d{2})(\d{2})', (1, 2, 3)),
+    ]:
+        match = re.search(pattern, filename)
+        if match:
+            try:
+                return int(datetime(*(int(match.group(g)) for g in order)).timestamp())
+            except ValueError:
+                pass
+    return 0
+
+
+def before(filename):
+    return (legacy_extract_revision(filename), legacy_latest_revision(filename),
+            legacy_revision_score(filename), legacy_date_score(filename))
+
+
+# --- After --------------------------------------------------------------------
+
+def after(filename):
+    return (revision.document_revision(filename), revision.short_revision_label(filename),
+            revision.revision_score(filename), revision.date_score(filename))
+
+
+FILENAMES = [
+    'SD-A-101_Kitchen Layout_Rev02.pdf',
+    'SD-E-210 Small Power Layout R3.pdf',
+    'SD-M-301-AC Ducting rev.4 FINAL.pdf',
+    'Floor Finishes - Porcelain Tiles v2.pdf',
+    'MOM-012 Site Meeting 2025-11-03.pdf',
+    'VO-07 Extra Work Ceiling.xlsx',
+    'RFI-023 Response.pdf',
+    'Ceiling Rev B.pdf',
+    'Weekly Report 14.pdf',
+    '20250115_RE_Approval_of_Shop_Drawings.json',
+    'Contract Agreement signed.pdf',
+    'Material Submittal - Vinyl Flooring rev 3.pdf',
+]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    names = [f"{i:05d} {FILENAMES[i % len(FILENAMES)]}" for i in range(count)]
+
+    assert [before(n) for n in names] == [after(n) for n in names]
+
+    results = {}
+    for label, fn in [('before (3 parsers)', before), ('after (shared)', after)]:
+        seconds = min(timeit.repeat(lambda: [fn(n) for n in names], number=1, repeat=5))
+        results[label] = seconds
+        print(f"{label:20} {seconds * 1e6 / count:7.2f} us/filename")
+
+    print(f"speedup: {results['before (3 parsers)'] / results['after (shared)']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -77,6 +77,8 @@ export default function ChannelSettings({ projects }) {
   
   // Unclassified emails state
   const [unclassifiedEmails, setUnclassifiedEmails] = useState([]);
+  const [unclassifiedCursor, setUnclassifiedCursor] = useState(null);
+  const [unclassifiedTotal, setUnclassifiedTotal] = useState(0);
   const [loadingUnclassified, setLoadingUnclassified] = useState(false);
   const [classifyingEmail, setClassifyingEmail] = useState(null);
   const [expandedEmail, setExpandedEmail] = useState(null);
@@ -213,18 +215,23 @@ export default function ChannelSettings({ projects }) {
     }
   }, [activeTab]);
 
-  const loadUnclassifiedEmails = async () => {
+  // Paged - cursor = next page after the ones already shown (null reloads from the top)
+  const loadUnclassifiedEmails = async (cursor = null) => {
     setLoadingUnclassified(true);
     try {
-      const res = await fetch(`${SYNC_WORKER_URL}/unclassified`);
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+      const res = await fetch(`${SYNC_WORKER_URL}/unclassified${query}`);
       if (res.ok) {
         const data = await res.json();
-        setUnclassifiedEmails(data.emails || []);
+        const emails = data.emails || [];
+        setUnclassifiedEmails(prev => cursor ? [...prev, ...emails] : emails);
+        setUnclassifiedCursor(data.nextCursor || null);
+        setUnclassifiedTotal(data.total ?? emails.length);
         const assignments = {};
-        data.emails?.forEach(email => {
+        emails.forEach(email => {
           assignments[email.id] = { project: '', type: email.type || 'correspondence' };
         });
-        setEmailAssignments(assignments);
+        setEmailAssignments(prev => cursor ? { ...prev, ...assignments } : assignments);
       }
     } catch (err) {
       console.error('Error loading unclassified emails:', err);
@@ -405,7 +412,7 @@ export default function ChannelSettings({ projects }) {
 
   const tabs = [
     { id: 'whatsapp', label: 'WhatsApp', icon: 'message-circle', color: 'green', connected: true },
-    { id: 'email', label: 'Email', icon: 'mail', color: 'blue', connected: true, badge: unclassifiedEmails.length },
+    { id: 'email', label: 'Email', icon: 'mail', color: 'blue', connected: true, badge: unclassifiedTotal },
     { id: 'slack', label: 'Slack', icon: 'hash', color: 'purple', connected: false },
   ];
 
@@ -733,19 +740,19 @@ export default function ChannelSettings({ projects }) {
               </div>
               <div className="flex items-center gap-2">
                 <button
-                  onClick={loadUnclassifiedEmails}
+                  onClick={() => loadUnclassifiedEmails()}
                   disabled={loadingUnclassified}
                   className="p-1.5 text-slate-500 hover:text-blue-600 transition-colors"
                 >
                   <Icon name="refresh-cw" size={14} className={loadingUnclassified ? 'animate-spin' : ''} />
                 </button>
                 <span className="text-[10px] font-medium text-red-600 bg-red-100 px-2 py-1 rounded-full">
-                  {unclassifiedEmails.length} pending
+                  {unclassifiedTotal} pending
                 </span>
               </div>
             </div>
             
-            {loadingUnclassified ? (
+            {loadingUnclassified && unclassifiedEmails.length === 0 ? (
               <div className="p-8 text-center">
                 <Icon name="loader-2" size={24} className="animate-spin text-slate-400 mx-auto" />
               </div>
@@ -851,6 +858,15 @@ export default function ChannelSettings({ projects }) {
                     )}
                   </div>
                 ))}
+                {unclassifiedCursor && (
+                  <button
+                    onClick={() => loadUnclassifiedEmails(unclassifiedCursor)}
+                    disabled={loadingUnclassified}
+                    className="w-full p-3 text-xs font-medium text-blue-600 hover:bg-blue-50 disabled:text-slate-400"
+                  >
+                    {loadingUnclassified ? 'Loading...' : `Load more (${unclassifiedTotal - unclassifiedEmails.length} remaining)`}
+                  </button>
+                )}
               </div>
             )}
           </div>
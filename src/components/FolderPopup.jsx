@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import Icon from './Icon';
 import { SYNC_WORKER_URL } from '../config';
 import { parseFilename, getFileIcon, detectDocumentType, getDocTypeInfo } from '../utils/documentUtils';
@@ -14,11 +14,14 @@ const getGcsFolderName = (project) => {
 export default function FolderPopup({ project, folder, title, gcsFolderName: passedGcsFolderName, onClose }) {
   const [files, setFiles] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextPageToken, setNextPageToken] = useState(null);
   const [error, setError] = useState(null);
   const [selectedFile, setSelectedFile] = useState(null);
   const [viewingFile, setViewingFile] = useState(null);
   const [currentPath, setCurrentPath] = useState(folder);
   const [pathHistory, setPathHistory] = useState([{ path: folder, title: title }]);
+  const loadingPath = useRef(folder);
 
   // Use passed gcsFolderName or calculate it
   const gcsFolderName = passedGcsFolderName || getGcsFolderName(project);
@@ -27,25 +30,50 @@ export default function FolderPopup({ project, folder, title, gcsFolderName: pas
     loadFiles(currentPath);
   }, [currentPath]);
 
+  const fetchPage = async (folderPath, pageToken) => {
+    const res = await fetch(`${SYNC_WORKER_URL}/files`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ projectName: gcsFolderName, folderPath, pageToken })
+    });
+    if (!res.ok) throw new Error('Failed to load files');
+    return res.json();
+  };
+
   const loadFiles = async (folderPath) => {
+    loadingPath.current = folderPath;
     setLoading(true);
     setError(null);
     setSelectedFile(null);
+    setNextPageToken(null);
     
     try {
-      const res = await fetch(`${SYNC_WORKER_URL}/files`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ projectName: gcsFolderName, folderPath })
-      });
-      if (!res.ok) throw new Error('Failed to load files');
-      const data = await res.json();
+      const data = await fetchPage(folderPath, null);
+      if (loadingPath.current !== folderPath) return;
       setFiles(data.files || []);
+      setNextPageToken(data.nextPageToken || null);
     } catch (err) {
+      if (loadingPath.current !== folderPath) return;
       setError('Could not load files');
       setFiles([]);
     } finally {
-      setLoading(false);
+      if (loadingPath.current === folderPath) setLoading(false);
+    }
+  };
+
+  // /files is paged - each page comes in server order (folders first, then priority) and is appended as is
+  const loadMore = async () => {
+    const folderPath = currentPath;
+    setLoadingMore(true);
+    try {
+      const data = await fetchPage(folderPath, nextPageToken);
+      if (loadingPath.current !== folderPath) return;
+      setFiles(prev => [...prev, ...(data.files || [])]);
+      setNextPageToken(data.nextPageToken || null);
+    } catch (err) {
+      console.error('Error loading more files:', err);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
@@ -187,6 +215,12 @@ export default function FolderPopup({ project, folder, title, gcsFolderName: pas
                       </div>
                     );
                   })}
+                  {nextPageToken && (
+                    <button onClick={loadMore} disabled={loadingMore}
+                      className="w-full p-3 text-xs font-medium text-blue-600 hover:bg-slate-50 disabled:text-slate-400 transition-colors">
+                      {loadingMore ? 'Loading...' : 'Load more'}
+                    </button>
+                  )}
                 </div>
               )}
             </div>
@@ -228,7 +262,7 @@ export default function FolderPopup({ project, folder, title, gcsFolderName: pas
 
           {/* Footer */}
           <div className="p-4 border-t border-slate-100 flex items-center justify-between bg-slate-50">
-            <span className="text-xs text-slate-500">{files.filter(f => f.type === 'file').length} files{files.filter(f => f.type === 'folder').length > 0 && `, ${files.filter(f => f.type === 'folder').length} folders`}</span>
+            <span className="text-xs text-slate-500">{files.filter(f => f.type === 'file').length} files{files.filter(f => f.type === 'folder').length > 0 && `, ${files.filter(f => f.type === 'folder').length} folders`}{nextPageToken && ' shown'}</span>
             <button onClick={() => project?.driveLink && window.open(project.driveLink, '_blank')} className="flex items-center gap-2 px-3 py-1.5 bg-white border border-slate-200 rounded-lg text-xs font-medium text-slate-700 hover:bg-slate-50 transition-colors">
               <Icon name="external-link" size={12} />Open in Drive
             </button>
@@ -127,15 +127,22 @@ export default function Vault({ project }) {
   const loadFolders = async () => {
     setLoadingFolders(true);
     try {
-      const res = await fetch(`${SYNC_WORKER_URL}/files`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ projectName: gcsFolderName, folderPath: '' })
-      });
-      if (res.ok) {
+      // sort=full lists sub-folders before files - page until the files start
+      const rootFolders = [];
+      let pageToken = null;
+      do {
+        const res = await fetch(`${SYNC_WORKER_URL}/files`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ projectName: gcsFolderName, folderPath: '', sort: 'full', pageToken })
+        });
+        if (!res.ok) break;
         const data = await res.json();
-        setFolders((data.files || []).filter(f => f.type === 'folder'));
-      } else setFolders([]);
+        const entries = data.files || [];
+        rootFolders.push(...entries.filter(f => f.type === 'folder'));
+        pageToken = entries.some(f => f.type !== 'folder') ? null : data.nextPageToken;
+      } while (pageToken);
+      setFolders(rootFolders);
     } catch (err) {
       console.error('Error loading folders:', err);
       setFolders([]);
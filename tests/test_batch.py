@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+/batch endpoint (backend/routes.py).
+Sub-requests go through the real routes; the services behind them are local
+stubs - no GCP calls.
+
+Run: python -m pytest tests/test_batch.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from flask import Flask
+
+import routes
+from services import generation
+
+
+@pytest.fixture
+def client(monkeypatch):
+    def get_project_stats(project):
+        if project == 'Broken':
+            raise RuntimeError('listing failed')
+        return {'project': project, 'fileCount': 3}
+
+    def get_index_jobs(limit):
+        raise RuntimeError('jobs unavailable')
+
+    monkeypatch.setattr(routes, 'get_project_stats', get_project_stats)
+    monkeypatch.setattr(routes, 'get_index_jobs', get_index_jobs)
+    monkeypatch.setattr(routes, 'get_gcs_folder_name', lambda project: project)
+    # Per-instance generations - no Firestore
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+
+    app = Flask(__name__)
+    routes.register_routes(app)
+    return app.test_client()
+
+
+def _batch(client, *subs):
+    return client.post('/batch', json={'requests': list(subs)})
+
+
+def test_status_and_body_per_sub_request(client):
+    response = _batch(client,
+                      {'id': 'a', 'path': '/stats', 'params': {'project': 'P'}},
+                      {'id': 'b', 'path': '/stats', 'params': {'project': 'Q'}},
+                      {'id': 'c', 'path': '/stats'})
+    assert response.status_code == 200
+    results = response.get_json()['responses']
+    assert results['a']['status'] == 200 and results['a']['body'] == {'project': 'P', 'fileCount': 3}
+    assert results['b']['body']['project'] == 'Q'
+    assert results['c']['status'] == 400 and results['c']['etag'] is None
+    assert results['a']['etag'] and results['a']['etag'] != results['b']['etag']
+
+
+def test_matching_etag_gets_304(client):
+    tag = _batch(client, {'id': 'a', 'path': '/stats', 'params': {'project': 'P'}}).get_json()['responses']['a']['etag']
+
+    results = _batch(client, {'id': 'a', 'path': '/stats', 'params': {'project': 'P'}, 'etag': tag},
+                     {'id': 'b', 'path': '/stats', 'params': {'project': 'P'}, 'etag': 'stale'}).get_json()['responses']
+    assert results['a'] == {'status': 304, 'etag': tag, 'body': None}
+    assert results['b']['status'] == 200 and results['b']['etag'] == tag
+
+    generation.bump_generation('P')
+    results = _batch(client, {'id': 'a', 'path': '/stats', 'params': {'project': 'P'}, 'etag': tag}).get_json()['responses']
+    assert results['a']['status'] == 200 and results['a']['etag'] != tag
+
+
+def test_failures_stay_in_their_sub_request(client):
+    results = _batch(client,
+                     {'id': 'ok', 'path': '/stats', 'params': {'project': 'P'}},
+                     {'id': 'raises', 'path': '/stats', 'params': {'project': 'Broken'}},
+                     {'id': 'handled', 'path': '/index-jobs'}).get_json()['responses']
+    assert results['ok']['status'] == 200
+    assert results['raises']['status'] == 500
+    assert results['handled'] == {'status': 500, 'etag': None, 'body': {'error': 'jobs unavailable'}}
+
+
+def test_request_limit(client):
+    subs = [{'id': str(i), 'path': '/stats', 'params': {'project': 'P'}} for i in range(routes.BATCH_MAX_REQUESTS + 1)]
+    assert _batch(client, *subs).status_code == 400
+    response = _batch(client, *subs[:-1])
+    assert response.status_code == 200 and len(response.get_json()['responses']) == routes.BATCH_MAX_REQUESTS
+
+
+@pytest.mark.parametrize('sub', [
+    {'id': 'a', 'path': '/sync'},                      # writes
+    {'id': 'a', 'path': '/classify'},                  # writes
+    {'id': 'a', 'path': '/admin/list-projects'},       # not allowed
+    {'id': 'a', 'path': '/batch'},                     # no nesting
+    {'id': 'a', 'path': '/stats?project=P'},           # query string belongs in params
+    {'path': '/stats'},                                # no id
+    {'id': 'a', 'path': '/stats', 'params': ['P']},    # params not an object
+])
+def test_rejected_sub_requests(client, sub):
+    response = _batch(client, {'id': 'ok', 'path': '/stats', 'params': {'project': 'P'}}, sub)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_rejected_batches(client):
+    assert client.post('/batch', json={}).status_code == 400
+    assert _batch(client).status_code == 400
+    assert _batch(client, {'id': 'a', 'path': '/stats'}, {'id': 'a', 'path': '/latest'}).status_code == 400
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Email classify/move (backend/services/classify.py and the /classify/bulk route).
+Objects live in a local stub bucket - no GCP calls.
+
+Run: python -m pytest tests/test_classify.py
+"""
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import classify, generation
+
+SOURCES = [f'_Unclassified_Emails/mail-{i:02}.eml' for i in range(10)]
+
+
+class StubBucket:
+    def __init__(self):
+        self.objects = {name: b'x' * (i + 1) for i, name in enumerate(SOURCES)}
+        self.metadata = {}
+        self.encodings = {}
+        self.batches = 0
+        self.listings = 0
+        self.lock = threading.Lock()
+
+    def blob(self, name):
+        return StubBlob(self, name)
+
+    def list_blobs(self, prefix):
+        # What the cached listing returns - records, no per-object reads
+        with self.lock:
+            self.listings += 1
+            return [SimpleNamespace(name=name, metadata=self.metadata.get(name), content_encoding=self.encodings.get(name))
+                    for name in sorted(self.objects) if name.startswith(prefix)]
+
+
+class StubBlob:
+    def __init__(self, bucket, name):
+        self.bucket, self.name = bucket, name
+        self.metadata = self.content_type = self.content_encoding = None
+
+    def rewrite(self, source, token=None):
+        with self.bucket.lock:
+            if source.name not in self.bucket.objects:
+                raise classify.NotFound('No such object')
+            data = self.bucket.objects[self.name] = self.bucket.objects[source.name]
+            if self.metadata is None and self.content_type is None and self.content_encoding is None:
+                # Nothing sent - the copy keeps the source's properties
+                self.bucket.metadata[self.name] = self.bucket.metadata.get(source.name)
+                self.bucket.encodings[self.name] = self.bucket.encodings.get(source.name)
+            else:
+                self.bucket.metadata[self.name] = self.metadata
+                self.bucket.encodings[self.name] = self.content_encoding
+        return None, len(data), len(data)
+
+    def delete(self):
+        with self.bucket.lock:
+            if self.name not in self.bucket.objects:
+                raise classify.NotFound('No such object')
+            del self.bucket.objects[self.name]
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    stub = StubBucket()
+
+    @contextmanager
+    def batch():
+        stub.batches += 1
+        yield
+
+    monkeypatch.setattr(classify, 'get_bucket', lambda: stub)
+    monkeypatch.setattr(classify, 'list_blobs', stub.list_blobs)
+    monkeypatch.setattr(classify, 'storage_client', type('Client', (), {'batch': staticmethod(batch)}))
+    monkeypatch.setattr(classify, 'get_gcs_folder_name', lambda project: {'Agora': 'Agora-GEM'}.get(project, project))
+    monkeypatch.setattr(classify, 'STATS_EVENTS_ENABLED', True)
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+    return stub
+
+
+def test_bulk_move_results_in_order(bucket):
+    items = [{'path': path, 'project': 'Agora' if i % 2 else 'Bahra'} for i, path in enumerate(SOURCES)]
+    items.insert(3, {'path': '_Unclassified_Emails/gone.eml', 'project': 'Agora'})
+    items.append({'path': SOURCES[0]})
+
+    results = classify.classify_many(items)
+
+    assert [r['path'] for r in results] == [item.get('path') for item in items]
+    assert results[3] == {'path': '_Unclassified_Emails/gone.eml', 'success': False, 'error': 'File not found'}
+    assert results[-1]['error'] == 'Path and project required'
+    assert results[1]['newPath'] == 'Agora-GEM/09-Correspondence/mail-01.eml'
+    assert sum(r['success'] for r in results) == 10
+
+    assert not any(name.startswith('_Unclassified_Emails/') for name in bucket.objects)
+    assert bucket.batches == 1
+    assert bucket.listings == 1
+    assert bucket.metadata['Bahra/09-Correspondence/mail-00.eml']['docType'] == 'correspondence'
+
+
+def test_generations_bumped_once_per_project(bucket):
+    before = {p: generation.get_generation(p) for p in ('Agora-GEM', 'Bahra', '_Unclassified_Emails')}
+    classify.classify_many([{'path': path, 'project': 'Agora'} for path in SOURCES])
+    assert generation.get_generation('Agora-GEM') == before['Agora-GEM'] + 1
+    assert generation.get_generation('Bahra') == before['Bahra']
+    assert generation.get_generation('_Unclassified_Emails') == before['_Unclassified_Emails'] + 1
+
+
+def test_classify_one_missing_source(bucket):
+    assert classify.classify_one(SOURCES[0], 'Agora') == 'Agora-GEM/09-Correspondence/mail-00.eml'
+    with pytest.raises(classify.NotFound):
+        classify.classify_one(SOURCES[0], 'Agora')
+
+
+def test_gzip_encoded_source_keeps_its_encoding(bucket):
+    source = '_Unclassified_Emails/thread.txt'
+    bucket.objects[source] = b'gzip stream'
+    bucket.encodings[source] = 'gzip'
+    bucket.metadata[source] = {'sourceMd5': 'abc123', 'docType': 'email'}
+
+    dest = classify.classify_one(source, 'Agora')
+
+    assert bucket.objects[dest] == b'gzip stream'
+    assert bucket.encodings[dest] == 'gzip'
+    assert bucket.metadata[dest]['sourceMd5'] == 'abc123'
+    assert bucket.metadata[dest]['docType'] == classify.document_metadata(dest)['type']
+
+
+def test_source_missing_from_listing_keeps_its_properties(bucket, monkeypatch):
+    # Written after the cached listing was taken - the rewrite copies it as it is
+    source = '_Unclassified_Emails/late.txt'
+    bucket.objects[source] = b'gzip stream'
+    bucket.encodings[source] = 'gzip'
+    bucket.metadata[source] = {'sourceMd5': 'abc123'}
+    monkeypatch.setattr(classify, 'list_blobs', lambda prefix: [])
+
+    dest = classify.classify_one(source, 'Agora')
+
+    assert bucket.encodings[dest] == 'gzip'
+    assert bucket.metadata[dest] == {'sourceMd5': 'abc123'}
+
+
+def test_bulk_route_rejects_type(bucket):
+    # Emails always go to 09-Correspondence - a type would be silently ignored
+    from flask import Flask
+    import routes
+    app = Flask(__name__)
+    routes.register_routes(app)
+    client = app.test_client()
+
+    response = client.post('/classify/bulk', json={'items': [{'path': SOURCES[0], 'project': 'Agora', 'type': 'rfi'}]})
+    assert response.status_code == 400
+    assert SOURCES[0] in bucket.objects
+
+    response = client.post('/classify/bulk', json={'items': [{'path': SOURCES[0], 'project': 'Agora'}]})
+    assert response.get_json()['moved'] == 1
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Response compression (backend/utils/compression.py and its copy in
+backend-email/utils/compression.py).
+
+Run: python -m pytest tests/test_compression.py
+"""
+
+import os
+import gzip
+import json
+import importlib.util
+
+import pytest
+from flask import Flask, Response, jsonify
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+BACKEND_COPY = os.path.join(ROOT, 'backend', 'utils', 'compression.py')
+EMAIL_COPY = os.path.join(ROOT, 'backend-email', 'utils', 'compression.py')
+
+_spec = importlib.util.spec_from_file_location('compression', BACKEND_COPY)
+compression = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(compression)
+
+BIG = {'files': [{'name': f'SD-A-{i:03}.pdf', 'type': 'shop_drawing'} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route('/big')
+    def big():
+        return jsonify(BIG)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/stream')
+    def stream():
+        return Response((json.dumps(f) + '\n' for f in BIG['files']), mimetype='application/json')
+
+    @app.route('/image')
+    def image():
+        return Response(b'\x89PNG' * 1000, mimetype='image/png')
+
+    compression.init_compression(app)
+    return app.test_client()
+
+
+def test_service_copies_are_identical():
+    with open(BACKEND_COPY, 'rb') as a, open(EMAIL_COPY, 'rb') as b:
+        assert a.read() == b.read()
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', 'br' if compression.BROTLI_ENABLED else 'gzip'),
+    ('gzip', 'gzip'),
+    ('br;q=0, gzip;q=0.5', 'gzip'),
+    ('gzip;q=0', None),
+    ('identity', None),
+    ('', None),
+    ('*', 'br' if compression.BROTLI_ENABLED else 'gzip'),
+])
+def test_choose_encoding(header, expected):
+    assert compression.choose_encoding(header) == expected
+
+
+def test_large_json_gzipped(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data)) == BIG
+    assert int(response.headers['Content-Length']) == len(response.data)
+
+
+@pytest.mark.skipif(not compression.BROTLI_ENABLED, reason='Brotli not installed')
+def test_large_json_brotli(client):
+    response = client.get('/big', headers={'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(compression.brotli.decompress(response.data)) == BIG
+
+
+def test_small_and_binary_untouched(client):
+    assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/image', headers={'Accept-Encoding': 'gzip'}).headers
+    assert 'Content-Encoding' not in client.get('/big').headers
+
+
+def test_streamed_responses_untouched(client):
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert [json.loads(line) for line in response.data.decode().splitlines()] == BIG['files']
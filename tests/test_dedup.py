@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Content-addressed dedup (backend/services/dedup.py).
+Objects live in a local stub bucket - no GCP calls.
+
+Run: python -m pytest tests/test_dedup.py
+"""
+
+import os
+import sys
+import base64
+import hashlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services.dedup import DedupIndex
+
+
+class StubBucket:
+    def __init__(self):
+        self.objects = {}  # name -> StubBlob (stored state)
+        self.rewrites = 0
+
+    def blob(self, name):
+        return StubBlob(self, name)
+
+    def get_blob(self, name):
+        return self.objects.get(name)
+
+    def put(self, name, data, content_type=None, content_encoding=None, metadata=None):
+        blob = self.blob(name)
+        blob.content_type, blob.content_encoding, blob.metadata = content_type, content_encoding, metadata
+        blob.upload_from_string(data)
+        return blob
+
+
+class StubBlob:
+    def __init__(self, bucket, name):
+        self.bucket, self.name = bucket, name
+        self.data = self.md5_hash = None
+        self.metadata = self.content_type = self.content_encoding = None
+
+    def upload_from_string(self, data):
+        self.data = data
+        self.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode()
+        self.bucket.objects[self.name] = self
+
+    def rewrite(self, source, token=None):
+        """Two calls per copy, like a large rewrite; unset properties come from the source"""
+        self.bucket.rewrites += 1
+        if token is None:
+            return 'more', 0, len(source.data)
+        self.data, self.md5_hash = source.data, source.md5_hash
+        for attr in ('metadata', 'content_type', 'content_encoding'):
+            if getattr(self, attr) is None:
+                setattr(self, attr, getattr(source, attr))
+        self.bucket.objects[self.name] = self
+        return None, len(source.data), len(source.data)
+
+
+def _md5(data):
+    return hashlib.md5(data).hexdigest()
+
+
+@pytest.fixture
+def bucket():
+    return StubBucket()
+
+
+def test_recorded_content_is_copied_server_side(bucket):
+    bucket.put('A/spec.pdf', b'spec')
+    index = DedupIndex(bucket)
+    index.record(_md5(b'spec'), 'A/spec.pdf')
+
+    # A later sync run finds the source through the _cas/ marker
+    copy = DedupIndex(bucket).copy_to(_md5(b'spec'), 'B/spec.pdf')
+    assert copy.name == 'B/spec.pdf'
+    assert bucket.objects['B/spec.pdf'].data == b'spec'
+    assert bucket.rewrites == 2
+    assert index.stats == {'copied': 0, 'recorded': 1}
+
+
+def test_first_copy_wins(bucket):
+    index = DedupIndex(bucket)
+    index.record(_md5(b'x'), 'A/x.pdf')
+    index.record(_md5(b'x'), 'B/x.pdf')
+    assert bucket.objects[f'_cas/{_md5(b"x")}'].metadata == {'path': 'A/x.pdf'}
+    assert index.stats['recorded'] == 1
+
+
+def test_misses(bucket):
+    index = DedupIndex(bucket)
+    assert index.copy_to(None, 'B/x.pdf') is None
+    assert index.copy_to(_md5(b'unknown'), 'B/x.pdf') is None
+
+    # Source deleted or overwritten since it was recorded
+    bucket.put('A/gone.pdf', b'gone')
+    index.record(_md5(b'gone'), 'A/gone.pdf')
+    del bucket.objects['A/gone.pdf']
+    assert index.copy_to(_md5(b'gone'), 'B/gone.pdf') is None
+
+    bucket.put('A/changed.pdf', b'before')
+    index.record(_md5(b'before'), 'A/changed.pdf')
+    bucket.put('A/changed.pdf', b'after')
+    assert index.copy_to(_md5(b'before'), 'B/changed.pdf') is None
+    assert 'B/changed.pdf' not in bucket.objects and index.stats['copied'] == 0
+
+
+def test_copy_onto_its_source_is_a_no_op(bucket):
+    source = bucket.put('A/x.pdf', b'x')
+    index = DedupIndex(bucket)
+    index.record(_md5(b'x'), 'A/x.pdf')
+    assert index.copy_to(_md5(b'x'), 'A/x.pdf') is source
+    assert bucket.rewrites == 0
+
+
+def test_copy_metadata_replaces_path_specific_fields(bucket):
+    # Gzip-stored text is found by the md5 of its original bytes
+    bucket.put('A/notes.txt', b'gzip bytes', content_type='text/plain', content_encoding='gzip',
+               metadata={'sourceMd5': _md5(b'notes'), 'docType': 'report'})
+    index = DedupIndex(bucket)
+    index.record(_md5(b'notes'), 'A/notes.txt')
+
+    copy = index.copy_to(_md5(b'notes'), 'B/notes.txt', metadata={'docType': 'mom'})
+    assert copy.metadata == {'sourceMd5': _md5(b'notes'), 'docType': 'mom'}
+    assert (copy.content_type, copy.content_encoding) == ('text/plain', 'gzip')
+    assert index.stats['copied'] == 1
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Differential test: utils.document.classify_paths (compiled batch classifier)
+must give exactly the same answers as the if-chain classifier it replaced -
+a frozen copy in tests/baseline_classifier.py - over a corpus of project paths.
+
+Also covers the LRU metadata cache in front of it, and checks the email service's
+copy (backend-email/utils/document.py) matches.
+
+Run: python -m pytest tests/test_document_classifier.py
+"""
+
+import os
+import sys
+import types
+import importlib
+import importlib.util
+from itertools import product
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..', 'backend')
+sys.path.insert(0, BACKEND)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import baseline_classifier as baseline
+
+# Load utils/document.py directly - the utils package __init__ pulls in GCP clients.
+# Without them, its utils.revision import comes from a bare package over the same directory.
+try:
+    importlib.import_module('utils')
+except ImportError:
+    _utils = types.ModuleType('utils')
+    _utils.__path__ = [os.path.join(BACKEND, 'utils')]
+    sys.modules['utils'] = _utils
+
+_spec = importlib.util.spec_from_file_location('document', os.path.join(BACKEND, 'utils', 'document.py'))
+document = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(document)
+
+
+PROJECTS = ['Agora-GEM', 'Springfield-D5', 'AFV-LV', 'Eichholtz', 'Ecolab-CFC', 'Bahra']
+
+# Folders seen in project buckets - NEW 10-folder structure and the OLD layouts
+FOLDERS = [
+    '',
+    '01.Correspondence/Client/CORRESPONDENCE',
+    '01.Correspondence/Client/RFI',
+    '01.Correspondence/Contractor',
+    '01.Correspondence/Internal-Memos',
+    '02.Project-Info/Tender-Documents',
+    '02.Project-Info/Mall-Requirements',
+    '02.Project-Info/Time-Schedule',
+    '03.Design-Drawings/Architectural',
+    '03.Design-Drawings/MEP',
+    '04.Shop-Drawings/Architectural/Pending',
+    '04.Shop-Drawings/Architectural/Approved',
+    '04.Shop-Drawings/MEP/Approved',
+    '05.Contract-BOQ/Contract',
+    '05.Contract-BOQ/BOQ',
+    '05.Contract-BOQ',
+    '06.QS-Procurement/QS-Sheets',
+    '06.QS-Procurement/Purchase-Orders',
+    '07.Submittals/Material-Submittals',
+    '07.Submittals/Approved',
+    '07.Submittals/Method-Statements',
+    '08.Reports-MOM/MOM',
+    '08.Reports-MOM/General-Reports',
+    '08.Reports-MOM/Snag-Lists',
+    '09.Invoices-Variations/Client-Invoices',
+    '09.Invoices-Variations/Variation-Orders',
+    '10.Handover/As-Built-Drawings',
+    '10.Handover/O&M-Manuals',
+    '01.drawings/02.drawings/10.Architecture',
+    '01.drawings/02.drawings/20.Electrical',
+    '01.drawings/02.drawings/30.Air Conditioning',
+    '01.drawings/02.drawings/40.Fire Fighting',
+    '01.drawings/02.drawings/50.Plumbing',
+    '01.drawings/01.Interior',
+    '01.drawings/04.Lighting',
+    '01.drawings/08.Floor',
+    '01.drawings/09.Door',
+    '01.drawings/X0.MEP',
+    '02.Design/Architecture',
+    '02-Design/Concept',
+    '01.MOM',
+    '06.MOM, Reports, WP, TS, Snags',
+    '02.Report/Weekly',
+    '03.LOI & Boq',
+    '04.Qs & PO',
+    '04-Shop Drawings/Approved',
+    '04_shop/rev',
+    '05-Approved',
+    '06-Quantity Surveying',
+    '07-Site Reports',
+    '07.Invoices',
+    '08.Variations & Extra Works',
+    '09-Correspondence/CORRESPONDENCE',
+    '09-Correspondence/APPROVAL',
+    '10.Submittal/Tiles',
+    '01-Contract',
+    '03-Specifications',
+    'Drawings/Details',
+    'Design/Drawings/',
+    'Spec/Finishes',
+    'RFI/Closed',
+    'Correspondence/Old',
+    'Reports/2025',
+    'Invoices/Paid',
+    'Submittals/Pending',
+    'QS/Sheets',
+    'MOM/Site',
+    'Extra Work/Ceiling',
+    'Fire/Sprinklers',
+    'AC/Ducts',
+    'Plumbing/Risers',
+    'Electrical/DB',
+]
+
+FILENAMES = [
+    'SD-A-101_Kitchen Layout_Rev02.pdf',
+    'SD-E-210 Small Power Layout R3.pdf',
+    'SD-M-301-AC Ducting rev.4 FINAL.pdf',
+    'A-102-Reflected Ceiling Plan (RCP).dwg.pdf',
+    'Floor Finishes - Porcelain Tiles v2.pdf',
+    'Bathroom WC details_r1_.pdf',
+    'MOM-012 Site Meeting 2025-11-03.pdf',
+    'Minutes of Meeting 05.docx',
+    'VO-07 Extra Work Ceiling.xlsx',
+    'Variation Order 3 - Gypsum Bulkhead.pdf',
+    'RFI-023 Response.pdf',
+    'INV-2025-014.pdf',
+    'inv_12 signage.pdf',
+    'Invoice No. 44 Approved.pdf',
+    'أمر شراء 15.pdf',
+    'عرض سعر رخام.pdf',
+    'Quotation_Marble_R1.pdf',
+    'PO-118 Joinery.pdf',
+    'Purchase order furniture.xlsx',
+    'Material Submittal - Vinyl Flooring rev 3.pdf',
+    'Weekly Report 14.pdf',
+    'Contract Agreement signed.pdf',
+    'BOQ Rev05.xlsx',
+    'Tender Drawings.zip',
+    'Door Schedule.pdf',
+    'Curtain Wall Facade Elevation.pdf',
+    'Shop Front Glazing.pdf',
+    'Fire Alarm Layout-E-02.pdf',
+    'Sprinkler riser -p- detail.pdf',
+    'Drainage & Sanitary Pipe Routing.pdf',
+    'Wayfinding Graphics.pdf',
+    'Setting Out Plan.pdf',
+    'Partition Drywall Section.pdf',
+    'Pantry KTC equipment.pdf',
+    'General Notes.pdf',
+    'approval letter.pdf',
+    'Mom of site visit.pdf',
+    '20250115_RE_Approval_of_Shop_Drawings.json',
+    'scan0001.pdf',
+    'Revision 7 handover.pdf',
+    'V1.2_concept.pdf',
+    'mep-coordination_-a-_v3 .pdf',
+    'Reports/nested-name.pdf',
+]
+
+
+def corpus():
+    paths = []
+    for project, folder, filename in product(PROJECTS[:2], FOLDERS, FILENAMES):
+        folder_path = f"{folder.strip('/')}/" if folder.strip('/') else ''
+        paths.append(f"{project}/{folder_path}{filename}")
+    # Projects with odd names that hit rule tokens themselves
+    paths += [f"{p}/{f}" for p in ['MEP-Works', 'Fire Station', 'Design Lab'] for f in FILENAMES]
+    return paths
+
+
+def reference(path, filename):
+    """The baseline if-chain classifier, frozen in tests/baseline_classifier.py"""
+    revision, revision_str = baseline.extract_revision(filename)
+    priority, doc_type = baseline.get_document_priority(filename, path)
+    return {
+        'type': doc_type,
+        'subject': baseline.extract_subject(filename, path),
+        'revision': revision,
+        'revisionStr': revision_str,
+        'priority': priority,
+        'approved': baseline.is_approved_folder(path),
+    }
+
+
+def test_batch_matches_reference_by_basename():
+    paths = corpus()
+    records = document.classify_paths(paths)
+    assert len(records) == len(paths)
+    for path, record in zip(paths, records):
+        assert record == reference(path, path.split('/')[-1]), path
+
+
+def test_batch_matches_reference_with_full_path_as_filename():
+    # get_project_stats classifies with the full path as the filename
+    paths = corpus()
+    records = document.classify_paths(paths, paths)
+    for path, record in zip(paths, records):
+        assert record == reference(path, path), path
+
+
+def test_batch_matches_reference_with_unrelated_filename():
+    paths = corpus()[:300]
+    filenames = [f"Kitchen {i} -e- rev{i % 4}.pdf" for i in range(len(paths))]
+    records = document.classify_paths(paths, filenames)
+    for path, filename, record in zip(paths, filenames, records):
+        assert record == reference(path, filename), path
+
+
+def test_email_service_copy_is_identical():
+    with open(os.path.join(BACKEND, 'utils', 'document.py'), 'rb') as a, \
+            open(os.path.join(BACKEND, '..', 'backend-email', 'utils', 'document.py'), 'rb') as b:
+        assert a.read() == b.read()
+
+
+def test_every_rule_token_is_reachable():
+    # Guards the trie regex: each token must be found on its own
+    tokens = set(document.TOKEN_PREFIXES)
+    for token in tokens:
+        assert token in document._scan_tokens(f"x{token}x"), token
+
+
+def test_cache_returns_batch_records_and_counts_hits():
+    cache = document.MetadataCache(maxsize=1000)
+    paths = corpus()[:200]
+    first = cache.classify(paths)
+    assert first == document.classify_paths(paths)
+    assert cache.stats()['misses'] == 200 and cache.stats()['hits'] == 0
+    
+    second = cache.classify(paths)
+    assert second == first
+    assert cache.stats()['hits'] == 200
+    # A different filename for the same path is a separate entry
+    assert cache.classify(paths[:1], ['Weekly Report.pdf'])[0] == document.classify_paths(paths[:1], ['Weekly Report.pdf'])[0]
+    assert cache.stats()['misses'] == 201
+
+
+def test_cache_evicts_least_recently_used():
+    cache = document.MetadataCache(maxsize=3)
+    cache.classify(['P/a.pdf', 'P/b.pdf', 'P/c.pdf'])
+    cache.classify(['P/a.pdf'])
+    cache.classify(['P/d.pdf'])
+    assert cache.stats()['size'] == 3
+    
+    cache.classify(['P/a.pdf', 'P/b.pdf'])
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 5
+
+
+def test_stored_metadata_round_trip():
+    for path in corpus()[:500]:
+        record = document.document_metadata(path)
+        fields = document.metadata_fields(record)
+        assert all(isinstance(v, str) for v in fields.values())
+        assert document.record_from_metadata(fields) == record
+
+
+def test_classify_blobs_prefers_stored_metadata():
+    from types import SimpleNamespace
+    path = 'Agora-GEM/08.Reports-MOM/MOM/MOM-012 Site Meeting.pdf'
+    stored = dict(document.metadata_fields(document.document_metadata(path)), docSubject='kitchen')
+    blobs = [
+        SimpleNamespace(name=path, metadata=stored),
+        SimpleNamespace(name=path, metadata=None),
+        SimpleNamespace(name=path, metadata=dict(stored, docMeta='0')),  # stale rules
+    ]
+    stored_record, missing, stale = document.classify_blobs(blobs)
+    assert stored_record['subject'] == 'kitchen'
+    assert missing == stale == document.document_metadata(path)
+
+
+def test_email_service_metadata_is_classified_by_path():
+    from types import SimpleNamespace
+    # Written by older email service versions - a type only, not a classification record
+    path = 'Agora-GEM/09-Correspondence/RFI/2025-01-01_Site access.json'
+    email = SimpleNamespace(name=path, metadata={'docMeta': 'email-1', 'docType': 'correspondence'})
+    assert document.classify_blobs([email]) == [document.document_metadata(path)]
+
+
+def test_single_path_helpers_read_the_batch_record():
+    path = 'Agora-GEM/04.Shop-Drawings/Architectural/Approved/SD-A-101_Kitchen Layout_Rev02.pdf'
+    filename = path.split('/')[-1]
+    record = document.classify_paths([path])[0]
+    assert document.detect_document_type(filename, path) == record['type'] == 'shop_drawing'
+    assert document.extract_subject(filename, path) == record['subject'] == 'kitchen'
+    assert document.get_document_priority(filename, path) == (record['priority'], 'shop_drawing')
+    assert document.is_approved_folder(path) is True
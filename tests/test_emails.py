@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Project email pages and index shards (backend/services/email.py).
+Objects live in a local stub bucket - no GCP calls.
+
+Run: python -m pytest tests/test_emails.py
+"""
+
+import os
+import sys
+import gzip
+import json
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import email
+
+EMAILS = {
+    f"P/{'01.Correspondence/Client/RFI' if i % 2 else '09-Correspondence/CORRESPONDENCE'}/{i:03}.json": {
+        'id': str(i), 'subject': f'Email {i}', 'sender': 'site@example.com',
+        'date': f'2025-{1 + i // 10:02}-{1 + i % 10:02}T10:00:00', 'body': 'Dear all,\n\n' + 'x' * 500}
+    for i in range(37)
+}
+UNDATED = 'P/09-Correspondence/CORRESPONDENCE/undated.json'
+EMAILS[UNDATED] = {'id': 'u', 'subject': 'No date', 'sender': 'site@example.com', 'body': 'Forwarded'}
+
+
+class StubBucket:
+    """Objects as {name: (generation, bytes)}, with generation preconditions on upload"""
+
+    def __init__(self, objects):
+        self.objects = {name: (1, json.dumps(data).encode()) for name, data in objects.items()}
+        self.downloads = []
+        self.before_upload = None
+        self._lock = threading.Lock()
+
+    def list_blobs(self, prefix, fields=None):
+        return [SimpleNamespace(name=n, generation=g) for n, (g, _) in sorted(self.objects.items())
+                if n.startswith(prefix)]
+
+    def get_blob(self, name):
+        if name not in self.objects:
+            return None
+        return SimpleNamespace(name=name, generation=self.objects[name][0])
+
+    def blob(self, name):
+        bucket = self
+
+        def download_as_text():
+            with bucket._lock:
+                bucket.downloads.append(name)
+            return bucket.objects[name][1].decode()
+
+        def upload_from_string(data, content_type=None, if_generation_match=None):
+            if bucket.before_upload:
+                hook, bucket.before_upload = bucket.before_upload, None
+                hook()
+            if if_generation_match is not None and bucket.objects.get(name, (0, None))[0] != if_generation_match:
+                raise email.PreconditionFailed('generation mismatch')
+            if blob.content_encoding == 'gzip':
+                data = gzip.decompress(data)
+            bucket.objects[name] = (bucket.objects.get(name, (0, None))[0] + 1, data)
+
+        blob = SimpleNamespace(download_as_text=download_as_text, upload_from_string=upload_from_string,
+                               content_encoding=None)
+        return blob
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    stub = StubBucket(EMAILS)
+    monkeypatch.setattr(email, 'get_bucket', lambda: stub)
+    monkeypatch.setattr(email, 'list_blobs', lambda prefix: stub.list_blobs(prefix))
+    monkeypatch.setattr(email, 'email_cache', email.ParsedObjectCache(email._load_summary, 1000))
+    monkeypatch.setattr(email, 'shard_cache', email.ParsedObjectCache(email._load_shard, 100))
+    return stub
+
+
+def _all_pages(limit):
+    pages, cursor = [], None
+    while True:
+        result = email.get_project_emails('P', limit, cursor)
+        pages.append(result['emails'])
+        cursor = result['nextCursor']
+        if not cursor:
+            return pages
+
+
+def _expected_paths():
+    return [path for path, _ in sorted(EMAILS.items(), key=lambda kv: (kv[1].get('date') or '', kv[0]), reverse=True)]
+
+
+@pytest.mark.parametrize('limit', [1, 4, 10, 100])
+def test_cursor_pages_match_full_sort(bucket, limit):
+    pages = _all_pages(limit)
+    assert all(len(page) <= limit for page in pages)
+    assert [e['path'] for page in pages for e in page] == _expected_paths()
+
+
+def test_summaries_downloaded_once(bucket):
+    _all_pages(10)
+    _all_pages(5)
+    assert sorted(bucket.downloads) == sorted(EMAILS)
+
+    first = email.get_project_emails('P', 1)['emails'][0]
+    assert 'body' not in first
+    assert first['snippet'].startswith('Dear all, xxx') and len(first['snippet']) == email.EMAIL_SNIPPET_CHARS
+
+
+def test_new_object_generation_reloads(bucket):
+    email.get_project_emails('P')
+    name = next(iter(EMAILS))
+    bucket.objects[name] = (2, bucket.objects[name][1])
+    email.get_project_emails('P')
+    assert len(bucket.downloads) == len(EMAILS) + 1
+
+
+@pytest.mark.parametrize('limit', [1, 4, 10, 100])
+def test_index_pages_match_legacy(bucket, limit):
+    legacy = _all_pages(limit)
+    assert email.rebuild_email_index('P') == {'2025-01': 10, '2025-02': 10, '2025-03': 10, '2025-04': 7,
+                                              'undated': 1}
+    pages = _all_pages(limit)
+    assert [e['path'] for page in pages for e in page] == _expected_paths()
+    assert {e['type'] for page in pages for e in page} == {'rfi', 'correspondence'}
+    # Same records, same shape, from either source
+    assert pages == legacy
+
+
+def test_partial_index_falls_back_to_email_objects(bucket):
+    # Only emails saved after the index was introduced are in a shard - no backfill yet
+    record = dict(email.email_summary('P/09-Correspondence/RFI/new.json', {'id': 'n', 'date': '2025-05-01T08:00:00'}))
+    bucket.objects[f'{email.EMAIL_INDEX_PREFIX}/P/2025-05.ndjson'] = (1, (json.dumps(record) + '\n').encode())
+
+    pages = _all_pages(10)
+    assert [e['path'] for page in pages for e in page] == _expected_paths()
+
+
+def test_index_reads_only_needed_shards(bucket):
+    email.rebuild_email_index('P')
+    bucket.downloads.clear()
+    result = email.get_project_emails('P', 3)
+    assert len(result['emails']) == 3
+    assert bucket.downloads == [f'{email.EMAIL_INDEX_PREFIX}/P/2025-04.ndjson']
+
+    email.get_project_emails('P', 5, result['nextCursor'])
+    assert bucket.downloads[-1] == f'{email.EMAIL_INDEX_PREFIX}/P/2025-03.ndjson'
+
+
+def test_rebuild_merges_with_concurrent_append(bucket):
+    shard = f'{email.EMAIL_INDEX_PREFIX}/P/2025-01.ndjson'
+    concurrent = {'id': 'x', 'subject': 'New', 'sender': None, 'date': '2025-01-31T09:00:00',
+                  'type': 'rfi', 'path': 'P/09-Correspondence/RFI/new.json'}
+    # Another saver creates the shard between our read and our write
+    bucket.before_upload = lambda: bucket.objects.__setitem__(shard, (1, (json.dumps(concurrent) + '\n').encode()))
+
+    counts = email.rebuild_email_index('P')
+    assert counts['2025-01'] == 11
+    assert concurrent['path'] in bucket.objects[shard][1].decode()
+
+
+def test_rebuild_files_non_iso_dates_as_undated(bucket):
+    # The email service's rule: no ISO date - undated shard, listed after every dated email
+    name = 'P/09-Correspondence/CORRESPONDENCE/rfc.json'
+    bucket.objects[name] = (1, json.dumps({'id': 'r', 'date': 'Tue, 14 Jan 2025 09:30:00 +0200'}).encode())
+
+    counts = email.rebuild_email_index('P')
+    assert counts['undated'] == 2 and 'Tue, 1' not in counts
+    pages = _all_pages(100)
+    assert [e['path'] for e in pages[-1][-2:]] == sorted([UNDATED, name], reverse=True)
+    assert pages[-1][-1]['date'] is None and pages[-1][-2]['date'] is None
+
+
+RAW_EMAIL = (b'Received: from mail.example.com\r\n'
+             b'From: =?utf-8?q?Ahmed_M=C3=BCller?= <ahmed@example.com>\r\n'
+             b'Subject: RFI-012 Ceiling\r\n heights at lobby\r\n'
+             b'Date: Tue, 14 Jan 2025 09:30:00 +0200\r\n'
+             b'Content-Type: multipart/mixed; boundary="b1"\r\n'
+             b'\r\n--b1\r\n' + b'x' * 20000)
+
+
+def test_parse_email_headers():
+    assert email.parse_email_headers(RAW_EMAIL) == {
+        'subject': 'RFI-012 Ceiling heights at lobby',
+        'from': 'Ahmed Müller <ahmed@example.com>',
+        'date': '2025-01-14T09:30:00+02:00',
+        'hasAttachments': True,
+    }
+    # Header block cut off by the ranged read
+    cut = email.parse_email_headers(RAW_EMAIL[:RAW_EMAIL.index(b'Date:')])
+    assert cut['subject'] == 'RFI-012 Ceiling heights at lobby' and 'date' not in cut
+
+
+@pytest.fixture
+def unclassified(monkeypatch):
+    reads = []
+    names = [f'{email.UNCLASSIFIED_PREFIX}{i:03}.eml' for i in range(12)] + [f'{email.UNCLASSIFIED_PREFIX}note.txt']
+    listing = [SimpleNamespace(name=n, generation=1, updated=datetime(2025, 1, 1 + i)) for i, n in enumerate(names)]
+
+    def blob(name):
+        def download_as_bytes(start=None, end=None):
+            reads.append((name, start, end))
+            return RAW_EMAIL[start:end + 1]
+        return SimpleNamespace(download_as_bytes=download_as_bytes)
+
+    monkeypatch.setattr(email, 'get_bucket', lambda: SimpleNamespace(blob=blob))
+    monkeypatch.setattr(email, 'list_blobs', lambda prefix: list(listing))
+    monkeypatch.setattr(email, 'header_cache', email.ParsedObjectCache(email._load_headers, 100))
+    return reads
+
+
+def test_unclassified_pages_read_only_their_headers(unclassified):
+    first = email.get_unclassified(5)
+    assert first['total'] == 13
+    assert [e['name'] for e in first['emails']] == ['note.txt', '011.eml', '010.eml', '009.eml', '008.eml']
+    assert first['emails'][0]['subject'] == 'note.txt' and first['emails'][0]['from'] == 'Unknown'
+    assert first['emails'][1]['subject'] == 'RFI-012 Ceiling heights at lobby'
+    assert sorted(name for name, _, _ in unclassified) == [f'{email.UNCLASSIFIED_PREFIX}{i:03}.eml' for i in (8, 9, 10, 11)]
+    assert all(end == email.EMAIL_HEADER_BYTES - 1 for _, _, end in unclassified)
+
+    names = [e['name'] for e in first['emails']]
+    cursor = first['nextCursor']
+    while cursor:
+        page = email.get_unclassified(5, cursor)
+        names += [e['name'] for e in page['emails']]
+        cursor = page['nextCursor']
+    assert len(names) == len(set(names)) == 13
+
+    email.get_unclassified(5)
+    assert len(unclassified) == 12  # cached by generation
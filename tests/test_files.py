@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Paged /files listings (backend/services/files.py and the /files route).
+GCS delimiter listings come from a local stub of utils.gcs.list_folder_page - no GCP calls.
+
+Run: python -m pytest tests/test_files.py
+"""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import files, folder_tree, generation
+
+NAMES = ['P/', 'P/Approved SD Rev2.pdf', 'P/notes.txt', 'P/MOM-01.pdf', 'P/zeta/x.pdf',
+         'P/04.Shop-Drawings/a.pdf', 'P/04.Shop-Drawings/Approved/b.pdf', 'P/empty/',
+         'P/Correspondence/letter.pdf'] + [f'P/scan-{i:03}.pdf' for i in range(40)]
+
+
+def _blob(name):
+    return SimpleNamespace(name=name, size=1, updated=datetime(2025, 1, 1), md5_hash=None, metadata=None)
+
+
+def fake_folder_page(prefix, page_size, page_token=None, fields=None):
+    """GCS semantics: items and prefixes in one lexicographic sequence, page_size entries per page"""
+    entries = set()
+    for name in NAMES:
+        if name.startswith(prefix) and name != prefix:
+            rest = name[len(prefix):]
+            entries.add(prefix + rest.split('/')[0] + '/' if '/' in rest else name)
+    entries = sorted(e for e in entries if not page_token or e > page_token)
+    page = entries[:page_size]
+    next_token = page[-1] if len(entries) > page_size else None
+    return ([_blob(e) for e in page if not e.endswith('/')], [e for e in page if e.endswith('/')], next_token)
+
+
+@pytest.fixture(autouse=True)
+def stub_gcs(monkeypatch):
+    monkeypatch.setattr(files, 'list_folder_page', fake_folder_page)
+    monkeypatch.setattr(folder_tree, 'list_blobs', lambda prefix, fields=None: [_blob(n) for n in NAMES])
+    monkeypatch.setattr(folder_tree, '_trees', {})
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+
+
+def _all_pages(page_size, path=''):
+    pages, token = [], None
+    while True:
+        result = files.list_files_page('P', path, page_size, token)
+        pages.append(result['files'])
+        token = result['nextPageToken']
+        if not token:
+            return pages
+
+
+@pytest.mark.parametrize('page_size', [1, 3, 10, 1000])
+def test_pages_cover_the_folder_once(page_size):
+    full = folder_tree.get_folder_tree('P').find('').listing()
+    pages = _all_pages(page_size)
+    assert all(len(page) <= page_size for page in pages)
+    paged = [entry['path'] for page in pages for entry in page]
+    assert sorted(paged) == sorted(entry['path'] for entry in full)
+
+
+def test_each_page_sorted_like_full_listing():
+    for page in _all_pages(7):
+        folders = [e for e in page if e['type'] == 'folder']
+        assert page[:len(folders)] == folders
+        assert folders == sorted(folders, key=lambda e: e['name'].lower())
+        assert page[len(folders):] == sorted(page[len(folders):], key=folder_tree.file_sort_key)
+
+
+def test_folder_counts_only_from_cached_tree():
+    folder = files.list_files_page('P', '', 1000)['files'][0]
+    assert folder['name'] == '04.Shop-Drawings' and 'fileCount' not in folder
+
+    folder_tree.get_folder_tree('P')
+    folder = files.list_files_page('P', '', 1000)['files'][0]
+    assert folder['fileCount'] == 2
+
+
+def test_sub_folder_page():
+    names = [e['name'] for e in files.list_files_page('P', '04.Shop-Drawings', 10)['files']]
+    assert names == ['Approved', 'a.pdf']
+
+
+def test_full_sort_mode_pages_by_offset(monkeypatch):
+    full = folder_tree.get_folder_tree('P').find('').listing()
+    monkeypatch.setattr(files, 'FILES_PAGE_SIZE', 4)
+    # Paged by default too - the first page is bounded
+    first = files.list_files_sorted('P', '', files.page_size_arg(None))
+    assert first['files'] == full[:4] and first['nextPageToken'] == '4'
+    paged, token = [], None
+    while True:
+        result = files.list_files_sorted('P', '', 6, token)
+        paged += result['files']
+        token = result['nextPageToken']
+        if not token:
+            break
+    assert paged == full
+    assert files.list_files_sorted('P', 'missing') == {'files': [], 'nextPageToken': None}
+
+
+def test_page_size_arg():
+    assert files.page_size_arg(None) == files.FILES_PAGE_SIZE
+    assert files.page_size_arg('5') == 5
+    assert files.page_size_arg(0) == 1
+    assert files.page_size_arg(10 ** 6) == files.FILES_MAX_PAGE_SIZE
+
+
+def test_pages_read_stored_classification(monkeypatch):
+    from utils import document, gcs
+    assert 'metadata' in gcs.FOLDER_PAGE_FIELDS
+
+    stored = dict(document.metadata_fields(document.document_metadata('P/notes.txt')), docSubject='kitchen')
+
+    def page_with_metadata(prefix, page_size, page_token=None, fields=None):
+        blobs, prefixes, token = fake_folder_page(prefix, page_size, page_token, fields)
+        for blob in blobs:
+            blob.metadata = stored if blob.name == 'P/notes.txt' else None
+        return blobs, prefixes, token
+
+    monkeypatch.setattr(files, 'list_folder_page', page_with_metadata)
+    entries = {e['path']: e for e in files.list_files_page('P', '', 1000)['files']}
+    assert entries['P/notes.txt']['subject'] == 'kitchen'
+
+
+def test_route_rejects_a_foreign_page_token(monkeypatch):
+    from flask import Flask
+    import routes
+
+    def folder_page(prefix, page_size, page_token=None, fields=None):
+        if page_token == 'garbage':
+            raise routes.BadRequest('Invalid argument')
+        return fake_folder_page(prefix, page_size, page_token, fields)
+
+    monkeypatch.setattr(files, 'list_folder_page', folder_page)
+    monkeypatch.setattr(routes, 'get_gcs_folder_name', lambda project: project)
+    app = Flask(__name__)
+    routes.register_routes(app)
+    client = app.test_client()
+
+    response = client.get('/files?project=P&pageToken=garbage')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid pageToken'}
+    assert client.get('/files?project=P').status_code == 200
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Server-side listing filters (backend/services/filters.py) on /files and /latest.
+Listings come from local stubs of utils.gcs - no GCP calls.
+
+Run: python -m pytest tests/test_filters.py
+"""
+
+import os
+import sys
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import files, filters, folder_tree, latest, generation
+from utils.document import classify_blobs
+
+FOLDERS = ['04.Shop-Drawings/Approved', '04.Shop-Drawings/Pending', '08.Reports-MOM/MOM',
+           '07.Submittals/Approved', 'Misc']
+SUBJECTS = ['Kitchen', 'Bathroom', 'Ceiling', 'Flooring', 'General']
+
+
+@pytest.fixture
+def blobs(monkeypatch):
+    rng = random.Random(5)
+    items = [SimpleNamespace(name=f"P/{rng.choice(FOLDERS)}/{rng.choice(SUBJECTS)} doc{i} rev{i % 4}.pdf",
+                             size=rng.randint(1, 1000), md5_hash=None, metadata=None,
+                             updated=datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=rng.randint(0, 400)))
+             for i in range(400)]
+
+    def iter_blob_pages(prefix, fields=None):
+        for i in range(0, len(items), 100):
+            yield items[i:i + 100]
+
+    monkeypatch.setattr(latest, 'iter_blob_pages', iter_blob_pages)
+    monkeypatch.setattr(latest, '_indexes', {})
+    monkeypatch.setattr(folder_tree, 'list_blobs', lambda prefix, fields=None: items)
+    monkeypatch.setattr(folder_tree, '_trees', {})
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+    return items
+
+
+def test_parse_errors():
+    for data in ({'approved': 'maybe'}, {'revMin': 'x'}, {'since': 'yesterday'},
+                 # JSON bodies can carry any type
+                 {'approved': ['true']}, {'revMin': True}, {'revMax': 2.5}, {'name': 3}, {'since': 20250101},
+                 {'docTypes': {'mom': 1}}, {'subjects': ['kitchen', 2]}):
+        with pytest.raises(ValueError):
+            filters.parse_filter(data)
+    for value in ('-colour', 5, ['name'], {'name': 1}):
+        with pytest.raises(ValueError):
+            filters.parse_order(value)
+    assert filters.parse_filter({'docTypes': ['MOM', 'rfi']}).types == {'mom', 'rfi'}
+    # /latest's own 'type' parameter is not a filter
+    assert not filters.parse_filter({'type': 'mom', 'subject': 'kitchen', 'prefix': 'a'})
+    assert not filters.parse_filter({})
+    assert filters.parse_order('-updated') == ('updated', True)
+
+
+def test_entry_filter():
+    entry = {'name': 'Kitchen SD rev2.pdf', 'type': 'shop_drawing', 'subject': 'kitchen', 'revision': 2,
+             'approved': True, 'updated': '2025-03-01T10:00:00+00:00'}
+    accepts = lambda **data: filters.parse_filter(data)(entry)
+    assert accepts(docTypes='mom,shop_drawing', subjects='Kitchen', approved='true', revMin='1', revMax='2')
+    assert accepts(name='sd rev', namePrefix='kitchen', since='2025-03-01')
+    assert not accepts(approved='false')
+    assert not accepts(revMin='3')
+    assert not accepts(namePrefix='sd')
+    assert not accepts(since='2025-03-01T11:00:00Z')
+
+
+def _expected_latest(items, match, limit):
+    groups = {'approved': [], 'recent': []}
+    for blob, meta in zip(items, classify_blobs(items)):
+        entry = latest.latest_entry('P', blob, meta)
+        if match(entry):
+            groups['approved' if entry['approved'] else 'recent'].append(entry)
+    return {g: sorted(e, key=lambda x: x['updated'], reverse=True)[:limit] for g, e in groups.items()}
+
+
+@pytest.mark.parametrize('data', [
+    {'subjects': 'kitchen'},
+    {'name': 'doc1'},
+    {'revMin': '2', 'docTypes': 'shop_drawing,mom'},
+    {'since': '2025-01-15'},
+])
+@pytest.mark.parametrize('limit', [5, latest.LATEST_INDEX_SIZE + 10])
+def test_latest_filtered_matches_full_scan(blobs, data, limit):
+    match = filters.parse_filter(data)
+    result = latest.get_latest('P', None, limit, match)
+    expected = _expected_latest(blobs, match, limit)
+    assert [e['path'] for e in result['approved']] == [e['path'] for e in expected['approved']]
+    assert [e['path'] for e in result['recent']] == [e['path'] for e in expected['recent']]
+
+
+def test_files_filtered_and_paged(blobs):
+    match = filters.parse_filter({'subjects': 'kitchen'})
+    order = filters.parse_order('-size')
+    pages, token = [], None
+    while True:
+        result = files.list_files_filtered('P', '', match, order, 7, token, recursive=True)
+        pages.extend(result['files'])
+        token = result['nextPageToken']
+        if not token:
+            break
+
+    kitchen = [b for b, meta in zip(blobs, classify_blobs(blobs)) if meta['subject'] == 'kitchen']
+    assert kitchen and len(pages) == len(kitchen)
+    assert [e['size'] for e in pages] == sorted((b.size for b in kitchen), reverse=True)
+
+    # Not recursive: the folder's own files only - none at the project root
+    assert files.list_files_filtered('P', '', match, order)['files'] == []
+    approved_sd = files.list_files_filtered('P', '04.Shop-Drawings/Approved',
+                                            filters.parse_filter({'name': 'rev3'}))['files']
+    assert approved_sd and all('rev3' in e['name'] for e in approved_sd)
+
+
+def test_subject_filter_agrees_across_listings(blobs):
+    match = filters.parse_filter({'subjects': 'kitchen'})
+    limit = len(blobs)
+    latest_paths = {e['path'] for group in latest.get_latest('P', None, limit, match).values() for e in group}
+    files_paths = {e['path'][len('P/'):] for e in
+                   files.list_files_filtered('P', '', match, page_size=None, recursive=True)['files']}
+    assert latest_paths and latest_paths == files_paths
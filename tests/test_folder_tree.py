@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+In-memory project folder tree (backend/services/folder_tree.py).
+Listings come from a local stub of utils.gcs.list_blobs - no GCP calls.
+
+Run: python -m pytest tests/test_folder_tree.py
+"""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import folder_tree
+from services import generation
+from services.generation import bump_generation
+
+
+def _blob(name, size=0):
+    return SimpleNamespace(name=name, size=size, updated=datetime(2025, 1, 1), md5_hash=None, metadata=None)
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    calls = []
+    blobs = [
+        _blob('P/'),
+        _blob('P/a.pdf', 10),
+        _blob('P/04.Shop-Drawings/z.pdf', 1),
+        _blob('P/04.Shop-Drawings/Approved/SD Rev2.pdf', 5),
+        _blob('P/04.Shop-Drawings/Pending/x.pdf', 7),
+        _blob('P/empty/'),
+    ]
+
+    def list_blobs(prefix, fields=None):
+        calls.append(prefix)
+        return blobs
+
+    monkeypatch.setattr(folder_tree, 'list_blobs', list_blobs)
+    monkeypatch.setattr(folder_tree, '_trees', {})
+    # Per-instance generations - no Firestore
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+    return calls
+
+
+def test_levels_with_recursive_totals(listing):
+    tree = folder_tree.get_folder_tree('P')
+
+    root = tree.find('')
+    assert [(f['name'], f['fileCount'], f['size']) for f in root.folder_entries()] == [
+        ('04.Shop-Drawings', 3, 13), ('empty', 0, 0)
+    ]
+    assert [f['name'] for f in root.listing()] == ['04.Shop-Drawings', 'empty', 'a.pdf']
+
+    shop = tree.find('04.Shop-Drawings/')
+    assert shop is tree.find('/04.Shop-Drawings')
+    assert [f['name'] for f in shop.listing()] == ['Approved', 'Pending', 'z.pdf']
+    assert shop.listing()[0]['path'] == 'P/04.Shop-Drawings/Approved/'
+
+    approved = tree.find('04.Shop-Drawings/Approved')
+    assert approved.files[0]['approved'] is True
+    assert tree.find('missing') is None
+
+
+def test_tree_is_reused_until_generation_changes(listing):
+    tree = folder_tree.get_folder_tree('P')
+    assert folder_tree.get_folder_tree('P') is tree
+    assert listing == ['P/']
+
+    bump_generation('P')
+    assert folder_tree.get_folder_tree('P') is not tree
+    assert listing == ['P/', 'P/']
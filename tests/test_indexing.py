@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Incremental Vertex AI Search indexing (backend/services/indexing.py).
+Uses a local stub of the Discovery Engine DocumentServiceClient - no GCP calls.
+
+Run: python -m pytest tests/test_indexing.py
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import indexing
+
+
+class StubDocumentClient:
+    """Records requests the way DocumentServiceClient would receive them"""
+
+    def __init__(self, documents=None):
+        self.imports = []
+        self.deleted = []
+        self.documents = set(documents or [])
+
+    def import_documents(self, request):
+        docs = request.inline_source.documents
+        assert all(doc.id == indexing.document_id(doc.content.uri) for doc in docs)
+        self.imports.append([doc.content.uri for doc in docs])
+        name = f'operations/import-{len(self.imports)}'
+        return SimpleNamespace(operation=SimpleNamespace(name=name))
+
+    def list_documents(self, parent):
+        raise AssertionError('purges must not list the datastore')
+
+    def delete_document(self, name):
+        if name not in self.documents:
+            raise indexing.NotFound(name)
+        self.documents.discard(name)
+        self.deleted.append(name)
+
+    def get_operation(self, request):
+        return SimpleNamespace(done=True, error=None)
+
+
+class StubJobs:
+    def __init__(self):
+        self.saved = []
+
+    def document(self):
+        jobs = self
+
+        class Ref:
+            id = f'job-{len(jobs.saved) + 1}'
+
+            def set(self, data):
+                jobs.saved.append(dict(data))
+
+        return Ref()
+
+
+@pytest.fixture(autouse=True)
+def datastore(monkeypatch):
+    monkeypatch.setattr(indexing, 'DATA_STORE_ID', 'test-datastore')
+    monkeypatch.setattr(indexing, 'INDEX_BATCH_SIZE', 2)
+
+
+def test_disabled_without_datastore(monkeypatch):
+    monkeypatch.setattr(indexing, 'DATA_STORE_ID', '')
+    assert indexing.index_changes('Agora-GEM', ['Agora-GEM/a.pdf'], [], client=StubDocumentClient()) is None
+
+
+def test_imports_only_changed_indexable_files_in_batches():
+    client = StubDocumentClient()
+    jobs = StubJobs()
+    uploaded = ['P/a.pdf', 'P/b.docx', 'P/photo.jpg', 'P/c.xlsx']
+
+    job = indexing.index_changes('P', uploaded, [], client=client, jobs=jobs)
+
+    assert client.imports == [
+        [indexing.to_gcs_uri('P/a.pdf'), indexing.to_gcs_uri('P/b.docx')],
+        [indexing.to_gcs_uri('P/c.xlsx')],
+    ]
+    assert job['operations'] == ['operations/import-1', 'operations/import-2']
+    assert job['status'] == 'running'
+    assert jobs.saved[0]['imported'] == 3
+
+
+def test_purges_deleted_uris_only():
+    old, keep = (indexing.document_name(indexing.to_gcs_uri(p)) for p in ('P/old.pdf', 'P/keep.pdf'))
+    client = StubDocumentClient(documents=[old, keep])
+
+    job = indexing.index_changes('P', [], ['P/old.pdf', 'P/never-indexed.pdf'], client=client, jobs=StubJobs())
+
+    assert client.deleted == [old]
+    assert job['purged'] == 1
+    assert job['status'] == 'done'
+
+
+def test_refresh_marks_finished_job_done():
+    updates = []
+    job_ref = SimpleNamespace(update=updates.append)
+    job = {'status': 'running', 'operations': ['operations/import-1'], 'errors': []}
+
+    job = indexing.refresh_index_job(job_ref, job, client=StubDocumentClient())
+
+    assert job['status'] == 'done'
+    assert updates and updates[0]['status'] == 'done'
+
+
+def test_index_jobs_route_limit(monkeypatch):
+    from flask import Flask
+    import routes
+    limits = []
+    monkeypatch.setattr(routes, 'get_index_jobs', lambda limit: limits.append(limit) or [])
+    app = Flask(__name__)
+    routes.register_routes(app)
+    client = app.test_client()
+
+    assert client.get('/index-jobs?limit=ten').status_code == 400
+    for query in ('', '?limit=5', '?limit=0', '?limit=-3', '?limit=100000'):
+        assert client.get(f'/index-jobs{query}').status_code == 200
+    assert limits == [10, 5, 1, 1, routes.INDEX_JOBS_MAX_LIMIT]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Latest-documents index (backend/services/latest.py).
+Listings come from a local stub of utils.gcs.iter_blob_pages - no GCP calls.
+
+Run: python -m pytest tests/test_latest.py
+"""
+
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import latest
+from services import generation
+from services.generation import bump_generation
+from utils.document import classify_blobs
+
+FOLDERS = ['04.Shop-Drawings/Approved', '04.Shop-Drawings/Pending', '08.Reports-MOM/MOM',
+           '07.Submittals/Approved', 'Misc']
+
+
+def _blob(name, hours):
+    return SimpleNamespace(name=name, size=1, updated=datetime(2025, 1, 1) + timedelta(hours=hours),
+                           md5_hash=None, metadata=None)
+
+
+@pytest.fixture
+def blobs(monkeypatch):
+    rng = random.Random(7)
+    items = [_blob(f"P/{rng.choice(FOLDERS)}/doc{i} rev{i % 4}.pdf", rng.randint(0, 40)) for i in range(400)]
+
+    def iter_blob_pages(prefix, fields=None):
+        for i in range(0, len(items), 100):
+            yield items[i:i + 100]
+
+    monkeypatch.setattr(latest, 'iter_blob_pages', iter_blob_pages)
+    monkeypatch.setattr(latest, '_indexes', {})
+    # Per-instance generations - no Firestore
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+    return items
+
+
+def full_sort(items, doc_type, limit):
+    """What /latest returned before the index: classify all, stable sort, truncate"""
+    approved, recent = [], []
+    for blob, meta in zip(items, classify_blobs(items)):
+        if doc_type and meta['type'] != doc_type:
+            continue
+        entry = latest.latest_entry('P', blob, meta)
+        (approved if meta['approved'] else recent).append(entry)
+    approved.sort(key=lambda x: x.get('updated') or '', reverse=True)
+    recent.sort(key=lambda x: x.get('updated') or '', reverse=True)
+    return {'approved': approved[:limit], 'recent': recent[:limit]}
+
+
+@pytest.mark.parametrize('doc_type', [None, 'shop_drawing', 'mom', 'submittal', 'unknown'])
+@pytest.mark.parametrize('limit', [5, 10, latest.LATEST_INDEX_SIZE, latest.LATEST_INDEX_SIZE + 20])
+def test_matches_full_sort(blobs, doc_type, limit):
+    assert latest.get_latest('P', doc_type, limit) == full_sort(blobs, doc_type, limit)
+
+
+def test_sync_updates_index_in_place(blobs):
+    latest.get_latest('P')
+    index = latest._indexes['P']
+
+    new = _blob('P/08.Reports-MOM/MOM/MOM-99.pdf', 1000)
+    blobs.append(new)
+    generation = bump_generation('P')
+    latest.update_latest('P', generation - 1, [(new, classify_blobs([new])[0])], [])
+
+    assert latest._indexes['P'] is index
+    assert latest.get_latest('P', 'mom', 10) == full_sort(blobs, 'mom', 10)
+    assert latest.get_latest('P', None, 1)['recent'][0]['name'] == 'MOM-99.pdf'
+
+
+def test_delete_from_full_list_forces_rebuild(blobs):
+    top = latest.get_latest('P', None, 1)['recent'][0]
+    gone = next(b for b in blobs if b.name == f"P/{top['path']}")
+    blobs.remove(gone)
+    generation = bump_generation('P')
+    latest.update_latest('P', generation - 1, [], [gone.name])
+
+    assert 'P' not in latest._indexes
+    assert latest.get_latest('P', None, 10) == full_sort(blobs, None, 10)
+
+
+@pytest.mark.parametrize('page_size', [3, 10, latest.LATEST_INDEX_SIZE])
+def test_pages_walk_the_full_sort(blobs, page_size):
+    expected = full_sort(blobs, None, len(blobs))
+    pages, token = [], None
+    while True:
+        page = latest.get_latest_page('P', None, page_size, token)
+        assert all(len(page[group]) <= page_size for group in ('approved', 'recent'))
+        pages.append(page)
+        token = page['nextPageToken']
+        if not token:
+            break
+    for group in ('approved', 'recent'):
+        assert [e for page in pages for e in page[group]] == expected[group]
+    assert len(pages) == -(-max(len(expected['approved']), len(expected['recent'])) // page_size)
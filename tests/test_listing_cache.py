@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Listing cache (backend/utils/gcs.py).
+Listings come from a local stub bucket - no GCP calls.
+
+Run: python -m pytest tests/test_listing_cache.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from utils import gcs
+from services import generation
+from services.generation import bump_generation
+
+NAMES = ['P/a.pdf', 'P/sub/b.pdf', 'P/sub/c.pdf', 'Q/x.pdf']
+
+
+class StubBucket:
+    def __init__(self):
+        self.calls = []
+
+    def list_blobs(self, prefix, delimiter=None, fields=None, max_results=None):
+        self.calls.append((prefix, delimiter))
+        names = [n for n in NAMES if n.startswith(prefix)]
+        blobs = [SimpleNamespace(name=n, generation=1, size=1, updated=datetime(2025, 1, 1), md5_hash=None, metadata=None,
+                                 content_encoding=None)
+                 for n in names if not delimiter or delimiter not in n[len(prefix):]]
+        prefixes = sorted({prefix + n[len(prefix):].split(delimiter)[0] + delimiter
+                           for n in names if delimiter and delimiter in n[len(prefix):]})
+        return _Iterator(blobs, prefixes)
+
+
+class _Iterator(list):
+    def __init__(self, blobs, prefixes):
+        super().__init__(blobs)
+        self.prefixes = prefixes
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    stub = StubBucket()
+    monkeypatch.setattr(gcs, 'get_bucket', lambda: stub)
+    monkeypatch.setattr(gcs, 'listing_cache', gcs.ListingCache(ttl=60, max_records=100))
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+    return stub
+
+
+def test_compact_records_reused(bucket):
+    first = gcs.list_blobs('P/')
+    assert [b.name for b in first] == ['P/a.pdf', 'P/sub/b.pdf', 'P/sub/c.pdf']
+    assert all(isinstance(b, gcs.ListedBlob) for b in first)
+    assert gcs.list_blobs('P/') == first
+    assert gcs.get_folder_stats('P/') == {'fileCount': 3, 'totalSize': 3}
+    assert bucket.calls == [('P/', None)]
+
+
+def test_delimiter_listings_cached_separately(bucket):
+    assert gcs.list_folders('P/') == [{'name': 'sub', 'path': 'P/sub/'}]
+    gcs.list_folders('P/')
+    gcs.list_blobs('P/')
+    assert bucket.calls == [('P/', '/'), ('P/', None)]
+
+
+def test_generation_change_revalidates(bucket):
+    gcs.list_blobs('P/')
+    gcs.list_blobs('Q/')
+    bump_generation('P')
+    gcs.list_blobs('P/')
+    gcs.list_blobs('Q/')
+    assert bucket.calls == [('P/', None), ('Q/', None), ('P/', None)]
+
+
+def test_ttl_expiry(bucket, monkeypatch):
+    gcs.list_blobs('P/')
+    now = gcs.time.time()
+    monkeypatch.setattr(gcs.time, 'time', lambda: now + 61)
+    gcs.list_blobs('P/')
+    assert len(bucket.calls) == 2
+
+
+def test_record_cap_evicts_least_recently_used(bucket):
+    cache = gcs.ListingCache(ttl=60, max_records=4)
+    cache.listing('P/')  # 3 records
+    cache.listing('Q/')  # 1 record - at the cap
+    cache.listing('P/')
+    cache.listing('P/sub/')  # 2 more - evicts Q/, then P/ is still too many
+    assert cache.stats()['records'] <= 4
+    cache.listing('P/sub/')
+    assert bucket.calls[-1] == ('P/sub/', None)
+    assert cache.stats()['hits'] == 2
+
+
+def test_failed_bump_rereads_the_generation(monkeypatch):
+    class Generations:
+        stored = 7
+        lands = False  # whether the failing increment was applied anyway
+
+        def document(self, project):
+            return self
+
+        def set(self, update, merge=False):
+            if Generations.lands:
+                Generations.stored += 1
+            raise RuntimeError('deadline exceeded')
+
+        def get(self):
+            return SimpleNamespace(exists=True, to_dict=lambda: {'generation': Generations.stored})
+
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', True)
+    monkeypatch.setattr(generation, '_generations', Generations)
+    monkeypatch.setattr(generation, '_cache', {'P': (7, time.time())})
+
+    # Not applied: no local +1 that Firestore never saw
+    assert bump_generation('P') == 7
+    # Applied despite the error: the fresh cached value isn't trusted either
+    Generations.lands = True
+    assert bump_generation('P') == 8
+    assert generation.get_generation('P') == 8
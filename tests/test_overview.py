@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Project overview (backend/services/overview.py).
+Listings come from a local stub of utils.gcs.iter_blob_pages - no GCP calls.
+
+Run: python -m pytest tests/test_overview.py
+"""
+
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import overview, latest, stats, generation
+
+FOLDERS = ['04.Shop-Drawings/Approved', '04.Shop-Drawings/Pending', '08.Reports-MOM/MOM',
+           '07.Submittals/Approved', 'Misc']
+
+
+@pytest.fixture
+def blobs(monkeypatch):
+    rng = random.Random(11)
+    items = [SimpleNamespace(name=f"P/{rng.choice(FOLDERS)}/doc{i} rev{i % 4}.pdf", size=rng.randint(1, 10000),
+                             updated=datetime(2025, 1, 1) + timedelta(hours=rng.randint(0, 40)),
+                             md5_hash=None, metadata=None)
+             for i in range(300)]
+    items.append(SimpleNamespace(name='P/Empty/', size=0, updated=None, md5_hash=None, metadata=None))
+    items.append(SimpleNamespace(name='P/readme.txt', size=5, updated=None, md5_hash=None, metadata=None))
+    passes = []
+
+    def iter_blob_pages(prefix, fields=None):
+        passes.append(prefix)
+        for i in range(0, len(items), 100):
+            yield items[i:i + 100]
+
+    for module in (overview, latest):
+        monkeypatch.setattr(module, 'iter_blob_pages', iter_blob_pages)
+    monkeypatch.setattr(overview, '_overviews', {})
+    monkeypatch.setattr(latest, '_indexes', {})
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+    return SimpleNamespace(items=items, passes=passes)
+
+
+def test_matches_separate_views(blobs, monkeypatch):
+    result = overview.get_overview('P', 10)
+
+    monkeypatch.setattr(stats, 'get_bucket', lambda: SimpleNamespace(list_blobs=lambda **kw: blobs.items))
+    assert result['stats'] == stats.compute_stats('P')
+    lists = latest.stream_latest('P', 10, {latest.ALL_TYPES})
+    assert result['latest'] == {group: lists.get((latest.ALL_TYPES, group), []) for group in ('approved', 'recent')}
+
+    files = [b for b in blobs.items if not b.name.endswith('/')]
+    assert [f['size'] for f in result['largest']] == sorted((b.size for b in files), reverse=True)[:10]
+    assert [f['name'] for f in result['folders']] == ['04.Shop-Drawings', '07.Submittals', '08.Reports-MOM',
+                                                      'Empty', 'Misc']
+    assert result['folders'][3]['fileCount'] == 0
+    assert sum(f['fileCount'] for f in result['folders']) == 300
+
+
+def test_one_pass_serves_latest_and_repeats(blobs):
+    overview.get_overview('P')
+    overview.get_overview('P', 5)
+    latest.get_latest('P', 'mom', 10)
+    assert blobs.passes == ['P/']
+
+    generation.bump_generation('P')
+    overview.get_overview('P')
+    assert len(blobs.passes) == 2
+
+
+def test_route_clamps_limit(monkeypatch):
+    from flask import Flask
+    import routes
+    limits = []
+    monkeypatch.setattr(routes, 'get_overview', lambda project, limit: limits.append(limit) or {})
+    monkeypatch.setattr(routes, 'get_gcs_folder_name', lambda project: project)
+    monkeypatch.setattr(generation, 'FIRESTORE_ENABLED', False)
+    monkeypatch.setattr(generation, '_cache', {})
+    app = Flask(__name__)
+    routes.register_routes(app)
+    client = app.test_client()
+
+    assert client.get('/overview?project=P&limit=x').status_code == 400
+    for query in ('', '&limit=5', '&limit=0', '&limit=-3', '&limit=100000'):
+        assert client.get(f'/overview?project=P{query}').status_code == 200
+    assert limits == [10, 5, 1, 1, routes.LATEST_INDEX_SIZE]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Shared revision/date parser (backend/utils/revision.py and its copies in
+backend-email/utils/revision.py and backend-whatsapp-webhook/utils/revision.py).
+
+Every function must give exactly what the parser it replaced gave: the backend
+document functions (tests/baseline_classifier.py), the /latest inline label and
+the WhatsApp webhook's scores (frozen below).
+
+Run: python -m pytest tests/test_revision.py
+"""
+
+import os
+import re
+import sys
+import importlib.util
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+BACKEND_COPY = os.path.join(ROOT, 'backend', 'utils', 'revision.py')
+EMAIL_COPY = os.path.join(ROOT, 'backend-email', 'utils', 'revision.py')
+WHATSAPP_COPY = os.path.join(ROOT, 'backend-whatsapp-webhook', 'utils', 'revision.py')
+
+_spec = importlib.util.spec_from_file_location('revision', BACKEND_COPY)
+revision = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(revision)
+
+sys.path.insert(0, os.path.dirname(__file__))
+import baseline_classifier as baseline
+
+
+# --- Replaced parsers, unchanged ----------------------------------------------
+
+def legacy_latest_label(name):
+    # backend routes.py /latest
+    rev_match = re.search(r'[_\-\s]?[Rr](?:ev)?\.?\s*(\d+)', name)
+    return f"R{rev_match.group(1)}" if rev_match else ''
+
+
+def legacy_revision_score(filename):
+    # backend-whatsapp-webhook utils/revision_parser.extract_revision_score
+    if not filename:
+        return 0
+    name_upper = filename.upper()
+    rev_num = re.search(r'REV[_\s\-\.]*(\d+)', name_upper)
+    if rev_num:
+        return int(rev_num.group(1)) * 100
+    r_num = re.search(r'[_\-\s]R(\d+)[_\-\s\.]', name_upper)
+    if r_num:
+        return int(r_num.group(1)) * 100
+    rev_letter = re.search(r'REV[_\s\-\.]*([A-Z])', name_upper)
+    if rev_letter:
+        return (ord(rev_letter.group(1)) - ord('A') + 1) * 10
+    version = re.search(r'V(?:ERSION)?[_\s\-\.]*(\d+)', name_upper)
+    if version:
+        return int(version.group(1)) * 100
+    suffix_num = re.search(r'[_\-](\d{2,3})(?:\.[a-zA-Z]+)?$', filename)
+    if suffix_num:
+        return int(suffix_num.group(1))
+    return 0
+
+
+def legacy_date_score(filename):
+    # backend-whatsapp-webhook utils/revision_parser.extract_date_score
+    if not filename:
+        return 0
+    for pattern, order in [
+        (r'(20\d{2})[_\-](\d{2})[_\-](\d{2})', (1, 2, 3)),
+        (r'(\d{2})[_\-](\d{2})[_\-](20\d{2})', (3, 2, 1)),
+        (r'(20\d{2})(\d{2})(\d{2})', (1, 2, 3)),
+    ]:
+        match = re.search(pattern, filename)
+        if match:
+            try:
+                return int(datetime(*(int(match.group(g)) for g in order)).timestamp())
+            except ValueError:
+                pass
+    return 0
+
+
+def legacy_indicator(filename):
+    # backend-whatsapp-webhook utils/revision_parser.get_revision_indicator
+    if not filename:
+        return None
+    rev_match = re.search(r'(REV[_\s\-\.]*\d+|REV[_\s\-\.]*[A-Z]|V\d+|R\d+)', filename.upper())
+    return rev_match.group(1) if rev_match else None
+
+
+NAMES = [
+    'SD-A-101_Kitchen Layout_Rev02.pdf',
+    'SD-M-301-AC Ducting rev.4 FINAL.pdf',
+    'SD-E-210 Small Power Layout R3.pdf',
+    'Bathroom WC details_r1_.pdf',
+    'Drawing_R1.pdf',
+    'Revision 7 handover.pdf',
+    'Ceiling Rev A.pdf',
+    'drawing_rev_b_v3.pdf',
+    'plan v2.pdf',
+    'V1.2_concept.pdf',
+    'Plan_01.pdf',
+    'Plan-014.dwg',
+    'MOM 2025-11-03.pdf',
+    'Report 05_01_2025 R2.pdf',
+    '20250115_RE_Approval.json',
+    'REVIEW comments.pdf',
+    'Prev 3 reverse.pdf',
+    'Fire Alarm Layout-E-02.pdf',
+    'INV-2025-014.pdf',
+    'Floor2r.pdf',
+    'floor2 plan.pdf',
+    '31-02-2025.pdf',
+    '2025-13-01 then 2025-01-02.pdf',
+    'Version 3 final.docx',
+    '',
+]
+
+
+@pytest.mark.parametrize('copy', [EMAIL_COPY, WHATSAPP_COPY])
+def test_service_copies_are_identical(copy):
+    with open(BACKEND_COPY, 'rb') as a, open(copy, 'rb') as b:
+        assert a.read() == b.read()
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_matches_replaced_parsers(name):
+    assert revision.document_revision(name) == baseline.extract_revision(name)
+    priority, doc_type = baseline.get_document_priority(name, name)
+    bonus = priority - baseline.DOCUMENT_HIERARCHY[doc_type]['priority']
+    bonus -= 15 if 'final' in name.lower() or 'approved' in name.lower() else 0
+    assert min(revision.priority_revision(name) * 2, 10) == bonus
+    assert revision.short_revision_label(name) == legacy_latest_label(name)
+    assert revision.revision_score(name) == legacy_revision_score(name)
+    assert revision.date_score(name) == legacy_date_score(name)
+    assert revision.revision_indicator(name) == legacy_indicator(name)
+
+
+# The behaviour a unified parser would have changed - pinned explicitly
+
+def test_version_earns_no_priority_bonus():
+    assert revision.priority_revision('plan v2.pdf') == 0
+    assert revision.priority_revision('Revision 7 handover.pdf') == 0
+
+
+def test_document_labels():
+    assert revision.document_revision('V1.2_concept.pdf') == (1, 'Rev 01')
+    assert revision.document_revision('Revision 7 handover.pdf') == (7, 'Rev 07')
+    assert revision.document_revision('Ceiling Rev A.pdf') == (0, None)
+
+
+def test_latest_labels():
+    assert revision.short_revision_label('SD-A-101_Kitchen Layout_Rev02.pdf') == 'R02'
+    assert revision.short_revision_label('Report R2.pdf') == 'R2'
+    assert revision.short_revision_label('plan v2.pdf') == ''
+
+
+def test_whatsapp_scores():
+    assert revision.revision_score('Plan_01.pdf') == 1
+    assert revision.revision_score('Drawing_R1.pdf') == 100
+    assert revision.revision_score('Ceiling Rev B.pdf') == 20
+    # Dated names without a revision order by date alone
+    assert revision.date_score('MOM 2025-11-03.pdf') > revision.date_score('MOM 2025-01-02.pdf') > 0
+    assert revision.date_score('31-02-2025.pdf') == 0
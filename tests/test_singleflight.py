@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Request coalescing (backend/utils/singleflight.py).
+
+Run: python -m pytest tests/test_singleflight.py
+"""
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from utils.singleflight import SingleFlight, coalesced
+
+
+def _start_and_wait(flight, key, fn, n):
+    """Start n calls and return once one runs and the others wait on it"""
+    pool = ThreadPoolExecutor(max_workers=n)
+    futures = [pool.submit(flight.do, key, fn) for _ in range(n)]
+    while True:
+        with flight._lock:
+            call = flight._calls.get(key)
+            if call and call.waiters == n - 1:
+                break
+        time.sleep(0.001)
+    pool.shutdown(wait=False)
+    return futures
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        release.wait(5)
+        return {'fileCount': 3}
+
+    futures = _start_and_wait(flight, 'P', work, 6)
+    release.set()
+
+    results = [f.result() for f in futures]
+    assert len(runs) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats()['saved'] == 5
+    assert flight.in_flight() == 0
+
+
+def test_errors_are_shared_and_not_kept():
+    flight = SingleFlight(timeout=5)
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError('listing failed')
+
+    futures = _start_and_wait(flight, 'P', fail, 3)
+    release.set()
+    for f in futures:
+        with pytest.raises(ValueError):
+            f.result()
+    # Nothing is cached once the call is done
+    assert flight.do('P', lambda: 'ok') == 'ok'
+
+
+def test_waiter_times_out_and_runs_itself():
+    flight = SingleFlight(timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=('P', release.wait, 5))
+    leader.start()
+    while not flight.in_flight():
+        time.sleep(0.001)
+    assert flight.do('P', lambda: 'own') == 'own'
+    release.set()
+    leader.join()
+    assert flight.stats()['timeouts'] == 1 and flight.stats()['saved'] == 0
+
+
+def test_decorator_keys():
+    flight = SingleFlight()
+    calls = []
+
+    @coalesced(key=lambda project, limit=10: project.lower(), flight=flight)
+    def stats(project, limit=10):
+        calls.append(project)
+        return project
+
+    assert stats('Agora') == 'Agora'
+    assert stats('Bahra', limit=5) == 'Bahra'
+    assert calls == ['Agora', 'Bahra']
+    assert flight.stats()['executions'] == 2
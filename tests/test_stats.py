@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Project statistics aggregates (backend/services/stats.py).
+Uses a local stub of the Firestore collection - no GCP calls.
+
+Run: python -m pytest tests/test_stats.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import stats
+
+
+class StubCollection:
+    def __init__(self):
+        self.writes = []
+
+    def document(self, doc_id):
+        collection = self
+
+        class Ref:
+            def set(self, data, merge=False):
+                collection.writes.append((doc_id, data, merge))
+
+        return Ref()
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    stub = StubCollection()
+    monkeypatch.setattr(stats, '_stats_collection', lambda: stub)
+    monkeypatch.setattr(stats, 'FIRESTORE_ENABLED', True)
+    return stub
+
+
+def _record(doc_type, subject='general'):
+    return {'type': doc_type, 'subject': subject, 'revision': 0, 'revisionStr': None,
+            'priority': 10, 'approved': False}
+
+
+def test_delta_accumulates_and_nets_out(collection):
+    delta = stats.StatsDelta('P')
+    delta.add('P/08.Reports-MOM/MOM/a.pdf', 100, _record('mom'))
+    delta.add('P/08.Reports-MOM/MOM/b.pdf', 50, _record('mom', 'kitchen'))
+    delta.add('P/top.pdf', 7, _record('other'))
+    # Overwrite of b.pdf: old copy out, new copy in
+    delta.add('P/08.Reports-MOM/MOM/b.pdf', 50, _record('mom', 'kitchen'), -1)
+    delta.add('P/08.Reports-MOM/MOM/b.pdf', 60, _record('mom', 'kitchen'))
+    delta.apply()
+
+    (doc_id, update, merge), = collection.writes
+    assert doc_id == 'P' and merge
+    assert update['fileCount'].value == 3
+    assert update['totalSize'].value == 167
+    assert update['byType']['mom'].value == 2
+    assert update['bytesByType']['mom'].value == 160
+    assert update['byFolder']['08.Reports-MOM'].value == 2
+    assert update['byFolder'][stats.ROOT_FOLDER].value == 1
+    assert update['bySubject']['kitchen'].value == 1
+
+
+def test_nothing_written_when_changes_cancel(collection):
+    delta = stats.StatsDelta('P')
+    delta.add('P/a.pdf', 10, _record('other'))
+    delta.add('P/a.pdf', 10, _record('other'), -1)
+    delta.apply()
+    assert collection.writes == []
+
+
+def test_object_events(collection, monkeypatch):
+    monkeypatch.setattr(stats, 'STATS_EVENTS_ENABLED', True)
+    finalized = 'google.cloud.storage.object.v1.finalized'
+    mail = 'P/09-Correspondence/RFI/2025-01-01_Site access.json'
+
+    assert stats.apply_object_event(finalized, {'name': '_thumbs/x.webp', 'size': '5'}) is None
+    assert stats.apply_object_event(finalized, {'name': 'P/', 'size': '0'}) is None
+    assert stats.apply_object_event(finalized, {'name': mail, 'size': '5', 'metadata': {'sourceMd5': 'x'}}) == 'P'
+    assert stats.apply_object_event('google.cloud.storage.object.v1.deleted', {'name': mail, 'size': '5'}) == 'P'
+
+    added, removed = collection.writes
+    assert added[1]['byType'][stats.document_metadata(mail)['type']].value == 1
+    assert removed[1]['totalSize'].value == -5
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Text extraction (backend/workers/text.py), the text pipeline stage
+(backend/services/pipeline.py) and reading the sidecars back
+(backend/utils/gcs.py read_document_text). Documents are built in memory and
+objects live in a local stub bucket - no GCP calls, no subprocesses.
+
+Run: python -m pytest tests/test_text.py
+"""
+
+import os
+import io
+import sys
+import gzip
+import base64
+import hashlib
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import pipeline
+from utils import gcs
+from workers import text
+from workers.text import extract_text, text_path
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+S = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+
+def _zip(files):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return out.getvalue()
+
+
+def docx(*paragraphs):
+    body = ''.join(f'<w:p><w:r><w:t>{p}</w:t></w:r></w:p>' for p in paragraphs)
+    return _zip({'word/document.xml': f'<w:document xmlns:w="{W}"><w:body>{body}</w:body></w:document>'})
+
+
+def xlsx():
+    shared = f'<sst xmlns="{S}"><si><t>Item</t></si><si><t>Qty</t></si></sst>'
+    sheet = (f'<worksheet xmlns="{S}"><sheetData>'
+             '<row><c t="s"><v>0</v></c><c t="s"><v>1</v></c></row>'
+             '<row><c t="inlineStr"><is><t>Rebar</t></is></c><c><v>12</v></c></row>'
+             '<row><c><v></v></c></row>'
+             '</sheetData></worksheet>')
+    return _zip({'xl/sharedStrings.xml': shared, 'xl/worksheets/sheet1.xml': sheet})
+
+
+def _md5(content):
+    return hashlib.md5(content).hexdigest()
+
+
+def test_docx_paragraphs():
+    assert gzip.decompress(extract_text(docx('Method statement', 'Rev 2'), '.docx')) == b'Method statement\nRev 2'
+
+
+def test_xlsx_rows_with_shared_and_inline_strings():
+    assert gzip.decompress(extract_text(xlsx(), '.xlsx')).decode() == 'Item\tQty\nRebar\t12'
+
+
+def test_unsupported_corrupt_and_empty_documents():
+    assert extract_text(b'plain', '.txt') is None
+    assert extract_text(b'not a zip', '.docx') is None
+    assert extract_text(docx(), '.docx') is None
+
+
+def test_text_is_capped(monkeypatch):
+    monkeypatch.setattr(text, 'MAX_TEXT_CHARS', 5)
+    assert gzip.decompress(extract_text(docx('abcdefghij'), '.docx')) == b'abcde'
+
+
+class StubBucket:
+    def __init__(self):
+        self.objects = {}
+        self.sources = {}
+
+    def blob(self, name):
+        return StubBlob(self, name)
+
+    def get_blob(self, name):
+        return self.sources.get(name)
+
+
+class StubBlob:
+    def __init__(self, bucket, name):
+        self.bucket, self.name = bucket, name
+
+    def exists(self):
+        return self.name in self.bucket.objects
+
+    def upload_from_string(self, data, content_type=None):
+        self.bucket.objects[self.name] = data
+
+    def download_as_bytes(self):
+        if self.name not in self.bucket.objects:
+            raise gcs.NotFound(self.name)
+        return self.bucket.objects[self.name]
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    stub = StubBucket()
+    monkeypatch.setattr(pipeline, 'ProcessPoolExecutor', lambda max_workers, mp_context=None: ThreadPoolExecutor(max_workers))
+    monkeypatch.setattr(gcs, 'get_bucket', lambda: stub)
+    return stub
+
+
+def _source(bucket, name, content, metadata=None):
+    """A stored document - GCS reports md5 as base64"""
+    md5 = base64.b64encode(hashlib.md5(content).digest()).decode()
+    bucket.sources[name] = SimpleNamespace(name=name, md5_hash=md5, metadata=metadata)
+
+
+def test_stage_stores_sidecars_read_back_by_search(bucket):
+    spec = docx('Concrete pour', 'Level 3 slab')
+    stage = pipeline.TextStage(bucket)
+    stage.submit('P/spec.docx', spec, _md5(spec))
+    stage.submit('P/spec copy.docx', spec, _md5(spec))
+    stage.submit('P/photo.jpg', b'jpeg', _md5(b'jpeg'))
+    assert stage.finish() == {'processed': 1, 'reused': 1, 'failed': 0}
+    assert set(bucket.objects) == {text_path(_md5(spec))}
+
+    _source(bucket, 'P/spec.docx', spec)
+    assert gcs.read_document_text('P/spec.docx') == 'Concrete pour\nLevel 3 slab'
+    assert gcs.read_document_text('P/spec.docx', max_chars=8) == 'Concrete'
+
+
+def test_read_uses_source_md5_of_gzip_stored_objects(bucket):
+    bucket.objects[text_path(_md5(b'original'))] = gzip.compress(b'minutes')
+    _source(bucket, 'P/mom.docx', b'stored gzip bytes', metadata={'sourceMd5': _md5(b'original')})
+    assert gcs.read_document_text('P/mom.docx') == 'minutes'
+
+
+def test_read_without_text(bucket):
+    _source(bucket, 'P/scan.pdf', b'no text layer')
+    assert gcs.read_document_text('P/scan.pdf') == ''
+    assert gcs.read_document_text('P/missing.pdf') == ''
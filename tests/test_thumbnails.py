@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Thumbnail pipeline stage (backend/services/pipeline.py) and the listing lookup
+(backend/services/thumbnails.py) that reads what the stage records on sources.
+Objects live in a local stub bucket and the process pool is replaced by threads -
+no GCP calls, no subprocesses.
+
+Run: python -m pytest tests/test_thumbnails.py
+"""
+
+import os
+import sys
+import base64
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from services import pipeline, thumbnails
+from workers.thumbnails import thumbnail_path
+
+
+class StubBucket:
+    def __init__(self):
+        self.objects = {}
+        self.patches = 0
+
+    def blob(self, name):
+        return StubBlob(self, name)
+
+
+class StubBlob:
+    def __init__(self, bucket, name, content=None):
+        self.bucket, self.name = bucket, name
+        self.metadata = None
+        if content is not None:
+            self.md5_hash = base64.b64encode(hashlib.md5(content).digest()).decode()
+
+    def exists(self):
+        return self.name in self.bucket.objects
+
+    def upload_from_string(self, data, content_type=None):
+        self.bucket.objects[self.name] = data
+
+    def patch(self):
+        self.bucket.patches += 1
+
+
+def render(content, ext):
+    """Stand-in worker: 'bad' content can't be rendered"""
+    return None if content == b'bad' else b'webp:' + content
+
+
+def _md5(content):
+    return hashlib.md5(content).hexdigest()
+
+
+def _listed(name, content, metadata=None):
+    """A listed source blob - GCS reports md5 as base64"""
+    return SimpleNamespace(name=name, md5_hash=base64.b64encode(hashlib.md5(content).digest()).decode(),
+                           metadata=metadata)
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    stub = StubBucket()
+    monkeypatch.setattr(pipeline, 'ProcessPoolExecutor', lambda max_workers, mp_context=None: ThreadPoolExecutor(max_workers))
+    monkeypatch.setattr(pipeline.ThumbnailStage, 'enabled', True)
+    monkeypatch.setattr(pipeline.ThumbnailStage, 'worker', staticmethod(render))
+    return stub
+
+
+def test_stage_stores_rendered_thumbnails(bucket):
+    stage = pipeline.ThumbnailStage(bucket, max_workers=2)
+    for i in range(5):
+        stage.submit(f'P/doc{i}.pdf', b'page %d' % i, _md5(b'page %d' % i))
+    stats = stage.finish()
+
+    assert stats == {'processed': 5, 'reused': 0, 'failed': 0}
+    for i in range(5):
+        assert bucket.objects[thumbnail_path(_md5(b'page %d' % i))] == b'webp:page %d' % i
+
+
+def test_stage_reuses_existing_and_duplicate_content(bucket):
+    bucket.objects[thumbnail_path(_md5(b'old'))] = b'webp:old'
+    stage = pipeline.ThumbnailStage(bucket)
+    stage.submit('P/a.pdf', b'old', _md5(b'old'))
+    stage.submit('P/b.pdf', b'new', _md5(b'new'))
+    stage.submit('P/copy of b.pdf', b'new', _md5(b'new'))
+
+    assert stage.finish() == {'processed': 1, 'reused': 2, 'failed': 0}
+
+
+def test_stage_skips_other_types_and_stores_nothing_for_failures(bucket):
+    stage = pipeline.ThumbnailStage(bucket)
+    stage.submit('P/notes.txt', b'text', _md5(b'text'))
+    stage.submit('P/locked.pdf', b'bad', _md5(b'bad'))
+
+    assert stage.finish() == {'processed': 0, 'reused': 0, 'failed': 1}
+    assert bucket.objects == {}
+
+
+def test_stage_marks_sources_with_stored_thumbnails(bucket):
+    bucket.objects[thumbnail_path(_md5(b'old'))] = b'webp:old'
+    stage = pipeline.ThumbnailStage(bucket)
+    sources = {}
+    for name, content in [('P/a.pdf', b'old'), ('P/b.pdf', b'new'), ('P/copy of b.pdf', b'new'), ('P/locked.pdf', b'bad')]:
+        sources[name] = StubBlob(bucket, name, content)
+        stage.submit(name, content, _md5(content), sources[name])
+    stage.finish()
+
+    assert sources['P/a.pdf'].metadata == {'thumbnail': thumbnail_path(_md5(b'old'))}
+    assert sources['P/b.pdf'].metadata == {'thumbnail': thumbnail_path(_md5(b'new'))}
+    assert sources['P/copy of b.pdf'].metadata == {'thumbnail': thumbnail_path(_md5(b'new'))}
+    assert sources['P/locked.pdf'].metadata is None
+    assert bucket.patches == 3
+
+
+def test_lookup_reads_the_listed_metadata(bucket):
+    marked = {'thumbnail': thumbnail_path(_md5(b'rendered'))}
+
+    assert thumbnails.thumbnail_for_blob(_listed('P/a.pdf', b'rendered', marked)) == thumbnail_path(_md5(b'rendered'))
+    assert thumbnails.thumbnail_for_blob(_listed('P/locked.pdf', b'failed')) is None
+    assert thumbnails.thumbnail_for_blob(_listed('P/notes.txt', b'rendered', marked)) is None
+    assert thumbnails.thumbnail_for_blob(SimpleNamespace(name='P/b.pdf', md5_hash=None, metadata=None)) is None
+    # Content changed under a carried-over marker
+    assert thumbnails.thumbnail_for_blob(_listed('P/a.pdf', b'edited', marked)) is None
+
+
+def test_lookup_uses_source_md5_of_gzip_stored_objects(bucket):
+    # GCS md5Hash is of the stored gzip bytes; thumbnails are keyed by the original content
+    metadata = {'sourceMd5': _md5(b'page'), 'thumbnail': thumbnail_path(_md5(b'page'))}
+    blob = _listed('P/scan.pdf', b'gzipped bytes', metadata)
+
+    assert thumbnails.thumbnail_for_blob(blob) == thumbnail_path(_md5(b'page'))
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Gzip-encoded uploads (backend/utils/gcs.py upload_bytes, content_type_for).
+Objects live in a local stub bucket - no GCP calls.
+
+Run: python -m pytest tests/test_upload.py
+"""
+
+import os
+import sys
+import gzip
+import base64
+import hashlib
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import pytest
+from utils import gcs
+from utils.gcs import upload_bytes, content_type_for, blob_md5_hex, GZIP_MIN_BYTES
+
+CSV = ('item,qty\n' + 'rebar,12\n' * 200).encode()
+
+
+class StubBucket:
+    def __init__(self):
+        self.objects = {}
+
+    def blob(self, name):
+        return StubBlob(self, name)
+
+
+class StubBlob:
+    def __init__(self, bucket, name):
+        self.bucket, self.name = bucket, name
+        self.metadata = self.content_encoding = self.content_type = self.md5_hash = None
+
+    def upload_from_string(self, data, content_type=None):
+        self.data, self.content_type = data, content_type
+        self.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode()
+        self.bucket.objects[self.name] = self
+
+
+@pytest.fixture
+def bucket():
+    return StubBucket()
+
+
+def test_content_types():
+    assert content_type_for('P/log.TXT') == 'text/plain'
+    assert content_type_for('P/data.json') == 'application/json; charset=utf-8'
+    assert content_type_for('P/drawing.pdf') == 'application/pdf'
+    assert content_type_for('P/blob.unknownext') == 'application/octet-stream'
+
+
+def test_text_is_stored_gzip_encoded(bucket):
+    blob = upload_bytes(bucket, 'P/boq.csv', CSV, metadata={'docType': 'boq'})
+
+    assert blob.content_encoding == 'gzip'
+    assert blob.content_type == 'text/csv'
+    assert gzip.decompress(blob.data) == CSV
+    assert len(blob.data) < len(CSV)
+    assert blob.metadata == {'docType': 'boq', 'sourceMd5': hashlib.md5(CSV).hexdigest()}
+    # Dedup and text sidecars key on the original content, not the gzip stream
+    assert blob_md5_hex(blob) == hashlib.md5(CSV).hexdigest()
+
+
+def test_gzip_output_is_deterministic(bucket):
+    assert upload_bytes(bucket, 'P/a.csv', CSV).data == upload_bytes(bucket, 'P/b.csv', CSV).data
+
+
+@pytest.mark.parametrize('name', ['P/minutes.txt', 'P/report.html', 'P/page.htm'])
+def test_types_the_search_datastore_imports_stored_as_is(bucket, name):
+    # Vertex AI Search imports these by GCS URI (services/indexing.py)
+    blob = upload_bytes(bucket, name, CSV)
+    assert blob.data == CSV and blob.content_encoding is None
+    assert blob.content_type == content_type_for(name)
+
+
+def test_small_text_and_binary_types_stored_as_is(bucket):
+    small = b'x' * (GZIP_MIN_BYTES - 1)
+    for name, data in (('P/short.json', small), ('P/drawing.pdf', CSV)):
+        blob = upload_bytes(bucket, name, data)
+        assert blob.data == data
+        assert blob.content_encoding is None and blob.metadata is None
+        assert blob_md5_hex(blob) == hashlib.md5(data).hexdigest()
+
+
+def test_strings_and_explicit_content_type(bucket):
+    blob = upload_bytes(bucket, 'P/notes.txt', 'café', content_type='text/plain; charset=utf-8')
+    assert blob.data == 'café'.encode('utf-8')
+    assert blob.content_type == 'text/plain; charset=utf-8'
+
+
+def test_upload_blob_uses_the_shared_bucket(monkeypatch, bucket):
+    monkeypatch.setattr(gcs, 'get_bucket', lambda: bucket)
+    monkeypatch.setattr(StubBlob, 'public_url', 'https://storage.example/P/log.csv', raising=False)
+    assert gcs.upload_blob('P/log.csv', CSV) == 'https://storage.example/P/log.csv'
+    assert bucket.objects['P/log.csv'].content_encoding == 'gzip'
+
+
+def test_md5_of_unlisted_content():
+    assert blob_md5_hex(SimpleNamespace(metadata=None, md5_hash=None)) is None